@@ -0,0 +1,118 @@
+"""The item catalog (item_types), read once and kept in memory.
+
+item_types only changes when items are seeded, so the UI keeps one ItemCatalog
+built from a single query instead of querying on every category click. Each
+item is one shared, read-only ItemRecord; the catalog indexes them by id, by
+name and by category. Records also answer item["name"] / item.get("icon_path"),
+so they drop in wherever item dicts were used.
+
+After writing to item_types outside seed_items(), call reload_catalog().
+"""
+import threading
+
+from database.items_db import get_conn, add_item_types_if_not_exist
+
+FIELDS = ("id", "name", "category", "energy_per_min", "cost_per_kwh", "icon_path")
+
+
+class ItemRecord:
+    __slots__ = FIELDS
+
+    def __init__(self, id, name, category, energy_per_min, cost_per_kwh, icon_path):
+        for field, value in zip(FIELDS, (id, name, category, energy_per_min, cost_per_kwh, icon_path)):
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("catalog items are read-only")
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in FIELDS else default
+
+    def __contains__(self, key):
+        return key in FIELDS
+
+    def keys(self):
+        return FIELDS
+
+    def __reduce__(self):
+        # pickle through __init__, since __setattr__ refuses the default slot restore
+        return (ItemRecord, tuple(getattr(self, f) for f in FIELDS))
+
+    def as_dict(self):
+        return {f: getattr(self, f) for f in FIELDS}
+
+    def __repr__(self):
+        return f"ItemRecord({self.id}, {self.name!r}, {self.category!r})"
+
+
+class ItemCatalog:
+    """Immutable snapshot of item_types. Lists come back as tuples ordered by name."""
+
+    def __init__(self, records):
+        self.items = tuple(sorted(records, key=lambda r: (r.category, r.name)))
+        self.by_id = {r.id: r for r in self.items}
+        self.by_name = {r.name: r for r in self.items}
+        by_category = {}
+        for r in self.items:
+            by_category.setdefault(r.category, []).append(r)
+        self._by_category = {cat: tuple(rs) for cat, rs in by_category.items()}
+
+    @classmethod
+    def load(cls, conn=None):
+        conn = conn or get_conn()
+        rows = conn.execute('SELECT %s FROM item_types' % ", ".join(FIELDS)).fetchall()
+        return cls(ItemRecord(*r) for r in rows)
+
+    def category(self, category):
+        return self._by_category.get(category, ())
+
+    @property
+    def categories(self):
+        return tuple(self._by_category)
+
+    def get(self, item_id):
+        return self.by_id.get(item_id)
+
+    def find(self, name):
+        return self.by_name.get(name)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """The shared ItemCatalog, loaded on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = ItemCatalog.load()
+    return _catalog
+
+
+def reload_catalog():
+    global _catalog
+    with _catalog_lock:
+        _catalog = ItemCatalog.load()
+    return _catalog
+
+
+def seed_items(rows):
+    """Add any of rows [(name, category, energy_per_min, cost_per_kwh, icon_path), ...] that are
+       missing, in one statement. The catalog is only re-read when something was added."""
+    added = add_item_types_if_not_exist(rows)
+    if added or _catalog is None:
+        reload_catalog()
+    return added
@@ -1,23 +1,190 @@
 import sqlite3
 import os
+import atexit
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'simulation.db')
 
+# usage_rollups periods above 'day', in simulated days: week n is days 7(n-1)+1 .. 7n
+ROLLUP_PERIODS = {"week": 7, "month": 30}
+
+# Unique key of daily_item_usage and load_curve_index rows. NULLs are distinct in a
+# UNIQUE index, so the nullable columns are indexed as COALESCE(col, -1) (ids and
+# slot indexes are never negative) and a row missing its map, room, slot or item
+# still conflicts with its earlier copy. ON CONFLICT must name these same expressions.
+SLOT_DAY_KEY = ('day_index, COALESCE(map_id, -1), COALESCE(room_id, -1), COALESCE(slot_index, -1), '
+                'COALESCE(item_type_id, -1)')
+
+# One long-lived connection per thread (sqlite3 connections must not be shared
+# across threads mid-transaction). Opening a connection, and committing outside a
+# transaction, is what used to cost every helper call; now each thread opens one
+# on first use, keeps it (with its prepared-statement cache) and closes it at exit.
+_local = threading.local()
+_open_conns = []
+_open_conns_lock = threading.Lock()
+
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    """This thread's shared connection (WAL journal, autocommit outside transaction())."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        # with WAL, NORMAL only syncs at checkpoints; a crash can lose the last commits but not corrupt the DB
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        _local.conn = conn
+        _local.depth = 0
+        _local.pending_ids = {}
+        with _open_conns_lock:
+            _open_conns.append(conn)
     return conn
 
+@contextmanager
+def transaction():
+    """Run a block of statements as one transaction on this thread's connection.
+       Nested scopes become savepoints, so helpers can call each other freely and
+       an inner failure only rolls back the inner part."""
+    conn = get_conn()
+    depth = _local.depth
+    if depth == 0:
+        conn.execute("BEGIN IMMEDIATE")
+    else:
+        conn.execute("SAVEPOINT sp%d" % depth)
+    _local.depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        _local.depth = depth
+        # ids learned in this transaction may belong to rows that are being undone
+        _local.pending_ids.clear()
+        if depth == 0:
+            conn.execute("ROLLBACK")
+        else:
+            conn.execute("ROLLBACK TO sp%d" % depth)
+            conn.execute("RELEASE sp%d" % depth)
+        raise
+    _local.depth = depth
+    if depth == 0:
+        conn.execute("COMMIT")
+        _publish_pending_ids()
+    else:
+        conn.execute("RELEASE sp%d" % depth)
+
+def close_conn():
+    """Close this thread's connection (a new one is opened on next use)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        return
+    _local.conn = None
+    with _open_conns_lock:
+        if conn in _open_conns:
+            _open_conns.remove(conn)
+    conn.close()
+
+@atexit.register
+def close_all_conns():
+    with _open_conns_lock:
+        conns = list(_open_conns)
+        _open_conns.clear()
+    for conn in conns:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+# ------------- name <-> id caches -------------
+class _IdCache:
+    """Bounded LRU map from a name key to its row id, with the reverse lookup."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._ids = OrderedDict()  # { key: id }
+        self._keys = {}            # { id: key }
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            row_id = self._ids.get(key)
+            if row_id is None:
+                self.misses += 1
+                return None
+            self._ids.move_to_end(key)
+            self.hits += 1
+            return row_id
+
+    def key_of(self, row_id):
+        with self._lock:
+            return self._keys.get(row_id)
+
+    def put(self, key, row_id):
+        with self._lock:
+            self._ids[key] = row_id
+            self._ids.move_to_end(key)
+            self._keys[row_id] = key
+            while len(self._ids) > self.maxsize:
+                _, old_id = self._ids.popitem(last=False)
+                self._keys.pop(old_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._keys.clear()
+
+_map_ids = _IdCache()        # map name -> maps.id
+_room_ids = _IdCache()       # (map_id, room name) -> rooms.id
+_item_type_ids = _IdCache()  # item name -> item_types.id
+_category_ids = _IdCache()   # category name -> categories.id
+_ID_CACHES = {"maps": _map_ids, "rooms": _room_ids, "item_types": _item_type_ids, "categories": _category_ids}
+
+def _cached_id(cache, key):
+    """Id for key from this thread's uncommitted lookups or the shared cache (None if unknown)."""
+    pending = getattr(_local, "pending_ids", None)
+    if pending:
+        row_id = pending.get((id(cache), key))
+        if row_id is not None:
+            return row_id
+    return cache.get(key)
+
+def _remember_id(cache, key, row_id):
+    """Cache an id; inside a transaction it is only shared with other threads once committed."""
+    if getattr(_local, "depth", 0):
+        _local.pending_ids[(id(cache), key)] = row_id
+    else:
+        cache.put(key, row_id)
+
+def _publish_pending_ids():
+    caches = {id(cache): cache for cache in _ID_CACHES.values()}
+    for (cache_id, key), row_id in _local.pending_ids.items():
+        caches[cache_id].put(key, row_id)
+    _local.pending_ids.clear()
+
+def clear_id_caches():
+    """Forget every cached id, e.g. after editing maps/rooms/item_types outside these helpers."""
+    for cache in _ID_CACHES.values():
+        cache.clear()
+    pending = getattr(_local, "pending_ids", None)
+    if pending:
+        pending.clear()
+
+def id_cache_stats():
+    """{ cache_name: {"size", "hits", "misses"} }"""
+    return {name: {"size": len(cache._ids), "hits": cache.hits, "misses": cache.misses}
+            for name, cache in _ID_CACHES.items()}
+
 def _table_columns(conn, table):
     cur = conn.cursor()
     cur.execute("PRAGMA table_info(%s)" % table)
     return [r["name"] for r in cur.fetchall()]
 
-def init_items_db():
-    """Create normalized schema and migrate old name-based placements/usages if present."""
-    conn = get_conn()
+def _migrate_to_v1(conn):
+    """Base schema. Also converts the old name-based placements/daily_item_usage tables."""
     c = conn.cursor()
 
     # core item types (backwards compatible)
@@ -61,7 +228,23 @@ def init_items_db():
         FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE CASCADE
     )''')
 
-    conn.commit()
+    # household tariff plans: one price per kWh for each band of minutes in the day
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS tariff_plans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        description TEXT
+    )''')
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS tariff_bands (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        plan_id INTEGER NOT NULL,
+        start_minute INTEGER NOT NULL,
+        end_minute INTEGER NOT NULL,
+        price_per_kwh REAL NOT NULL,
+        UNIQUE(plan_id, start_minute),
+        FOREIGN KEY(plan_id) REFERENCES tariff_plans(id) ON DELETE CASCADE
+    )''')
 
     # If an old placements table exists with map_name/room_name columns, migrate it now.
     existing_tables = [r[0] for r in c.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
@@ -82,22 +265,25 @@ def init_items_db():
                 FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE CASCADE,
                 FOREIGN KEY(item_type_id) REFERENCES item_types(id) ON DELETE SET NULL
             )''')
-            conn.commit()
-
-            # copy rows resolving names -> ids
-            rows = c.execute("SELECT map_name, room_name, slot_index, item_type_id, on_state, updated_at FROM placements").fetchall()
-            for r in rows:
-                mn = r["map_name"] or ""
-                rn = r["room_name"] or ""
-                mid = add_map_if_not_exists(mn)
-                rid = add_room_if_not_exists(mn, rn)
-                c.execute('INSERT INTO placements_new (map_id, room_id, slot_index, item_type_id, on_state, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
-                          (mid, rid, r["slot_index"], r["item_type_id"], r["on_state"], r["updated_at"]))
-            conn.commit()
+
+            # copy rows resolving names -> ids (missing names become '')
+            c.execute("INSERT OR IGNORE INTO maps (name) SELECT DISTINCT COALESCE(map_name, '') FROM placements")
+            c.execute('''
+                INSERT OR IGNORE INTO rooms (map_id, name)
+                SELECT DISTINCT m.id, COALESCE(p.room_name, '')
+                FROM placements p JOIN maps m ON m.name = COALESCE(p.map_name, '')
+            ''')
+            c.execute('''
+                INSERT INTO placements_new (map_id, room_id, slot_index, item_type_id, on_state, updated_at)
+                SELECT m.id, r.id, p.slot_index, p.item_type_id, p.on_state, p.updated_at
+                FROM placements p
+                JOIN maps m ON m.name = COALESCE(p.map_name, '')
+                JOIN rooms r ON r.map_id = m.id AND r.name = COALESCE(p.room_name, '')
+                ORDER BY p.rowid
+            ''')
             # preserve old as backup, then replace
             c.execute('ALTER TABLE placements RENAME TO placements_old')
             c.execute('ALTER TABLE placements_new RENAME TO placements')
-            conn.commit()
 
     # daily_item_usage migration (map_name/room_name -> ids)
     if 'daily_item_usage' in existing_tables:
@@ -118,19 +304,41 @@ def init_items_db():
                 FOREIGN KEY(map_id) REFERENCES maps(id) ON DELETE SET NULL,
                 FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE SET NULL
             )''')
-            conn.commit()
-            rows = c.execute("SELECT day_index, item_type_id, energy, cost, map_name, room_name, slot_index, created_at FROM daily_item_usage").fetchall()
-            for r in rows:
-                mn = r["map_name"] or None
-                rn = r["room_name"] or None
-                mid = add_map_if_not_exists(mn) if mn else None
-                rid = add_room_if_not_exists(mn, rn) if (mn and rn) else None
-                c.execute('INSERT INTO daily_item_usage_new (day_index, item_type_id, energy, cost, map_id, room_id, slot_index, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
-                          (r["day_index"], r["item_type_id"], r["energy"], r["cost"], mid, rid, r["slot_index"], r["created_at"]))
-            conn.commit()
+            # empty/missing names stay NULL ids
+            c.execute("INSERT OR IGNORE INTO maps (name) SELECT DISTINCT map_name FROM daily_item_usage WHERE COALESCE(map_name, '') <> ''")
+            c.execute('''
+                INSERT OR IGNORE INTO rooms (map_id, name)
+                SELECT DISTINCT m.id, d.room_name
+                FROM daily_item_usage d JOIN maps m ON m.name = d.map_name
+                WHERE COALESCE(d.room_name, '') <> ''
+            ''')
+            c.execute('''
+                INSERT INTO daily_item_usage_new (day_index, item_type_id, energy, cost, map_id, room_id, slot_index, created_at)
+                SELECT d.day_index, d.item_type_id, d.energy, d.cost, m.id, r.id, d.slot_index, d.created_at
+                FROM daily_item_usage d
+                LEFT JOIN maps m ON m.name = NULLIF(d.map_name, '')
+                LEFT JOIN rooms r ON r.map_id = m.id AND r.name = NULLIF(d.room_name, '')
+                ORDER BY d.rowid
+            ''')
             c.execute('ALTER TABLE daily_item_usage RENAME TO daily_item_usage_old')
             c.execute('ALTER TABLE daily_item_usage_new RENAME TO daily_item_usage')
-            conn.commit()
+
+    # per-day, per-item usage history (id-based); record_daily_item_usage() writes here
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS daily_item_usage (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        day_index INTEGER NOT NULL,
+        item_type_id INTEGER,
+        energy REAL NOT NULL DEFAULT 0.0,
+        cost REAL NOT NULL DEFAULT 0.0,
+        map_id INTEGER,
+        room_id INTEGER,
+        slot_index INTEGER,
+        created_at TEXT,
+        FOREIGN KEY(item_type_id) REFERENCES item_types(id) ON DELETE SET NULL,
+        FOREIGN KEY(map_id) REFERENCES maps(id) ON DELETE SET NULL,
+        FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE SET NULL
+    )''')
 
     # ensure placements exist (new schema) if none existed previously
     if 'placements' not in existing_tables:
@@ -148,31 +356,192 @@ def init_items_db():
             FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE CASCADE,
             FOREIGN KEY(item_type_id) REFERENCES item_types(id) ON DELETE SET NULL
         )''')
-        conn.commit()
 
-    conn.close()
+def _migrate_to_v2(conn):
+    """Unique slot keys (for UPSERTs) and covering indexes for usage history."""
+    c = conn.cursor()
+    # placements: one row per slot, keeping the newest if duplicates crept in
+    c.execute('''
+        DELETE FROM placements WHERE id NOT IN (
+            SELECT MAX(id) FROM placements GROUP BY map_id, room_id, slot_index
+        )''')
+    c.execute('CREATE UNIQUE INDEX IF NOT EXISTS ux_placements_slot ON placements (map_id, room_id, slot_index)')
+
+    # daily_item_usage: one row per (day, slot, item); duplicates are summed into the oldest row.
+    # Rows with a NULL in the key never conflict (NULLs are distinct in unique indexes) and are left alone.
+    key = 'day_index, map_id, room_id, slot_index, item_type_id'
+    not_null = 'map_id IS NOT NULL AND room_id IS NOT NULL AND slot_index IS NOT NULL AND item_type_id IS NOT NULL'
+    c.execute('''
+        CREATE TEMP TABLE usage_merge AS
+        SELECT MIN(id) AS keep_id, SUM(energy) AS energy, SUM(cost) AS cost
+        FROM daily_item_usage WHERE %s
+        GROUP BY %s HAVING COUNT(*) > 1''' % (not_null, key))
+    c.execute('''
+        UPDATE daily_item_usage
+        SET energy = (SELECT energy FROM usage_merge WHERE keep_id = daily_item_usage.id),
+            cost = (SELECT cost FROM usage_merge WHERE keep_id = daily_item_usage.id)
+        WHERE id IN (SELECT keep_id FROM usage_merge)''')
+    c.execute('''
+        DELETE FROM daily_item_usage WHERE %s AND id NOT IN (
+            SELECT MIN(id) FROM daily_item_usage WHERE %s GROUP BY %s
+        )''' % (not_null, not_null, key))
+    c.execute('DROP TABLE usage_merge')
+    c.execute('CREATE UNIQUE INDEX IF NOT EXISTS ux_usage_day_slot ON daily_item_usage (%s)' % key)
+    # covering indexes: history by day range, by room and by item never touches the table
+    c.execute('CREATE INDEX IF NOT EXISTS ix_usage_day ON daily_item_usage (day_index, room_id, item_type_id, energy, cost)')
+    c.execute('CREATE INDEX IF NOT EXISTS ix_usage_room ON daily_item_usage (room_id, day_index, energy, cost)')
+    c.execute('CREATE INDEX IF NOT EXISTS ix_usage_item ON daily_item_usage (item_type_id, day_index, energy, cost)')
+
+def _migrate_to_v3(conn):
+    """usage_rollups: energy/cost per day, week and month for each map/room/item."""
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS usage_rollups (
+        period TEXT NOT NULL,
+        period_index INTEGER NOT NULL,
+        map_id INTEGER,
+        room_id INTEGER,
+        item_type_id INTEGER,
+        energy REAL NOT NULL DEFAULT 0.0,
+        cost REAL NOT NULL DEFAULT 0.0
+    )''')
+    c.execute('CREATE INDEX IF NOT EXISTS ix_rollups ON usage_rollups (period, period_index, map_id, room_id, item_type_id, energy, cost)')
+    # backfill from whatever history exists
+    c.execute('DELETE FROM usage_rollups')
+    c.execute('''
+        INSERT INTO usage_rollups (period, period_index, map_id, room_id, item_type_id, energy, cost)
+        SELECT 'day', day_index, map_id, room_id, item_type_id, SUM(energy), SUM(cost)
+        FROM daily_item_usage GROUP BY day_index, map_id, room_id, item_type_id''')
+    for period, days in ROLLUP_PERIODS.items():
+        c.execute('''
+            INSERT INTO usage_rollups (period, period_index, map_id, room_id, item_type_id, energy, cost)
+            SELECT ?, (period_index - 1) / ? + 1 AS p, map_id, room_id, item_type_id, SUM(energy), SUM(cost)
+            FROM usage_rollups WHERE period = 'day'
+            GROUP BY p, map_id, room_id, item_type_id''', (period, days))
+
+def _migrate_to_v4(conn):
+    """load_curve_index: where each slot's per-minute curve lives in the curve file (see database.load_curves)."""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS load_curve_index (
+        day_index INTEGER NOT NULL,
+        map_id INTEGER,
+        room_id INTEGER,
+        slot_index INTEGER,
+        item_type_id INTEGER,
+        curve_row INTEGER NOT NULL,
+        FOREIGN KEY(map_id) REFERENCES maps(id) ON DELETE SET NULL,
+        FOREIGN KEY(room_id) REFERENCES rooms(id) ON DELETE SET NULL,
+        FOREIGN KEY(item_type_id) REFERENCES item_types(id) ON DELETE SET NULL
+    )''')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS ux_load_curve_slot ON load_curve_index (day_index, map_id, room_id, slot_index, item_type_id)')
+
+def _migrate_to_v5(conn):
+    """Slot keys that also hold for rows with a NULL map/room/slot/item (see SLOT_DAY_KEY)."""
+    c = conn.cursor()
+    # daily_item_usage: these copies were written by the replacing upsert, which missed them;
+    # keep the newest, as it would have
+    c.execute('''
+        DELETE FROM daily_item_usage WHERE id NOT IN (
+            SELECT MAX(id) FROM daily_item_usage GROUP BY %s
+        )''' % SLOT_DAY_KEY)
+    c.execute('DROP INDEX IF EXISTS ux_usage_day_slot')
+    c.execute('CREATE UNIQUE INDEX ux_usage_day_slot ON daily_item_usage (%s)' % SLOT_DAY_KEY)
+    # the rollups counted the removed copies too: rebuild them as the v3 backfill does
+    c.execute('DELETE FROM usage_rollups')
+    c.execute('''
+        INSERT INTO usage_rollups (period, period_index, map_id, room_id, item_type_id, energy, cost)
+        SELECT 'day', day_index, map_id, room_id, item_type_id, SUM(energy), SUM(cost)
+        FROM daily_item_usage GROUP BY day_index, map_id, room_id, item_type_id''')
+    for period, days in ROLLUP_PERIODS.items():
+        c.execute('''
+            INSERT INTO usage_rollups (period, period_index, map_id, room_id, item_type_id, energy, cost)
+            SELECT ?, (period_index - 1) / ? + 1 AS p, map_id, room_id, item_type_id, SUM(energy), SUM(cost)
+            FROM usage_rollups WHERE period = 'day'
+            GROUP BY p, map_id, room_id, item_type_id''', (period, days))
+
+    # load_curve_index: recording a key again points it at a newer, higher curve row
+    c.execute('''
+        DELETE FROM load_curve_index WHERE rowid NOT IN (
+            SELECT rowid FROM (
+                SELECT rowid, ROW_NUMBER() OVER (PARTITION BY %s ORDER BY curve_row DESC) AS n
+                FROM load_curve_index
+            ) WHERE n = 1
+        )''' % SLOT_DAY_KEY)
+    c.execute('DROP INDEX IF EXISTS ux_load_curve_slot')
+    c.execute('CREATE UNIQUE INDEX ux_load_curve_slot ON load_curve_index (%s)' % SLOT_DAY_KEY)
+
+# Schema migrations, applied in order by init_items_db(). PRAGMA user_version
+# records the last one applied, so a warm start costs a single pragma read.
+# Add new schema changes as a new function at the end of this list; never edit
+# one that has shipped.
+MIGRATIONS = [
+    _migrate_to_v1,
+    _migrate_to_v2,
+    _migrate_to_v3,
+    _migrate_to_v4,
+    _migrate_to_v5,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_schema_version(conn=None):
+    conn = conn or get_conn()
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def init_items_db():
+    """Bring the schema up to SCHEMA_VERSION; does nothing if it already is."""
+    if get_schema_version() >= SCHEMA_VERSION:
+        return
+    with transaction() as conn:
+        # re-read under the write lock in case another process migrated meanwhile
+        version = get_schema_version(conn)
+        for target, migrate in enumerate(MIGRATIONS[version:], version + 1):
+            migrate(conn)
+            conn.execute("PRAGMA user_version = %d" % target)
 
 # ------------- basic compatibility helpers (unchanged behaviour) -------------
 def add_item_type_if_not_exists(name, category, energy_per_min=0.0, cost_per_kwh=0.0, icon_path=None):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute('SELECT id FROM item_types WHERE name = ?', (name,))
-    if c.fetchone():
-        conn.close()
+    if _cached_id(_item_type_ids, name) is not None:
         return None
-    c.execute('INSERT INTO item_types (name, category, energy_per_min, cost_per_kwh, icon_path) VALUES (?, ?, ?, ?, ?)',
-              (name, category, energy_per_min, cost_per_kwh, icon_path))
-    conn.commit()
-    item_id = c.lastrowid
-    conn.close()
-    return item_id
+    with transaction() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id FROM item_types WHERE name = ?', (name,))
+        r = c.fetchone()
+        if r:
+            _remember_id(_item_type_ids, name, r['id'])
+            return None
+        c.execute('INSERT INTO item_types (name, category, energy_per_min, cost_per_kwh, icon_path) VALUES (?, ?, ?, ?, ?)',
+                  (name, category, energy_per_min, cost_per_kwh, icon_path))
+        item_id = c.lastrowid
+        _remember_id(_item_type_ids, name, item_id)
+        return item_id
+
+def add_item_types_if_not_exist(rows):
+    """Bulk add_item_type_if_not_exists in one executemany; names already stored are left alone.
+       rows: [(name, category, energy_per_min, cost_per_kwh, icon_path), ...]. Returns how many were new."""
+    with transaction() as conn:
+        before = conn.total_changes
+        conn.executemany('''
+            INSERT INTO item_types (name, category, energy_per_min, cost_per_kwh, icon_path) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO NOTHING
+        ''', rows)
+        return conn.total_changes - before
+
+def get_item_type_id(name):
+    """item_types.id for an item name, or None if there is no such item."""
+    item_id = _cached_id(_item_type_ids, name)
+    if item_id is not None:
+        return item_id
+    r = get_conn().execute('SELECT id FROM item_types WHERE name = ?', (name,)).fetchone()
+    if r is None:
+        return None
+    _remember_id(_item_type_ids, name, r['id'])
+    return r['id']
 
 def get_items_by_category(category):
     conn = get_conn()
     c = conn.cursor()
     c.execute('SELECT * FROM item_types WHERE category = ? ORDER BY name', (category,))
     rows = c.fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 def get_all_items():
@@ -180,107 +549,137 @@ def get_all_items():
     c = conn.cursor()
     c.execute('SELECT * FROM item_types ORDER BY category, name')
     rows = c.fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 # ------------- normalized helpers (maps/rooms/categories) -------------
 def add_category_if_not_exists(name):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute('SELECT id FROM categories WHERE name = ?', (name,))
-    r = c.fetchone()
-    if r:
-        conn.close()
-        return r['id']
-    c.execute('INSERT INTO categories (name) VALUES (?)', (name,))
-    conn.commit()
-    cid = c.lastrowid
-    conn.close()
-    return cid
+    cid = _cached_id(_category_ids, name)
+    if cid is not None:
+        return cid
+    with transaction() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id FROM categories WHERE name = ?', (name,))
+        r = c.fetchone()
+        if r:
+            cid = r['id']
+        else:
+            c.execute('INSERT INTO categories (name) VALUES (?)', (name,))
+            cid = c.lastrowid
+        _remember_id(_category_ids, name, cid)
+        return cid
 
 def add_map_if_not_exists(map_name):
     if map_name is None:
         return None
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute('SELECT id FROM maps WHERE name = ?', (map_name,))
-    r = c.fetchone()
-    if r:
-        conn.close()
-        return r['id']
-    c.execute('INSERT INTO maps (name) VALUES (?)', (map_name,))
-    conn.commit()
-    mid = c.lastrowid
-    conn.close()
-    return mid
+    mid = _cached_id(_map_ids, map_name)
+    if mid is not None:
+        return mid
+    with transaction() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id FROM maps WHERE name = ?', (map_name,))
+        r = c.fetchone()
+        if r:
+            mid = r['id']
+        else:
+            c.execute('INSERT INTO maps (name) VALUES (?)', (map_name,))
+            mid = c.lastrowid
+        _remember_id(_map_ids, map_name, mid)
+        return mid
 
 def add_room_if_not_exists(map_name, room_name):
     if map_name is None or room_name is None:
         return None
-    conn = get_conn()
-    c = conn.cursor()
     mid = add_map_if_not_exists(map_name)
-    c.execute('SELECT id FROM rooms WHERE map_id = ? AND name = ?', (mid, room_name))
-    r = c.fetchone()
-    if r:
-        conn.close()
-        return r['id']
-    c.execute('INSERT INTO rooms (map_id, name) VALUES (?, ?)', (mid, room_name))
-    conn.commit()
-    rid = c.lastrowid
-    conn.close()
-    return rid
+    rid = _cached_id(_room_ids, (mid, room_name))
+    if rid is not None:
+        return rid
+    with transaction() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id FROM rooms WHERE map_id = ? AND name = ?', (mid, room_name))
+        r = c.fetchone()
+        if r:
+            rid = r['id']
+        else:
+            c.execute('INSERT INTO rooms (map_id, name) VALUES (?, ?)', (mid, room_name))
+            rid = c.lastrowid
+        _remember_id(_room_ids, (mid, room_name), rid)
+        return rid
 
 def add_room_slot(map_name, room_name, slot_index, slot_name, category):
-    conn = get_conn()
-    c = conn.cursor()
-    room_id = add_room_if_not_exists(map_name, room_name)
-    c.execute('SELECT id FROM room_slots WHERE room_id = ? AND slot_index = ?', (room_id, slot_index))
-    if c.fetchone():
-        conn.close()
-        return None
-    c.execute('INSERT INTO room_slots (room_id, slot_index, name, category) VALUES (?, ?, ?, ?)',
-              (room_id, slot_index, slot_name, category))
-    conn.commit()
-    sid = c.lastrowid
-    conn.close()
-    return sid
+    with transaction() as conn:
+        c = conn.cursor()
+        room_id = add_room_if_not_exists(map_name, room_name)
+        c.execute('SELECT id FROM room_slots WHERE room_id = ? AND slot_index = ?', (room_id, slot_index))
+        if c.fetchone():
+            return None
+        c.execute('INSERT INTO room_slots (room_id, slot_index, name, category) VALUES (?, ?, ?, ?)',
+                  (room_id, slot_index, slot_name, category))
+        sid = c.lastrowid
+        return sid
 
 # ------------- placements (id-based) -------------
-def save_placement_by_ids(map_id, room_id, slot_index, item_identifier, on_state=False):
-    conn = get_conn()
-    c = conn.cursor()
-    item_id = None
+_UPSERT_PLACEMENT = '''
+    INSERT INTO placements (map_id, room_id, slot_index, item_type_id, on_state, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (map_id, room_id, slot_index) DO UPDATE SET
+        item_type_id = excluded.item_type_id, on_state = excluded.on_state, updated_at = excluded.updated_at
+'''
+
+def _item_type_ref(item_identifier):
     if isinstance(item_identifier, int):
-        item_id = item_identifier
-    elif isinstance(item_identifier, str):
-        c.execute('SELECT id FROM item_types WHERE name = ?', (item_identifier,))
-        r = c.fetchone()
-        if r:
-            item_id = r['id']
-    updated_at = datetime.utcnow().isoformat()
-    c.execute('SELECT id FROM placements WHERE map_id = ? AND room_id = ? AND slot_index = ?', (map_id, room_id, slot_index))
-    row = c.fetchone()
-    if row:
-        c.execute('UPDATE placements SET item_type_id = ?, on_state = ?, updated_at = ? WHERE id = ?',
-                  (item_id, 1 if on_state else 0, updated_at, row['id']))
-    else:
-        c.execute('INSERT INTO placements (map_id, room_id, slot_index, item_type_id, on_state, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
-                  (map_id, room_id, slot_index, item_id, 1 if on_state else 0, updated_at))
-    conn.commit()
-    conn.close()
+        return item_identifier
+    if isinstance(item_identifier, str):
+        return get_item_type_id(item_identifier)
+    return None
+
+def save_placement_by_ids(map_id, room_id, slot_index, item_identifier, on_state=False):
+    with transaction() as conn:
+        item_id = _item_type_ref(item_identifier)
+        updated_at = datetime.utcnow().isoformat()
+        conn.execute(_UPSERT_PLACEMENT, (map_id, room_id, slot_index, item_id, 1 if on_state else 0, updated_at))
+
+def save_placements_batch(rows):
+    """Upsert many placements with one executemany; a slot given twice keeps the last row.
+       rows: [(map_name, room_name, slot_index, item_identifier, on_state, updated_at or None), ...]"""
+    now = datetime.utcnow().isoformat()
+    params = []
+    with transaction() as conn:
+        for map_name, room_name, slot_index, item_identifier, on_state, updated_at in rows:
+            params.append((add_map_if_not_exists(map_name), add_room_if_not_exists(map_name, room_name), slot_index,
+                           _item_type_ref(item_identifier), 1 if on_state else 0, updated_at or now))
+        conn.executemany(_UPSERT_PLACEMENT, params)
+    return len(params)
+
+def iter_placements(batch_size=1000):
+    """Yield every placement with map/room/item names, fetchmany batch by batch."""
+    c = get_conn().cursor()
+    c.execute('''
+        SELECT m.name AS map_name, r.name AS room_name, p.slot_index, it.name AS item_name, p.on_state, p.updated_at
+        FROM placements p
+        LEFT JOIN maps m ON p.map_id = m.id
+        LEFT JOIN rooms r ON p.room_id = r.id
+        LEFT JOIN item_types it ON p.item_type_id = it.id
+        ORDER BY p.id
+    ''')
+    while True:
+        rows = c.fetchmany(batch_size)
+        if not rows:
+            break
+        for r in rows:
+            yield dict(r)
 
 def save_placement(map_name_or_id, room_name_or_id, slot_index, item_identifier, on_state=False):
     """Backwards-compatible: accept map/room names or ids."""
-    if isinstance(map_name_or_id, int):
-        map_id = map_name_or_id
-    else:
-        map_id = add_map_if_not_exists(map_name_or_id)
-    if isinstance(room_name_or_id, int):
-        room_id = room_name_or_id
-    else:
-        room_id = add_room_if_not_exists(map_name_or_id, room_name_or_id)
-    save_placement_by_ids(map_id, room_id, slot_index, item_identifier, on_state)
+    # one transaction for the id lookups/inserts and the placement write
+    with transaction():
+        if isinstance(map_name_or_id, int):
+            map_id = map_name_or_id
+        else:
+            map_id = add_map_if_not_exists(map_name_or_id)
+        if isinstance(room_name_or_id, int):
+            room_id = room_name_or_id
+        else:
+            room_id = add_room_if_not_exists(map_name_or_id, room_name_or_id)
+        save_placement_by_ids(map_id, room_id, slot_index, item_identifier, on_state)
 
 def load_placements_for_map(map_name_or_id):
     """Return placements keyed by room name: { room_name: { slot_index: {"item":..., "on":bool} } }"""
@@ -313,43 +712,101 @@ def load_placements_for_map(map_name_or_id):
                 "energy_per_min": r['energy_per_min'],
                 "cost_per_kwh": r['cost_per_kwh']
             }, "on": bool(r['on_state'])}
-    conn.close()
     return out
 
 def clear_placements_for_map(map_name_or_id):
-    conn = get_conn()
-    c = conn.cursor()
-    if isinstance(map_name_or_id, int):
-        c.execute('DELETE FROM placements WHERE map_id = ?', (map_name_or_id,))
-    else:
-        mid = add_map_if_not_exists(map_name_or_id)
-        c.execute('DELETE FROM placements WHERE map_id = ?', (mid,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        c = conn.cursor()
+        if isinstance(map_name_or_id, int):
+            c.execute('DELETE FROM placements WHERE map_id = ?', (map_name_or_id,))
+        else:
+            mid = add_map_if_not_exists(map_name_or_id)
+            c.execute('DELETE FROM placements WHERE map_id = ?', (mid,))
 
 # ------------- daily usage recording (store map_id/room_id) -------------
-def record_daily_item_usage(day_index, item_type_id, energy, cost, map_name_or_id=None, room_name_or_id=None, slot_index=None):
-    conn = get_conn()
+# Recording the same (day, map, room, slot, item) again replaces the earlier energy/cost.
+_UPSERT_USAGE = '''
+    INSERT INTO daily_item_usage (day_index, item_type_id, energy, cost, map_id, room_id, slot_index, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (%s) DO UPDATE SET
+        energy = excluded.energy, cost = excluded.cost, created_at = excluded.created_at
+''' % SLOT_DAY_KEY
+
+def period_of_day(day_index, period):
+    """Index of the week/month (or the day itself) that day_index falls in."""
+    if period == "day":
+        return day_index
+    return (day_index - 1) // ROLLUP_PERIODS[period] + 1
+
+def _refresh_rollups(conn, days):
+    """Rebuild the day rollups of `days` from daily_item_usage, then the weeks and
+       months containing them from the day rollups: O(rows of the touched days)."""
+    days = sorted(set(d for d in days if d is not None))
+    if not days:
+        return
     c = conn.cursor()
-    map_id = None
-    room_id = None
-    if map_name_or_id is not None:
-        if isinstance(map_name_or_id, int):
-            map_id = map_name_or_id
-        else:
-            map_id = add_map_if_not_exists(map_name_or_id)
-    if room_name_or_id is not None:
-        if isinstance(room_name_or_id, int):
-            room_id = room_name_or_id
-        else:
-            room_id = add_room_if_not_exists(map_name_or_id, room_name_or_id)
-    created_at = datetime.utcnow().isoformat()
-    c.execute('''
-        INSERT INTO daily_item_usage (day_index, item_type_id, energy, cost, map_id, room_id, slot_index, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (day_index, item_type_id, energy, cost, map_id, room_id, slot_index, created_at))
-    conn.commit()
-    conn.close()
+    for d in days:
+        c.execute("DELETE FROM usage_rollups WHERE period = 'day' AND period_index = ?", (d,))
+        c.execute('''
+            INSERT INTO usage_rollups (period, period_index, map_id, room_id, item_type_id, energy, cost)
+            SELECT 'day', day_index, map_id, room_id, item_type_id, SUM(energy), SUM(cost)
+            FROM daily_item_usage WHERE day_index = ?
+            GROUP BY map_id, room_id, item_type_id''', (d,))
+    for period, length in ROLLUP_PERIODS.items():
+        for p in sorted(set(period_of_day(d, period) for d in days)):
+            first, last = (p - 1) * length + 1, p * length
+            c.execute('DELETE FROM usage_rollups WHERE period = ? AND period_index = ?', (period, p))
+            c.execute('''
+                INSERT INTO usage_rollups (period, period_index, map_id, room_id, item_type_id, energy, cost)
+                SELECT ?, ?, map_id, room_id, item_type_id, SUM(energy), SUM(cost)
+                FROM usage_rollups WHERE period = 'day' AND period_index BETWEEN ? AND ?
+                GROUP BY map_id, room_id, item_type_id''', (period, p, first, last))
+
+def record_daily_item_usage(day_index, item_type_id, energy, cost, map_name_or_id=None, room_name_or_id=None, slot_index=None):
+    with transaction() as conn:
+        c = conn.cursor()
+        map_id = None
+        room_id = None
+        if map_name_or_id is not None:
+            if isinstance(map_name_or_id, int):
+                map_id = map_name_or_id
+            else:
+                map_id = add_map_if_not_exists(map_name_or_id)
+        if room_name_or_id is not None:
+            if isinstance(room_name_or_id, int):
+                room_id = room_name_or_id
+            else:
+                room_id = add_room_if_not_exists(map_name_or_id, room_name_or_id)
+        created_at = datetime.utcnow().isoformat()
+        c.execute(_UPSERT_USAGE, (day_index, item_type_id, energy, cost, map_id, room_id, slot_index, created_at))
+        _refresh_rollups(conn, [day_index])
+
+def record_daily_usage_batch(rows):
+    """Insert many usage rows in one transaction with a single executemany.
+       rows: [(day_index, item_type_id, energy, cost, map_name_or_id, room_name_or_id, slot_index), ...]
+       optionally with an 8th created_at value (kept when importing history).
+       Map/room names go through the id caches, so known names cost no queries."""
+    now = datetime.utcnow().isoformat()
+    params = []
+    with transaction() as conn:
+        for row in rows:
+            day_index, item_type_id, energy, cost, map_ref, room_ref, slot_index = row[:7]
+            created_at = row[7] if len(row) > 7 and row[7] else now
+            map_id = None
+            room_id = None
+            if map_ref is not None:
+                map_id = map_ref if isinstance(map_ref, int) else add_map_if_not_exists(map_ref)
+            if room_ref is not None:
+                room_id = room_ref if isinstance(room_ref, int) else add_room_if_not_exists(map_ref, room_ref)
+            params.append((day_index, item_type_id, energy, cost, map_id, room_id, slot_index, created_at))
+        conn.executemany(_UPSERT_USAGE, params)
+        _refresh_rollups(conn, [p[0] for p in params])
+    return len(params)
+
+def get_last_day_index():
+    """Highest day_index recorded in daily_item_usage (0 when there is no history)."""
+    r = get_conn().execute('SELECT MAX(day_index) AS last FROM daily_item_usage').fetchone()
+    return r['last'] or 0
 
 def get_daily_usage_for_day(day_index):
     conn = get_conn()
@@ -364,21 +821,147 @@ def get_daily_usage_for_day(day_index):
         ORDER BY energy DESC
     ''', (day_index,))
     rows = c.fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
+_USAGE_GROUPS = {
+    # by: (grouping column, outer SELECT adding names after aggregation)
+    "day": ("day_index", "SELECT g.key AS day_index, g.energy, g.cost FROM ({inner}) g ORDER BY g.key"),
+    "room": ("room_id", '''
+        SELECT g.key AS room_id, m.name AS map_name, r.name AS room_name, g.energy, g.cost FROM ({inner}) g
+        LEFT JOIN rooms r ON r.id = g.key LEFT JOIN maps m ON m.id = r.map_id ORDER BY g.energy DESC'''),
+    "item": ("item_type_id", '''
+        SELECT g.key AS item_type_id, it.name AS item_name, g.energy, g.cost FROM ({inner}) g
+        LEFT JOIN item_types it ON it.id = g.key ORDER BY g.energy DESC'''),
+}
+
+def get_usage_totals(start_day=None, end_day=None, by="day"):
+    """Energy/cost summed per day, room or item over a day range (inclusive; None = open).
+       Aggregates straight off the covering index; names are joined on afterwards."""
+    if by not in _USAGE_GROUPS:
+        raise ValueError(f"unknown grouping {by!r} (expected one of {tuple(_USAGE_GROUPS)})")
+    column, outer = _USAGE_GROUPS[by]
+    inner = ('SELECT %s AS key, SUM(energy) AS energy, SUM(cost) AS cost FROM daily_item_usage '
+             'WHERE day_index BETWEEN ? AND ? GROUP BY %s' % (column, column))
+    lo = start_day if start_day is not None else -2**63
+    hi = end_day if end_day is not None else 2**63 - 1
+    rows = get_conn().execute(outer.format(inner=inner), (lo, hi)).fetchall()
+    return [dict(r) for r in rows]
+
+def get_usage_history(room_id=None, item_type_id=None, start_day=None, end_day=None):
+    """Per-day [{"day_index", "energy", "cost"}] for one room or one item (index-only)."""
+    if (room_id is None) == (item_type_id is None):
+        raise ValueError("give exactly one of room_id or item_type_id")
+    column, value = ("room_id", room_id) if room_id is not None else ("item_type_id", item_type_id)
+    lo = start_day if start_day is not None else -2**63
+    hi = end_day if end_day is not None else 2**63 - 1
+    rows = get_conn().execute('''
+        SELECT day_index, SUM(energy) AS energy, SUM(cost) AS cost FROM daily_item_usage
+        WHERE %s = ? AND day_index BETWEEN ? AND ?
+        GROUP BY day_index ORDER BY day_index''' % column, (value, lo, hi)).fetchall()
+    return [dict(r) for r in rows]
+
+_ROLLUP_GROUPS = {
+    # by: (extra SELECT column, outer SELECT adding names, GROUP BY)
+    "room": ("room_id, ", '''
+        SELECT g.room_id, m.name AS map_name, r.name AS room_name, g.energy, g.cost, g.periods FROM ({inner}) g
+        LEFT JOIN rooms r ON r.id = g.room_id LEFT JOIN maps m ON m.id = r.map_id ORDER BY g.energy DESC''', "GROUP BY room_id"),
+    "item": ("item_type_id, ", '''
+        SELECT g.item_type_id, it.name AS item_name, g.energy, g.cost, g.periods FROM ({inner}) g
+        LEFT JOIN item_types it ON it.id = g.item_type_id ORDER BY g.energy DESC''', "GROUP BY item_type_id"),
+}
+
+def get_rollups(period, start=None, end=None, by="total"):
+    """Pre-aggregated energy/cost for periods start..end (inclusive) of 'day'/'week'/'month',
+       as one total row or one row per room/item; "periods" counts the periods with data."""
+    if period != "day" and period not in ROLLUP_PERIODS:
+        raise ValueError(f"unknown period {period!r}")
+    lo = start if start is not None else -2**63
+    hi = end if end is not None else 2**63 - 1
+    if by == "total":
+        r = get_conn().execute('''
+            SELECT COALESCE(SUM(energy), 0.0) AS energy, COALESCE(SUM(cost), 0.0) AS cost,
+                   COUNT(DISTINCT period_index) AS periods
+            FROM usage_rollups WHERE period = ? AND period_index BETWEEN ? AND ?''', (period, lo, hi)).fetchone()
+        return dict(r)
+    if by not in _ROLLUP_GROUPS:
+        raise ValueError(f"unknown grouping {by!r} (expected 'total', 'room' or 'item')")
+    select, outer, group = _ROLLUP_GROUPS[by]
+    inner = ('SELECT %sSUM(energy) AS energy, SUM(cost) AS cost, COUNT(DISTINCT period_index) AS periods '
+             'FROM usage_rollups WHERE period = ? AND period_index BETWEEN ? AND ? %s' % (select, group))
+    rows = get_conn().execute(outer.format(inner=inner), (period, lo, hi)).fetchall()
+    return [dict(r) for r in rows]
+
+def iter_daily_item_usage(batch_size=1000):
+    """Yield every usage row (with item/map/room names) without loading the whole table.
+       curve_row is the row of the slot's per-minute curve in database.load_curves, or None
+       (matched on SLOT_DAY_KEY, so rows with a NULL map/room/slot/item find theirs too)."""
+    # own cursor on the shared connection, so other helpers can run between batches
+    c = get_conn().cursor()
+    c.execute('''
+        SELECT diu.id, diu.day_index, diu.energy, diu.cost, diu.slot_index, diu.created_at,
+               it.name AS item_name, m.name AS map_name, r.name AS room_name, lc.curve_row
+        FROM daily_item_usage diu
+        LEFT JOIN item_types it ON diu.item_type_id = it.id
+        LEFT JOIN maps m ON diu.map_id = m.id
+        LEFT JOIN rooms r ON diu.room_id = r.id
+        LEFT JOIN load_curve_index lc ON lc.day_index = diu.day_index
+            AND COALESCE(lc.map_id, -1) = COALESCE(diu.map_id, -1) AND COALESCE(lc.room_id, -1) = COALESCE(diu.room_id, -1)
+            AND COALESCE(lc.slot_index, -1) = COALESCE(diu.slot_index, -1)
+            AND COALESCE(lc.item_type_id, -1) = COALESCE(diu.item_type_id, -1)
+        ORDER BY diu.id
+    ''')
+    while True:
+        rows = c.fetchmany(batch_size)
+        if not rows:
+            break
+        for r in rows:
+            yield dict(r)
+
+# ------------- tariff plans -------------
+def add_tariff_plan_if_not_exists(name, bands, description=None):
+    """bands: [(start_minute, end_minute, price_per_kwh), ...]. Returns the new id, or None if the plan exists."""
+    with transaction() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id FROM tariff_plans WHERE name = ?', (name,))
+        if c.fetchone():
+            return None
+        c.execute('INSERT INTO tariff_plans (name, description) VALUES (?, ?)', (name, description))
+        plan_id = c.lastrowid
+        c.executemany('INSERT INTO tariff_bands (plan_id, start_minute, end_minute, price_per_kwh) VALUES (?, ?, ?, ?)',
+                      [(plan_id, int(start), int(end), float(price)) for start, end, price in bands])
+        return plan_id
+
+def get_tariff_plans():
+    conn = get_conn()
+    c = conn.cursor()
+    c.execute('SELECT * FROM tariff_plans ORDER BY name')
+    rows = c.fetchall()
+    return [dict(r) for r in rows]
+
+def get_tariff_bands(plan_name):
+    """[(start_minute, end_minute, price_per_kwh), ...] for plan_name, ordered by start."""
+    conn = get_conn()
+    c = conn.cursor()
+    c.execute('''
+        SELECT b.start_minute, b.end_minute, b.price_per_kwh
+        FROM tariff_bands b
+        JOIN tariff_plans p ON b.plan_id = p.id
+        WHERE p.name = ?
+        ORDER BY b.start_minute
+    ''', (plan_name,))
+    rows = c.fetchall()
+    return [(r['start_minute'], r['end_minute'], r['price_per_kwh']) for r in rows]
+
 # -------------------
 # Migration helper (to populate categories table from existing item rows)
 # -------------------
 def migrate_text_categories_to_categories_table():
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute('SELECT DISTINCT category FROM item_types')
-    for (cat,) in c.fetchall():
-        if cat:
-            c.execute('INSERT OR IGNORE INTO categories (name) VALUES (?)', (cat,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        c = conn.cursor()
+        c.execute('SELECT DISTINCT category FROM item_types')
+        for (cat,) in c.fetchall():
+            if cat:
+                c.execute('INSERT OR IGNORE INTO categories (name) VALUES (?)', (cat,))
 
 # Ensure DB schema + migration runs when module is imported
 try:
@@ -0,0 +1,174 @@
+"""Per-minute load curves, one per slot per simulated day.
+
+Each curve is 1440 float32 values (kWh drawn in each minute of the day), i.e. a
+fixed 5760-byte row. Rows are appended to one flat binary file next to the DB
+and SQLite's load_curve_index table maps (day, map, room, slot, item) to a row
+number. Reads memory-map the file, so a day's curves (appended together) come
+back as a zero-copy slice. A slot recorded again for the same day gets a new row
+and the index is repointed; the old row is simply no longer referenced.
+
+A year of curves for a 30-slot map is about 365 * 30 * 5760 bytes = 63 MB; only
+slots that held an item that day get a row.
+"""
+import os
+
+import numpy as np
+
+from database import items_db
+from database.items_db import transaction, get_conn, add_map_if_not_exists, add_room_if_not_exists, SLOT_DAY_KEY
+
+MINUTES = 1440
+DTYPE = np.float32
+ROW_BYTES = MINUTES * np.dtype(DTYPE).itemsize
+
+
+def default_path():
+    return os.path.splitext(items_db.DB_PATH)[0] + "_curves.f32"
+
+
+class LoadCurveStore:
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self._map = None
+        self._map_rows = 0
+
+    @property
+    def row_count(self):
+        try:
+            return os.path.getsize(self.path) // ROW_BYTES
+        except OSError:
+            return 0
+
+    def append_day(self, day_index, curves):
+        """curves: [(map_name, room_name, slot_index, item_type_id, curve), ...] with curve
+           1440 kWh-per-minute values. Written as one block plus one indexed executemany."""
+        return self.append_rows([(day_index,) + tuple(c) for c in curves])
+
+    def append_rows(self, rows):
+        """Like append_day, but each row carries its own day:
+           [(day_index, map_name, room_name, slot_index, item_type_id, curve), ...]."""
+        if not rows:
+            return 0
+        block = np.empty((len(rows), MINUTES), dtype=DTYPE)
+        for n, row in enumerate(rows):
+            block[n] = row[5]
+        mode = "r+b" if os.path.exists(self.path) else "w+b"
+        with open(self.path, mode) as fh:
+            # start at the last whole row, so a torn write from a crash gets overwritten
+            first = self.row_count
+            fh.seek(first * ROW_BYTES)
+            fh.write(block.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+        params = []
+        with transaction() as conn:
+            for n, (day_index, map_name, room_name, slot_index, item_type_id, _) in enumerate(rows):
+                params.append((day_index, add_map_if_not_exists(map_name), add_room_if_not_exists(map_name, room_name),
+                               slot_index, item_type_id, first + n))
+            conn.executemany('''
+                INSERT INTO load_curve_index (day_index, map_id, room_id, slot_index, item_type_id, curve_row)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (%s) DO UPDATE SET curve_row = excluded.curve_row
+            ''' % SLOT_DAY_KEY, params)
+        return len(params)
+
+    def truncate(self, rows):
+        """Cut the file back to its first `rows` rows, e.g. to drop curves appended by a
+           transaction that rolled back (their index rows are gone, so nothing refers to them)."""
+        if self.row_count <= rows:
+            return
+        self._map = None
+        self._map_rows = 0
+        with open(self.path, "r+b") as fh:
+            fh.truncate(rows * ROW_BYTES)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def replace_rows(self, rows):
+        """append_rows for imports: a (day, map, room, slot, item) that is already indexed has its
+           curve overwritten in place instead of getting a new row, so importing the same curves
+           twice leaves the file the same size. Within rows, the last curve for a key wins."""
+        latest = {}
+        for row in rows:
+            latest[tuple(row[:5])] = row
+        conn = get_conn()
+        existing = self.row_count
+        in_place = []
+        fresh = []
+        for (day_index, map_name, room_name, slot_index, item_type_id), row in latest.items():
+            # the expressions of ux_load_curve_slot, so this is one index probe
+            r = conn.execute('''
+                SELECT curve_row FROM load_curve_index
+                WHERE day_index = ? AND COALESCE(map_id, -1) = COALESCE(?, -1) AND COALESCE(room_id, -1) = COALESCE(?, -1)
+                  AND COALESCE(slot_index, -1) = COALESCE(?, -1) AND COALESCE(item_type_id, -1) = COALESCE(?, -1)
+            ''', (day_index, add_map_if_not_exists(map_name), add_room_if_not_exists(map_name, room_name),
+                  slot_index, item_type_id)).fetchone()
+            if r is not None and r["curve_row"] < existing:
+                in_place.append((r["curve_row"], row[5]))
+            else:
+                fresh.append(row)
+        if in_place:
+            with open(self.path, "r+b") as fh:
+                for curve_row, curve in sorted(in_place, key=lambda c: c[0]):
+                    fh.seek(curve_row * ROW_BYTES)
+                    fh.write(np.asarray(curve, dtype=DTYPE).tobytes())
+                fh.flush()
+                os.fsync(fh.fileno())
+        return len(in_place) + self.append_rows(fresh)
+
+    def matrix(self):
+        """The whole file as a read-only (rows x 1440) memory map (reopened when it has grown)."""
+        rows = self.row_count
+        if self._map is None or rows != self._map_rows:
+            self._map = np.memmap(self.path, dtype=DTYPE, mode="r", shape=(rows, MINUTES)) if rows else np.zeros((0, MINUTES), dtype=DTYPE)
+            self._map_rows = rows
+        return self._map
+
+    def curves(self, rows):
+        """Curves for the given row numbers: a zero-copy slice when they are contiguous."""
+        m = self.matrix()
+        rows = np.asarray(rows, dtype=np.intp)
+        if len(rows) and rows[-1] - rows[0] == len(rows) - 1 and (np.diff(rows) == 1).all():
+            return m[rows[0]:rows[-1] + 1]
+        return m[rows]
+
+    def load(self, start_day, end_day, map_name=None, room_name=None):
+        """(index rows, curves) for days start_day..end_day, optionally one map/room.
+           Index rows are dicts: day_index, map_name, room_name, slot_index, item_type_id, curve_row."""
+        sql = '''
+            SELECT lc.day_index, m.name AS map_name, r.name AS room_name, lc.slot_index, lc.item_type_id, lc.curve_row
+            FROM load_curve_index lc
+            LEFT JOIN maps m ON m.id = lc.map_id
+            LEFT JOIN rooms r ON r.id = lc.room_id
+            WHERE lc.day_index BETWEEN ? AND ?'''
+        args = [start_day, end_day]
+        if map_name is not None:
+            sql += ' AND m.name = ?'
+            args.append(map_name)
+        if room_name is not None:
+            sql += ' AND r.name = ?'
+            args.append(room_name)
+        sql += ' ORDER BY lc.curve_row'
+        index = [dict(r) for r in get_conn().execute(sql, args).fetchall()]
+        return index, self.curves([r["curve_row"] for r in index])
+
+    def iter_curves(self, batch_size=1000):
+        """Yield (index row, curve) for every indexed curve in file order, batch_size index rows
+           (and one memory-mapped slice of curves) at a time. Index rows carry item_name too."""
+        c = get_conn().cursor()
+        c.execute('''
+            SELECT lc.day_index, m.name AS map_name, r.name AS room_name, lc.slot_index,
+                   lc.item_type_id, it.name AS item_name, lc.curve_row
+            FROM load_curve_index lc
+            LEFT JOIN maps m ON m.id = lc.map_id
+            LEFT JOIN rooms r ON r.id = lc.room_id
+            LEFT JOIN item_types it ON it.id = lc.item_type_id
+            ORDER BY lc.curve_row
+        ''')
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                break
+            index = [dict(r) for r in rows]
+            for r, curve in zip(index, self.curves([r["curve_row"] for r in index])):
+                yield r, curve
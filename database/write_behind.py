@@ -0,0 +1,256 @@
+"""Background writer so the pygame loop never waits on SQLite.
+
+The UI hands placement changes (place/remove/toggle) and usage records to a
+WriteBehindQueue and carries on. A worker thread collects them and writes them
+in one transaction when the flush interval passes, when enough changes have
+built up, or when flush() / close() asks for it. Placement changes are
+coalesced per slot (only the latest state of a slot is written), usage records
+are written as they came.
+
+A batch whose transaction fails is put back in front of anything queued since
+and retried after retry_delay, doubling each time; after max_retries failed
+retries it is dropped. stats() reports retries, dropped rows and the last
+error, and flush(wait=True) returns False if rows it waited for were dropped.
+
+read_after_flush() runs a query on the worker once what was queued before it
+is in the database, and hands the result back through a Future, so the UI can
+read what it just wrote without blocking on the write.
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+from database.items_db import transaction, close_conn, save_placement, record_daily_usage_batch
+from database.load_curves import LoadCurveStore
+
+
+def _item_identifier(item):
+    """What save_placement() expects: the item_types id when known, else the name."""
+    if not item:
+        return None
+    return item["id"] if item.get("id") is not None else item.get("name")
+
+
+class WriteBehindQueue:
+    def __init__(self, flush_interval=0.5, max_pending=256, curve_store=None, max_retries=5, retry_delay=0.5):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.curve_store = curve_store or LoadCurveStore()
+        self._cond = threading.Condition()
+        self._placements = {}  # { (map, room, slot): (item_identifier, on) }, latest wins
+        self._usage = []       # [(day_index, item_type_id, energy, cost, map, room, slot), ...]
+        self._curves = []      # [(day_index, [(map, room, slot, item_type_id, curve), ...]), ...]
+        self._reads = []       # [(accepted count to wait for, fn, Future), ...] from read_after_flush()
+        self._accepted = 0     # changes handed in so far
+        self._written = 0      # ... of which this many have been flushed (or dropped after max_retries)
+        self._flush_requested = False
+        self._closing = False
+        self._failures = 0     # failed attempts at the rows now at the front of the queue
+        self._retry_at = 0.0   # time.monotonic() before which they are not tried again
+
+        # counters (read with stats())
+        self.max_depth = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.errors = 0
+        self.retries = 0
+        self.rows_dropped = 0
+        self.last_error = None
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self):
+        """Rows waiting to be written."""
+        return len(self._placements) + len(self._usage) + sum(len(c) for _, c in self._curves)
+
+    def _accept(self):
+        # caller holds the lock
+        self._accepted += 1
+        depth = self.depth
+        self.max_depth = max(self.max_depth, depth)
+        if depth >= self.max_pending:
+            self._cond.notify_all()
+
+    def put_placement(self, map_name, room_name, slot_index, item, on):
+        """Queue a slot's new item (dict or None) and on/off state."""
+        key = (map_name, room_name, slot_index)
+        with self._cond:
+            if key in self._placements:
+                self.coalesced += 1
+            self._placements[key] = (_item_identifier(item), bool(on))
+            self._accept()
+
+    def put_usage(self, day_index, item_type_id, energy, cost, map_name=None, room_name=None, slot_index=None):
+        """Queue one daily_item_usage row."""
+        with self._cond:
+            self._usage.append((day_index, item_type_id, energy, cost, map_name, room_name, slot_index))
+            self._accept()
+
+    def put_usage_rows(self, rows):
+        """Queue many daily_item_usage rows (same tuple layout as put_usage's arguments)."""
+        with self._cond:
+            for row in rows:
+                self._usage.append(tuple(row))
+                self._accept()
+
+    def put_load_curves(self, day_index, curves):
+        """Queue one day's per-slot load curves: [(map, room, slot, item_type_id, curve), ...]."""
+        with self._cond:
+            self._curves.append((day_index, list(curves)))
+            self._accept()
+
+    def flush(self, wait=False, timeout=None):
+        """Ask for everything queued so far to be written now (a batch that is backing off
+           after a failure still waits for its retry). With wait=True, block until it has
+           been; returns False on timeout or if rows were dropped after failing to write."""
+        with self._cond:
+            target = self._accepted
+            dropped = self.rows_dropped
+            self._flush_requested = True
+            self._cond.notify_all()
+            if not wait:
+                return True
+            self._cond.wait_for(lambda: self._written >= target or not self._thread.is_alive(), timeout)
+            return self._written >= target and self.rows_dropped == dropped
+
+    def read_after_flush(self, fn):
+        """Run fn() on the worker thread once everything queued so far has been written (or
+           dropped); returns a concurrent.futures.Future with its result. fn uses the worker's
+           connection, so it sees those rows."""
+        future = Future()
+        with self._cond:
+            self._reads.append((self._accepted, fn, future))
+            self._flush_requested = True
+            self._cond.notify_all()
+        return future
+
+    def close(self, timeout=5.0):
+        """Write whatever is left and stop the worker."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "depth": self.depth,
+                "max_depth": self.max_depth,
+                "accepted": self._accepted,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "rows_written": self.rows_written,
+                "errors": self.errors,
+                "retries": self.retries,
+                "rows_dropped": self.rows_dropped,
+                "last_error": self.last_error,
+                "last_flush_ms": self.last_flush_ms,
+                "max_flush_ms": self.max_flush_ms,
+                "avg_flush_ms": self._total_flush_ms / self.flushes if self.flushes else 0.0
+            }
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    backoff = self._retry_at - time.monotonic()
+                    if backoff > 0:
+                        # the last batch failed: wait out the delay (close() cuts it short)
+                        self._cond.wait_for(lambda: self._closing, backoff)
+                    else:
+                        self._cond.wait_for(lambda: self._closing or self._flush_requested or self.depth >= self.max_pending,
+                                            self.flush_interval)
+                    placements, self._placements = self._placements, {}
+                    usage, self._usage = self._usage, []
+                    curves, self._curves = self._curves, []
+                    target = self._accepted
+                    self._flush_requested = False
+                    closing = self._closing
+                ok = self._write(placements, usage, curves) if placements or usage or curves else True
+                with self._cond:
+                    if ok:
+                        self._failures = 0
+                        self._retry_at = 0.0
+                        self._written = target
+                    else:
+                        self._failed(placements, usage, curves, target)
+                    ready = [r for r in self._reads if r[0] <= self._written]
+                    self._reads = [r for r in self._reads if r[0] > self._written]
+                    self._cond.notify_all()
+                for _, fn, future in ready:
+                    if future.set_running_or_notify_cancel():
+                        try:
+                            future.set_result(fn())
+                        except Exception as e:
+                            future.set_exception(e)
+                if closing:
+                    with self._cond:
+                        if not self.depth:
+                            return
+        finally:
+            with self._cond:
+                reads, self._reads = self._reads, []
+            for _, _, future in reads:
+                future.cancel()
+            close_conn()
+
+    def _failed(self, placements, usage, curves, target):
+        # caller holds the lock
+        rows = len(placements) + len(usage) + sum(len(c) for _, c in curves)
+        self._failures += 1
+        if self._failures > self.max_retries:
+            self.rows_dropped += rows
+            self._failures = 0
+            self._retry_at = 0.0
+            self._written = target
+            print(f"[DB] write-behind gave up after {self.max_retries} retries, {rows} rows dropped")
+            return
+        # back in front of whatever was queued since; a newer state of the same slot wins
+        for key, value in placements.items():
+            self._placements.setdefault(key, value)
+        self._usage[:0] = usage
+        self._curves[:0] = curves
+        self.retries += 1
+        delay = self.retry_delay * 2 ** (self._failures - 1)
+        self._retry_at = time.monotonic() + delay
+        print(f"[DB] write-behind will retry {rows} rows in {delay:.1f}s")
+
+    def _write(self, placements, usage, curves):
+        """Write one batch in a transaction; False (and nothing written) if it failed."""
+        start = time.perf_counter()
+        rows = len(placements) + len(usage) + sum(len(c) for _, c in curves)
+        curve_rows = self.curve_store.row_count
+        try:
+            with transaction():
+                for (map_name, room_name, slot_index), (item_id, on) in placements.items():
+                    save_placement(map_name, room_name, slot_index, item_id, on)
+                if usage:
+                    record_daily_usage_batch(usage)
+                for day_index, day_curves in curves:
+                    self.curve_store.append_day(day_index, day_curves)
+        except Exception as e:
+            # the curves are in the file before the transaction commits; its rollback took
+            # their index rows, so cut them off again rather than leave them (and append
+            # them a second time on the retry)
+            self.curve_store.truncate(curve_rows)
+            with self._cond:
+                self.errors += 1
+                self.last_error = str(e)
+            print(f"[DB] write-behind flush failed ({rows} rows): {e}")
+            return False
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        with self._cond:
+            self.flushes += 1
+            self.rows_written += rows
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+        return True
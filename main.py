@@ -2,7 +2,6 @@ import pygame
 import sys
 import traceback
 import random
-from datetime import datetime
 
 from database.user_db import init_db, register_user, check_user
 from ui.input_box import InputBox
@@ -10,9 +9,17 @@ from ui.button import Button
 from screens.menu_page import MenuPage
 from screens.settings_page import SettingsPage
 from screens.maps import Map, MAPS, ROOMS, ROOM_SLOTS
-from screens.room_page import RoomPage
+from screens.room_page import RoomPage, find_room_image
 from ui.item_bar import ItemBar
-from database.items_db import init_items_db, add_item_type_if_not_exists, get_items_by_category
+from ui.text_cache import text_cache
+from ui.assets import assets
+from ui.damage import DamageTracker
+from database.items_db import init_items_db, get_last_day_index, get_rollups
+from database.item_catalog import get_catalog, seed_items
+from database.write_behind import WriteBehindQueue
+from simulation.engine import SimulationEngine, MINUTES_PER_DAY
+from simulation.clock import FixedStepClock, SPEEDS
+from simulation.tariff import seed_default_plans, load_plan
 
 pygame.init()
 
@@ -101,43 +108,90 @@ SMART_REMOTE = {
 # Time / energy system
 # current day runs for 30 seconds
 day_duration_seconds = 30
-day_elapsed_seconds = 0.0
-minutes_per_second = 1440.0 / float(day_duration_seconds)  # computed as 1440 / day_duration_seconds
-
-simulation_running = False  # simulation runs only after user presses Start Day
-# meter per-day is represented by daily_energy_kwh (reset each day)
-daily_energy_kwh = 0.0
-daily_cost = 0.0
-
-# per-item usage collected during the current simulated day
-daily_item_usage = {}   # { item_name: {"energy": kWh, "cost": £, "category": "..."} }
-
-daily_history = []  # list of {"energy":..., "cost":..., "date":...}
-day_number = 0  # number of completed days
+minutes_per_second = MINUTES_PER_DAY / float(day_duration_seconds)  # computed as 1440 / day_duration_seconds
+# the engine always advances in fixed steps of this many simulated minutes, so
+# results do not depend on frame rate; the clock decides how many steps per frame
+SIM_STEP_MINUTES = 1.0
+sim_clock = FixedStepClock(step_minutes=SIM_STEP_MINUTES, minutes_per_second=minutes_per_second)
+
+# energy accounting lives in the headless engine; the UI only drives its clock and
+# reports slot changes through engine.set_slot() so on-intervals are timestamped.
+# engine.running is False until the user presses Start Day; engine.daily_energy_kwh
+# is the per-day meter, engine.daily_item_usage the per-item breakdown and
+# engine.daily_history the completed days.
+engine = SimulationEngine(placements, placements_on, accounting="events")
+
+# household tariff plan (stored in the DB); None prices items at their own cost_per_kwh
+HOUSEHOLD_TARIFF = "Economy 7"
+
+# placement changes are saved by a background writer so the frame loop never waits on SQLite
+persistence = WriteBehindQueue()
+
+def persist_finished_day(entry, slot_usage):
+    """engine.finish_day() hook: queue the day's per-slot breakdown and load curves as one batch and flush it."""
+    persistence.put_usage_rows([
+        (entry["day_index"], u["item_type_id"], u["energy"], u["cost"], u["map"], u["room"], u["slot"])
+        for u in slot_usage
+    ])
+    persistence.put_load_curves(entry["day_index"], [
+        (c["map"], c["room"], c["slot"], c["item_type_id"], c["curve"]) for c in engine.daily_load_curves()
+    ])
+    persistence.flush()
+
+engine.on_day_finished = persist_finished_day
+# continue day numbering from the recorded history so day_index stays unique across sessions
+engine.day_number = get_last_day_index()
 
 # UI Continue button on day summary (created later)
 continue_button = None
+# recorded totals of the days before today, read from the rollups once per summary:
+# { "Last 7 days": (days, {"energy", "cost", "periods"}), "Last 30 days": ... };
+# empty until the writer thread has answered summary_history_future
+summary_history = {}
+summary_history_future = None
 
 # internal timing for main loop
 last_time = pygame.time.get_ticks() / 1000.0
 
 def start_new_day():
-    global day_duration_seconds, day_elapsed_seconds, minutes_per_second, simulation_running
-    global daily_item_usage, daily_energy_kwh, daily_cost
+    global day_duration_seconds, minutes_per_second
     # fixed duration: 30 seconds per simulated day
     day_duration_seconds = 30
-    day_elapsed_seconds = 0.0
-    minutes_per_second = 1440.0 / float(day_duration_seconds)  # full day = 1440 minutes
-    simulation_running = True
-    # reset per-day accumulators and per-item breakdown
-    daily_item_usage = {}
-    daily_energy_kwh = 0.0
-    daily_cost = 0.0
+    minutes_per_second = MINUTES_PER_DAY / float(day_duration_seconds)  # full day = 1440 minutes
+    sim_clock.minutes_per_second = minutes_per_second
+    sim_clock.reset()
+    # resets per-day accumulators and per-item breakdown
+    engine.start_day()
     print(f"[TIME] Starting new simulated day ({day_duration_seconds}s → {minutes_per_second:.2f} min/sec)")
 
+def read_summary_history(today):
+    """The recorded days before `today` from the day rollups (one indexed query each)."""
+    return {label: (days, get_rollups("day", today - days + 1, today - 1))
+            for label, days in (("Last 7 days", 7), ("Last 30 days", 30))}
+
+def load_summary_history():
+    """Have the writer thread read the history once the finished days (e.g. fast-forwarded
+       ones) are in the rollups; poll_summary_history() picks the answer up."""
+    global summary_history, summary_history_future
+    today = engine.day_number + 1
+    summary_history = {}
+    summary_history_future = persistence.read_after_flush(lambda: read_summary_history(today))
+
+def poll_summary_history():
+    """Take the writer thread's answer to load_summary_history() once it is in."""
+    global summary_history, summary_history_future
+    if summary_history_future is None or not summary_history_future.done():
+        return
+    future, summary_history_future = summary_history_future, None
+    try:
+        summary_history = future.result()
+    except Exception as e:
+        print(f"[DB] could not read the usage history: {e}")
+
 def end_current_day():
-    global simulation_running, continue_button, screen_state
-    simulation_running = False
+    global continue_button, screen_state
+    engine.stop()
+    load_summary_history()
     # place Continue button at bottom-right to avoid overlapping summary content
     btn_w, btn_h = 220, 48
     btn_x = WIDTH - btn_w - 24
@@ -147,24 +201,16 @@ def end_current_day():
     print("[TIME] Day finished — showing day summary")
 
 def on_continue():
-    global day_number, daily_history, daily_energy_kwh, daily_cost, meter_energy_kwh, screen_state, day_started
+    global screen_state, day_started
     # save today's totals into history
-    day_number += 1
-    daily_history.append({
-        "day_index": day_number,
-        "energy": daily_energy_kwh,
-        "cost": daily_cost,
-        "date": datetime.utcnow().isoformat()
-    })
+    engine.finish_day()
     # reset daily counters and start next day
-    daily_energy_kwh = 0.0
-    daily_cost = 0.0
     start_new_day()
     # ensure the simulation actually runs
     day_started = True
     # return to simulation
     screen_state = SIMULATION
-    print(f"[TIME] Continue pressed — starting day {day_number+1}")
+    print(f"[TIME] Continue pressed — starting day {engine.day_number+1}")
 
 # --- moved here so it's defined before the main loop ---
 def suggest_improvements(item_name, category, energy_per_min):
@@ -228,15 +274,17 @@ def add_default_items():
         ("Smart Blinds", "Miscellaneous", 0.001/60),
     ]
 
-    for name, cat, epm in lighting + appliances + misc:
-        add_item_type_if_not_exists(name, cat, energy_per_min=epm, cost_per_kwh=0.20, icon_path=None)
+    # one INSERT ... ON CONFLICT DO NOTHING for the lot; the catalog is re-read only if something was new
+    seed_items([(name, cat, epm, 0.20, None) for name, cat, epm in lighting + appliances + misc])
 
 add_default_items()
+seed_default_plans()
+engine.set_tariff(load_plan(HOUSEHOLD_TARIFF))
 
 def on_category_change(category):
     global selected_item_category
     selected_item_category = category
-    items = get_items_by_category(category)
+    items = get_catalog().category(category)
     print(f"[DEBUG] Category changed -> {category}, loaded {len(items)} items")
     item_bar.set_items(items)
 
@@ -275,6 +323,7 @@ def logout():
     switch_to_login()
 
 def quit_program():
+    persistence.close()
     pygame.quit()
     sys.exit()
 
@@ -305,6 +354,9 @@ item_bar = ItemBar(
 # Populate initial category items immediately
 on_category_change(item_bar.get_selected_category())
 
+# decode map backgrounds and room images in the background while the login screen is up
+assets.preload(list(MAPS.values()) + [p for p in (find_room_image(m, r) for m, rooms in ROOMS.items() for r in rooms) if p])
+
 # continue_button created dynamically when a day ends (see end_current_day)
 
 # Helper: ensure placements dict has structure for a map & room and return list of items (None for empty)
@@ -322,17 +374,48 @@ def ensure_room_placements(map_name, room_name, slots_cfg):
     cur = placements[map_name][room_name]
     if len(cur) != len(slots_cfg):
         placements[map_name][room_name] = (cur + [None] * len(slots_cfg))[:len(slots_cfg)]
+        engine.mark_dirty()
     cur_on = placements_on[map_name][room_name]
     if len(cur_on) != len(slots_cfg):
         placements_on[map_name][room_name] = (cur_on + [False] * len(slots_cfg))[:len(slots_cfg)]
+        engine.mark_dirty()
     return placements[map_name][room_name]
 
+# remote toggle layout, rebuilt only when the map or placements/placements_on change
+_remote_layout = {"key": None, "buttons": []}
+_remote_label_surfs = {}   # label -> rendered SMALL_FONT text (also what sizes the button)
+_remote_button_surfs = {}  # (label, on, size) -> finished button surface
+
+def _remote_label_surf(label):
+    surf = _remote_label_surfs.get(label)
+    if surf is None:
+        surf = _remote_label_surfs[label] = SMALL_FONT.render(label, True, (255,255,255))
+    return surf
+
+def _remote_button_surf(label, on, size):
+    """The whole button (rounded box, border, centred label) drawn once per label and state."""
+    key = (label, on, size)
+    surf = _remote_button_surfs.get(key)
+    if surf is None:
+        surf = pygame.Surface(size, pygame.SRCALPHA)
+        rect = surf.get_rect()
+        pygame.draw.rect(surf, (0,200,0) if on else (200,0,0), rect, border_radius=6)
+        pygame.draw.rect(surf, (30,30,30), rect, 2, border_radius=6)
+        txt = _remote_label_surf(label)
+        surf.blit(txt, (rect.centerx - txt.get_width()//2, rect.centery - txt.get_height()//2))
+        _remote_button_surfs[key] = surf
+    return surf
+
 def compute_remote_buttons(map_obj, map_name):
     """Compute labeled toggle buttons for smart items placed in rooms.
-       Returns list of dicts: {rect,label,map,room,slot,on}"""
-    buttons = []
+       Returns list of dicts: {rect,label,map,room,slot,on,surface}. The list is cached and
+       returned as-is (same object) until the map or the engine's placements version changes."""
     if not map_obj or map_name not in placements:
-        return buttons
+        return []
+    key = (map_obj, map_name, engine.placements_version)
+    if _remote_layout["key"] == key:
+        return _remote_layout["buttons"]
+    buttons = []
     for room_name, room_rect in map_obj.rooms.items():
         room_list = placements.get(map_name, {}).get(room_name, [])
         room_on = placements_on.get(map_name, {}).get(room_name, [])
@@ -341,8 +424,7 @@ def compute_remote_buttons(map_obj, map_name):
         for idx_stack, slot_index in enumerate(smart_slots):
             itm = room_list[slot_index]
             label = itm.get("name", "")
-            # render width using SMALL_FONT (approx)
-            txt_surf = SMALL_FONT.render(label, True, (255,255,255))
+            txt_surf = _remote_label_surf(label)
             btn_w = min(240, max(60, txt_surf.get_width() + 16))
             btn_h = max(22, txt_surf.get_height() + 8)
             # position above room_rect, stacked upward so they do not overlap the room area
@@ -358,19 +440,13 @@ def compute_remote_buttons(map_obj, map_name):
                 "map": map_name,
                 "room": room_name,
                 "slot": slot_index,
-                "on": on_state
+                "on": on_state,
+                "surface": _remote_button_surf(label, on_state, btn_rect.size)
             })
+    _remote_layout["key"] = key
+    _remote_layout["buttons"] = buttons
     return buttons
 
-def iter_active_placed_items():
-    """Yield placed items that are ON (considering placements_on)."""
-    for map_name, rooms in placements.items():
-        for room_name, items in rooms.items():
-            ons = placements_on.get(map_name, {}).get(room_name, [False]*len(items))
-            for idx, itm in enumerate(items):
-                if itm and idx < len(ons) and ons[idx]:
-                    yield itm
-
 # Login / register UI (kept from previous)
 username_box = InputBox(300, 200, 200, 40, font=FONT)
 password_box = InputBox(300, 260, 200, 40, font=FONT)
@@ -447,6 +523,16 @@ def create_map_select_buttons():
         y += 70
 create_map_select_buttons()
 
+def on_room_slot_change(slot_idx, item, on):
+    """RoomPage placed/removed/toggled a slot: save it and timestamp it in the engine."""
+    if not (selected_map_name and current_room_name):
+        return
+    slots_cfg = ROOM_SLOTS.get(selected_map_name, {}).get(current_room_name, [])
+    ensure_room_placements(selected_map_name, current_room_name, slots_cfg)
+    if slot_idx < len(placements[selected_map_name][current_room_name]):
+        engine.set_slot(selected_map_name, current_room_name, slot_idx, item, on)
+        persistence.put_placement(selected_map_name, current_room_name, slot_idx, item, on)
+
 # add helper to go back from room view
 def go_back_from_room():
     global screen_state, current_room_page, current_room_name
@@ -470,6 +556,43 @@ def make_start_day_button():
     mb_y = btn_y + (btn_h - mb_h)//2
     menu_button = Button(mb_x, mb_y, mb_w, mb_h, "Main Menu", lambda: return_to_menu(), font=SMALL_FONT)
 
+# playback controls (shown in SIMULATION once the day has started)
+speed_buttons = []  # list of (speed_or_None, Button); None for the one-shot actions
+FAST_FORWARD_DAYS = 7
+
+def set_sim_speed(speed):
+    sim_clock.set_speed(speed)
+    for spd, btn in speed_buttons:
+        if spd is not None:
+            btn.color = pygame.Color('gray40') if spd == speed else pygame.Color('gray15')
+
+def finish_day_now():
+    """Simulate the rest of today instantly and show the summary."""
+    if day_started and engine.running:
+        engine.run_to_end_of_day()
+        end_current_day()
+
+def fast_forward_days(days):
+    """Finish today plus days-1 more (saved to history) and show the last day's summary."""
+    if day_started and engine.running:
+        engine.fast_forward_days(days)
+        end_current_day()
+
+def make_speed_buttons():
+    global speed_buttons
+    entries = [(spd, "Pause" if spd == 0 else f"{spd}x", lambda s=spd: set_sim_speed(s)) for spd in SPEEDS]
+    entries.append((None, "End day", finish_day_now))
+    entries.append((None, f"+{FAST_FORWARD_DAYS} days", lambda: fast_forward_days(FAST_FORWARD_DAYS)))
+    gap, btn_h = 6, 30
+    widths = [ITEM_SMALL_FONT.size(label)[0] + 20 for _, label, _ in entries]
+    x = WIDTH - 16 - (sum(widths) + gap * (len(widths) - 1))
+    y = item_bar.rect.bottom + 12 + 44 + 8  # below the Start Day / Main Menu row
+    speed_buttons = []
+    for (spd, label, cb), w in zip(entries, widths):
+        speed_buttons.append((spd, Button(x, y, w, btn_h, label, cb, font=ITEM_SMALL_FONT)))
+        x += w + gap
+    set_sim_speed(sim_clock.speed)
+
 def on_start_day():
     global day_started
     # start new day; this resets timers as usual
@@ -477,19 +600,17 @@ def on_start_day():
     day_started = True
 
 def return_to_menu():
-    global day_started, simulation_running, screen_state, current_map, current_room_page, current_room_name
-    global daily_energy_kwh, daily_cost, day_elapsed_seconds, continue_button
+    global day_started, screen_state, current_map, current_room_page, current_room_name
+    global continue_button
     global placements, placements_on, selected_map_name
     # stop any running day and clear room view
     day_started = False
-    simulation_running = False
+    engine.stop()
     current_room_page = None
     current_room_name = None
 
     # reset today's accumulators so when user returns to simulation they start fresh
-    daily_energy_kwh = 0.0
-    daily_cost = 0.0
-    day_elapsed_seconds = 0.0
+    engine.reset_day()
 
     # clear any summary/continue button state
     continue_button = None
@@ -497,6 +618,7 @@ def return_to_menu():
     # completely reset placement state so items from previous maps don't persist
     placements = {}
     placements_on = {}
+    engine.set_placements(placements, placements_on)
 
     # clear selected map and map object so next simulation starts fresh
     selected_map_name = None
@@ -506,20 +628,243 @@ def return_to_menu():
     go_to_menu()
 # create initial start + menu button objects
 make_start_day_button()
+make_speed_buttons()
 
 # day will start when user presses Start Day (on_start_day)
 # (no automatic start here)
 
+def visible_widgets():
+    """Widgets on the current screen that report their own damage (ui.damage)."""
+    if screen_state == LOGIN:
+        widgets = input_boxes + [login_button, register_button]
+    elif screen_state == REGISTER:
+        widgets = input_boxes + [register_submit_button, back_button]
+    elif screen_state == MENU:
+        widgets = menu_page.buttons
+    elif screen_state == SETTINGS:
+        widgets = settings_page.buttons
+    elif screen_state == MAP_SELECT:
+        widgets = map_select_buttons
+    elif screen_state == SIMULATION:
+        widgets = [current_map, item_bar, menu_button]
+        if day_started:
+            widgets += [btn for _, btn in speed_buttons]
+        else:
+            widgets.append(start_day_button)
+    elif screen_state == ROOM_VIEW:
+        widgets = [current_room_page, item_bar]
+    elif screen_state == DAY_SUMMARY:
+        widgets = [continue_button]
+    else:
+        widgets = []
+    return [w for w in widgets if w]
+
+def current_status_lines():
+    """The SIMULATION timer and meter lines, interpolated between fixed steps so they move smoothly."""
+    shown_minute, shown_energy, _ = engine.projected(sim_clock.alpha * sim_clock.step_minutes)
+    day_elapsed_seconds = shown_minute / minutes_per_second if minutes_per_second else 0.0
+    speed_label = "paused" if sim_clock.paused else f"{sim_clock.speed}x"
+    return (f"Day time: {int(day_elapsed_seconds)}s / {int(day_duration_seconds) if day_duration_seconds else 0}s ({speed_label})",
+            f"Today's meter (kWh): {shown_energy:.4f}")
+
+def current_overlay_lines():
+    """FPS overlay lines: FPS, DB queue, text cache, image cache."""
+    db = persistence.stats()
+    tc = text_cache.stats()
+    am = assets.stats()
+    return (f"FPS: {int(clock.get_fps())}",
+            f"DB queue: {db['depth']} (max {db['max_depth']}), flush {db['last_flush_ms']:.1f} ms (max {db['max_flush_ms']:.1f})"
+            + (f", {db['errors']} failed, {db['rows_dropped']} rows dropped" if db['errors'] else ""),
+            f"Text cache: {tc['entries']} surfaces, {tc['hit_rate']:.1%} hits, {tc['fonts']} fonts",
+            f"Images: {am['entries']} surfaces, {am['bytes'] / 1048576:.1f}/{am['budget_bytes'] / 1048576:.0f} MB, {am['evictions']} evicted")
+
+def draw_frame(remote_buttons, status_lines, overlay_lines):
+    """Paint the current screen. The main loop sets a clip to the damaged area first,
+       so everything outside it is left as the previous frame drew it."""
+    screen.fill((30, 30, 30))
+
+    if screen_state == LOGIN:
+        title = FONT.render('Login', True, (255,255,255))
+        screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
+        user_label = SMALL_FONT.render('Username:', True, (200,200,200))
+        pass_label = SMALL_FONT.render('Password:', True, (200,200,200))
+        screen.blit(user_label, (200, 210))
+        screen.blit(pass_label, (200, 270))
+        for box in input_boxes:
+            box.draw(screen)
+        login_button.draw(screen)
+        register_button.draw(screen)
+        if login_error:
+            err = SMALL_FONT.render(login_error, True, (255, 80, 80))
+            screen.blit(err, (300, 370))
+
+    elif screen_state == REGISTER:
+        title = FONT.render('Register', True, (255,255,255))
+        screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
+        user_label = SMALL_FONT.render('Username:', True, (200,200,200))
+        pass_label = SMALL_FONT.render('Password:', True, (200,200,200))
+        screen.blit(user_label, (200, 210))
+        screen.blit(pass_label, (200, 270))
+        for box in input_boxes:
+            box.draw(screen)
+        register_submit_button.draw(screen)
+        back_button.draw(screen)
+        if login_error:
+            err = SMALL_FONT.render(login_error, True, (255, 80, 80))
+            screen.blit(err, (300, 370))
+
+    elif screen_state == MENU:
+        menu_page.draw()
+
+    elif screen_state == SETTINGS:
+        settings_page.draw()
+
+    elif screen_state == MAP_SELECT:
+        screen.fill((30, 30, 30))
+        title = FONT.render("Select a Map", True, (255,255,255))
+        screen.blit(title, (WIDTH//2 - title.get_width()//2, 100))
+        for btn in map_select_buttons:
+            btn.draw(screen)
+
+    elif screen_state == SIMULATION:
+        if current_map:
+            current_map.draw()
+            # draw labeled remote toggles for smart items (above rooms)
+            for b in remote_buttons:
+                screen.blit(b["surface"], b["rect"])
+        item_bar.draw()
+        # draw Main Menu button and Start Day button when visible
+        if menu_button:
+            menu_button.draw(screen)
+        if start_day_button and not day_started:
+            start_day_button.draw(screen)
+        if day_started:
+            for _, btn in speed_buttons:
+                btn.draw(screen)
+        # show small running timer and meter (meter now shows current day's total)
+        timer_line, meter_line = status_lines
+        timer_text = SMALL_FONT.render(timer_line, True, (200,200,200))
+        screen.blit(timer_text, (10, item_bar.rect.bottom + 32))
+        meter_text = SMALL_FONT.render(meter_line, True, (200,200,100))
+        screen.blit(meter_text, (10, item_bar.rect.bottom + 60))
+
+    elif screen_state == ROOM_VIEW:
+        # Draw room (full-screen)
+        if current_room_page:
+            current_room_page.draw()
+        # Draw the item bar on top
+        item_bar.draw()
+        # Draw remove button (if visible) on top of the item bar
+        if current_room_page:
+            current_room_page.draw_remove_button(screen)
+        # Ensure Back button is visible above the item bar
+        if current_room_page:
+            current_room_page.back_button.draw(screen)
+        # Draw dragging preview on top if any
+        if dragging_item and dragging_surf:
+            mx, my = pygame.mouse.get_pos()
+            draw_x = mx - dragging_offset[0]
+            draw_y = my - dragging_offset[1]
+            screen.blit(dragging_surf, (draw_x, draw_y))
+
+    elif screen_state == DAY_SUMMARY:
+        # show day's totals and a Continue button
+        title = FONT.render("Day Summary", True, (255,255,255))
+        screen.blit(title, (WIDTH//2 - title.get_width()//2, 80))
+        # today's totals
+        energy_txt = SMALL_FONT.render(f"Today's energy: {engine.daily_energy_kwh:.4f} kWh", True, (220,220,220))
+        tariff_name = engine.tariff.name if engine.tariff else "item prices"
+        cost_txt = SMALL_FONT.render(f"Today's cost: £{engine.daily_cost:.4f} ({tariff_name})", True, (220,220,220))
+        screen.blit(energy_txt, (WIDTH//2 - energy_txt.get_width()//2, 160))
+        screen.blit(cost_txt, (WIDTH//2 - cost_txt.get_width()//2, 200))
+
+        # longer-range totals: recorded days before today (from the rollups) plus today,
+        # shown once the window is all played days. engine.day_number counts the days before
+        # today; the rollups only have the ones where something was switched on
+        period_y = 240
+        for label, (days, prior) in summary_history.items():
+            if engine.day_number >= days - 1:
+                period_txt = ITEM_SMALL_FONT.render(f"{label}: {prior['energy'] + engine.daily_energy_kwh:.4f} kWh, £{prior['cost'] + engine.daily_cost:.4f}", True, (200,200,150))
+                screen.blit(period_txt, (WIDTH//2 - period_txt.get_width()//2, period_y))
+                period_y += period_txt.get_height() + 4
+
+        # per-item breakdown (sorted by energy desc)
+        lines_x = 60
+        lines_y = 300
+        line_h = SMALL_FONT.get_height() + 6
+        sorted_items = sorted(engine.daily_item_usage.items(), key=lambda kv: kv[1]["energy"], reverse=True)
+        if sorted_items:
+            header = ITEM_SMALL_FONT.render("Per-item usage (energy kWh, cost £) and suggestions:", True, (210,210,210))
+            screen.blit(header, (lines_x, lines_y - line_h))
+            # show up to N items (fit screen), with a short suggestion under each
+            max_display = 8
+            for i, (iname, info) in enumerate(sorted_items[:max_display]):
+                y = lines_y + i * (line_h * 2)
+                txt = SMALL_FONT.render(f"{iname}: {info['energy']:.4f} kWh, £{info['cost']:.4f}", True, (230,230,230))
+                screen.blit(txt, (lines_x, y))
+                suggestion = suggest_improvements(iname, info.get("category", ""), info.get("epm", 0.0))
+                sug_surf = ITEM_SMALL_FONT.render(f"Suggestion: {suggestion}", True, (180,180,180))
+                screen.blit(sug_surf, (lines_x + 12, y + line_h))
+        else:
+            none_txt = ITEM_SMALL_FONT.render("No item consumption recorded this day.", True, (200,200,200))
+            screen.blit(none_txt, (lines_x, lines_y))
+
+        # draw Continue button if present
+        if continue_button:
+            continue_button.draw(screen)
+
+    if overlay_lines:
+        fps_line, *stat_lines = overlay_lines
+        fps_text = SMALL_FONT.render(fps_line, True, (0,255,0))
+        screen.blit(fps_text, (10, 10))
+        for i, line in enumerate(stat_lines):
+            stat_text = ITEM_SMALL_FONT.render(line, True, (0,255,0))
+            screen.blit(stat_text, (10, 36 + i * 18))
+
+# frame pacing: full rate only while something animates; otherwise block on input
+FRAME_RATE = 60
+BACKGROUND_FRAME_RATE = 15      # window not focused
+IDLE_WAIT_MS = 500              # idle: wake at least this often (FPS overlay, DB stats)
+BACKGROUND_IDLE_WAIT_MS = 2000
+window_focused = True
+
+def is_animating():
+    """True while the screen changes without input: a running (unpaused) day, a drag, or
+       the summary's history still on its way from the writer thread."""
+    if dragging_item or summary_history_future is not None:
+        return True
+    return screen_state == SIMULATION and day_started and engine.running and not sim_clock.paused
+
+# what the last drawn frame showed, to work out what changed (see ui.damage)
+damage = DamageTracker(screen.get_size())
+drawn = {"scene": None, "remote": [], "status": None, "overlay": None, "drag": None}
+
 # main loop
 running = True
 while running:
+    # nothing moving on its own: sleep until input arrives instead of spinning at the frame rate
+    events = []
+    idle = not is_animating()
+    if idle:
+        first = pygame.event.wait(IDLE_WAIT_MS if window_focused else BACKGROUND_IDLE_WAIT_MS)
+        if first.type != pygame.NOEVENT:
+            events.append(first)
+    events += pygame.event.get()
+
     now = pygame.time.get_ticks() / 1000.0
-    dt = now - last_time
+    # only time spent animating advances the clock: an input that starts or unpauses the day
+    # is handled in this same iteration, and must not be credited with the sleep before it
+    dt = 0.0 if idle else now - last_time
     last_time = now
 
-    for event in pygame.event.get():
+    for event in events:
         if event.type == pygame.QUIT:
             running = False
+        if event.type in (pygame.WINDOWFOCUSLOST, pygame.WINDOWFOCUSGAINED):
+            window_focused = event.type == pygame.WINDOWFOCUSGAINED
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED):
+            # the window's contents may be gone; repaint everything
+            damage.add_all()
 
         if screen_state in [LOGIN, REGISTER]:
             for box in input_boxes:
@@ -550,6 +895,12 @@ while running:
             # Main Menu button always active in SIMULATION
             if menu_button:
                 menu_button.handle_event(event)
+            # playback controls consume their clicks so they don't select a room underneath
+            if day_started and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                hit = next((btn for _, btn in speed_buttons if btn.rect.collidepoint(event.pos)), None)
+                if hit:
+                    hit.handle_event(event)
+                    continue
 
             # handle remote map toggles first (consume clicks so they don't select rooms)
             if current_map and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -559,7 +910,8 @@ while running:
                     if b["rect"].collidepoint(event.pos):
                         # ensure structure exists
                         ensure_room_placements(b["map"], b["room"], ROOM_SLOTS.get(b["map"], {}).get(b["room"], []))
-                        placements_on[b["map"]][b["room"]][b["slot"]] = not placements_on[b["map"]][b["room"]][b["slot"]]
+                        engine.set_slot(b["map"], b["room"], b["slot"], placements[b["map"]][b["room"]][b["slot"]], not placements_on[b["map"]][b["room"]][b["slot"]])
+                        persistence.put_placement(b["map"], b["room"], b["slot"], placements[b["map"]][b["room"]][b["slot"]], placements_on[b["map"]][b["room"]][b["slot"]])
                         # sync to RoomPage if currently viewing same room
                         if current_room_page and current_room_name == b["room"]:
                             if 0 <= b["slot"] < len(current_room_page.slots):
@@ -590,7 +942,8 @@ while running:
                         # create RoomPage and populate with existing placements
                         current_room_page = RoomPage(
                             screen, FONT, SMALL_FONT, selected_map_name, selected_room, slots_cfg,
-                            on_back=go_back_from_room
+                            on_back=go_back_from_room,
+                            on_slot_change=on_room_slot_change
                         )
                         current_room_name = selected_room
                         # populate RoomPage.slots with previously placed items (if any)
@@ -632,12 +985,8 @@ while running:
                     if idx is not None:
                         # enforce category match
                         if dragging_item.get("category") == slot.get("category"):
+                            # places the item (default ON); saved via on_room_slot_change
                             current_room_page.place_item(idx, dragging_item)
-                            # ensure structures exist
-                            ensure_room_placements(selected_map_name, current_room_name, ROOM_SLOTS.get(selected_map_name, {}).get(current_room_name, []))
-                            # save placed item and default to ON
-                            placements[selected_map_name][current_room_name][idx] = dragging_item
-                            placements_on[selected_map_name][current_room_name][idx] = True
                             print(f"Placed '{dragging_item.get('name')}' into slot '{slot.get('name')}'")
                         else:
                             print(f"Cannot place '{dragging_item.get('name')}' into slot '{slot.get('name')}' (requires {slot.get('category')})")
@@ -648,16 +997,9 @@ while running:
             # allow item bar interactions while in room
             item_bar.handle_event(event)
 
-            # forward remove-button events then sync placements for current room
+            # forward remove-button events (removal is saved via on_room_slot_change)
             if current_room_page:
                 current_room_page.handle_remove_event(event)
-                # sync persistent placements for this room after possible removal
-                if selected_map_name and current_room_name:
-                    # ensure structure exists
-                    slots_cfg = ROOM_SLOTS.get(selected_map_name, {}).get(current_room_name, [])
-                    ensure_room_placements(selected_map_name, current_room_name, slots_cfg)
-                    placements[selected_map_name][current_room_name] = [s["item"] for s in current_room_page.slots]
-                    placements_on[selected_map_name][current_room_name] = [bool(s.get("on", False)) for s in current_room_page.slots]
         elif screen_state == DAY_SUMMARY:
             # day summary UI: only continue button active
             if continue_button:
@@ -665,180 +1007,61 @@ while running:
 
     # --- time / simulation updates ---
     # only advance simulated time after the user pressed Start Day
-    if screen_state == SIMULATION and day_started and simulation_running:
-        # accumulate simulated minutes for this frame
+    if screen_state == SIMULATION and day_started and engine.running:
+        # run the whole fixed steps this frame's dt has paid for (energy for all ON placed items)
         if day_duration_seconds and minutes_per_second:
-            delta_minutes = dt * minutes_per_second
-            # sum energy for all ON placed items across all maps/rooms
-            frame_energy = 0.0
-            frame_cost = 0.0
-            for itm in iter_active_placed_items():
-                try:
-                    epm = float(itm.get("energy_per_min", 0.0))
-                    costk = float(itm.get("cost_per_kwh", 0.0))
-                except Exception:
-                    epm = 0.0
-                    costk = 0.0
-                e_kwh = epm * delta_minutes
-                c = e_kwh * costk
-                frame_energy += e_kwh
-                frame_cost += c
-                # record per-item usage for the day (keyed by item name)
-                name = itm.get("name", "Unknown")
-                entry = daily_item_usage.setdefault(name, {"energy": 0.0, "cost": 0.0, "category": itm.get("category", ""), "epm": epm})
-                entry["energy"] += e_kwh
-                entry["cost"] += c
-
-            # accumulate per-day totals (meter shows per-day)
-            daily_energy_kwh += frame_energy
-            daily_cost += frame_cost
-
-            day_elapsed_seconds += dt
+            # one call for all owed steps; the engine sub-steps at scheduled toggles
+            steps = sim_clock.tick(dt)
+            if steps:
+                engine.advance(steps * sim_clock.step_minutes)
             # if day finished, pause and show summary
-            if day_elapsed_seconds >= day_duration_seconds:
-                # prepare day summary values (we keep daily_energy_kwh/daily_cost)
+            if engine.day_finished:
+                # prepare day summary values (engine keeps daily_energy_kwh/daily_cost)
                 end_current_day()
 
-    # draw
-    screen.fill((30, 30, 30))
-
-    if screen_state == LOGIN:
-        title = FONT.render('Login', True, (255,255,255))
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
-        user_label = SMALL_FONT.render('Username:', True, (200,200,200))
-        pass_label = SMALL_FONT.render('Password:', True, (200,200,200))
-        screen.blit(user_label, (200, 210))
-        screen.blit(pass_label, (200, 270))
-        for box in input_boxes:
-            box.draw(screen)
-        login_button.draw(screen)
-        register_button.draw(screen)
-        if login_error:
-            err = SMALL_FONT.render(login_error, True, (255, 80, 80))
-            screen.blit(err, (300, 370))
-
-    elif screen_state == REGISTER:
-        title = FONT.render('Register', True, (255,255,255))
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 120))
-        user_label = SMALL_FONT.render('Username:', True, (200,200,200))
-        pass_label = SMALL_FONT.render('Password:', True, (200,200,200))
-        screen.blit(user_label, (200, 210))
-        screen.blit(pass_label, (200, 270))
-        for box in input_boxes:
-            box.draw(screen)
-        register_submit_button.draw(screen)
-        back_button.draw(screen)
-        if login_error:
-            err = SMALL_FONT.render(login_error, True, (255, 80, 80))
-            screen.blit(err, (300, 370))
-
-    elif screen_state == MENU:
-        menu_page.draw()
-
-    elif screen_state == SETTINGS:
-        settings_page.draw()
-
-    elif screen_state == MAP_SELECT:
-        screen.fill((30, 30, 30))
-        title = FONT.render("Select a Map", True, (255,255,255))
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 100))
-        for btn in map_select_buttons:
-            btn.draw(screen)
-
-    elif screen_state == SIMULATION:
+    poll_summary_history()
+
+    # --- damage: what has changed on screen since the last frame ---
+    scene = (screen_state, screen, screen.get_size(), show_fps, selected_map_name, current_map, current_room_page,
+             day_started, start_day_button, menu_button, continue_button, login_error, summary_history)
+    if scene != drawn["scene"]:
+        damage.resize(screen.get_size())
+    for widget in visible_widgets():
+        damage.add(*widget.dirty_rects())
+    remote_buttons = []
+    status_lines = None
+    if screen_state == SIMULATION:
         if current_map:
-            current_map.draw()
-            # draw labeled remote toggles for smart items (above rooms)
             remote_buttons = compute_remote_buttons(current_map, selected_map_name)
-            for b in remote_buttons:
-                rect = b["rect"]
-                color = (0,200,0) if b["on"] else (200,0,0)
-                pygame.draw.rect(screen, color, rect, border_radius=6)
-                pygame.draw.rect(screen, (30,30,30), rect, 2, border_radius=6)
-                txt = SMALL_FONT.render(b["label"], True, (255,255,255))
-                screen.blit(txt, (rect.centerx - txt.get_width()//2, rect.centery - txt.get_height()//2))
-        item_bar.draw()
-        # draw Main Menu button and Start Day button when visible
-        if menu_button:
-            menu_button.draw(screen)
-        if start_day_button and not day_started:
-            start_day_button.draw(screen)
-        # show small running timer and meter (meter now shows current day's total)
-        timer_text = SMALL_FONT.render(f"Day time: {int(day_elapsed_seconds)}s / {int(day_duration_seconds) if day_duration_seconds else 0}s", True, (200,200,200))
-        screen.blit(timer_text, (10, item_bar.rect.bottom + 32))
-        meter_text = SMALL_FONT.render(f"Today's meter (kWh): {daily_energy_kwh:.4f}", True, (200,200,100))
-        screen.blit(meter_text, (10, item_bar.rect.bottom + 60))
-
-    elif screen_state == ROOM_VIEW:
-        # Draw room (full-screen)
-        if current_room_page:
-            current_room_page.draw()
-        # Draw the item bar on top
-        item_bar.draw()
-        # Draw remove button (if visible) on top of the item bar
-        if current_room_page:
-            current_room_page.draw_remove_button(screen)
-        # Ensure Back button is visible above the item bar
-        if current_room_page:
-            current_room_page.back_button.draw(screen)
-        # Draw dragging preview on top if any
-        if dragging_item and dragging_surf:
-            mx, my = pygame.mouse.get_pos()
-            draw_x = mx - dragging_offset[0]
-            draw_y = my - dragging_offset[1]
-            screen.blit(dragging_surf, (draw_x, draw_y))
-
-    elif screen_state == DAY_SUMMARY:
-        # show day's totals and a Continue button
-        title = FONT.render("Day Summary", True, (255,255,255))
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 80))
-        # today's totals
-        energy_txt = SMALL_FONT.render(f"Today's energy: {daily_energy_kwh:.4f} kWh", True, (220,220,220))
-        cost_txt = SMALL_FONT.render(f"Today's cost: £{daily_cost:.4f}", True, (220,220,220))
-        screen.blit(energy_txt, (WIDTH//2 - energy_txt.get_width()//2, 160))
-        screen.blit(cost_txt, (WIDTH//2 - cost_txt.get_width()//2, 200))
-
-        # compute temporary history including today's values to check week totals
-        temp_hist = daily_history + [{"energy": daily_energy_kwh, "cost": daily_cost}]
-        if len(temp_hist) >= 7:
-            # sum last 7 days (most recent)
-            last7 = temp_hist[-7:]
-            week_energy = sum(d["energy"] for d in last7)
-            week_cost = sum(d["cost"] for d in last7)
-            week_txt = SMALL_FONT.render(f"Last 7 days: {week_energy:.4f} kWh, £{week_cost:.4f}", True, (200,200,150))
-            screen.blit(week_txt, (WIDTH//2 - week_txt.get_width()//2, 260))
-
-        # per-item breakdown (sorted by energy desc)
-        lines_x = 60
-        lines_y = 300
-        line_h = SMALL_FONT.get_height() + 6
-        sorted_items = sorted(daily_item_usage.items(), key=lambda kv: kv[1]["energy"], reverse=True)
-        if sorted_items:
-            header = ITEM_SMALL_FONT.render("Per-item usage (energy kWh, cost £) and suggestions:", True, (210,210,210))
-            screen.blit(header, (lines_x, lines_y - line_h))
-            # show up to N items (fit screen), with a short suggestion under each
-            max_display = 8
-            for i, (iname, info) in enumerate(sorted_items[:max_display]):
-                y = lines_y + i * (line_h * 2)
-                txt = SMALL_FONT.render(f"{iname}: {info['energy']:.4f} kWh, £{info['cost']:.4f}", True, (230,230,230))
-                screen.blit(txt, (lines_x, y))
-                suggestion = suggest_improvements(iname, info.get("category", ""), info.get("epm", 0.0))
-                sug_surf = ITEM_SMALL_FONT.render(f"Suggestion: {suggestion}", True, (180,180,180))
-                screen.blit(sug_surf, (lines_x + 12, y + line_h))
-        else:
-            none_txt = ITEM_SMALL_FONT.render("No item consumption recorded this day.", True, (200,200,200))
-            screen.blit(none_txt, (lines_x, lines_y))
-
-        # draw Continue button if present
-        if continue_button:
-            continue_button.draw(screen)
-
-    if show_fps:
-        fps_text = SMALL_FONT.render(f"FPS: {int(clock.get_fps())}", True, (0,255,0))
-        screen.blit(fps_text, (10, 10))
-
-    pygame.display.flip()
-    clock.tick(60)
-
+        # compute_remote_buttons hands back the same list until something changed
+        if remote_buttons is not drawn["remote"]:
+            damage.add(*[b["rect"] for b in drawn["remote"] + remote_buttons])
+        status_lines = current_status_lines()
+        if status_lines != drawn["status"]:
+            damage.add(pygame.Rect(0, item_bar.rect.bottom + 32, screen.get_width(), 60))
+    overlay_lines = current_overlay_lines() if show_fps else None
+    if overlay_lines != drawn["overlay"]:
+        damage.add(pygame.Rect(0, 0, screen.get_width(), 92))
+    drag_rect = None
+    if screen_state == ROOM_VIEW and dragging_item and dragging_surf:
+        mx, my = pygame.mouse.get_pos()
+        drag_rect = dragging_surf.get_rect(topleft=(mx - dragging_offset[0], my - dragging_offset[1]))
+    if drag_rect != drawn["drag"]:
+        damage.add(*[r for r in (drawn["drag"], drag_rect) if r])
+
+    # draw only when something changed, clipped to what changed, and push only those rects
+    if damage:
+        dirty = damage.take()
+        screen.set_clip(dirty[0].unionall(dirty[1:]))
+        draw_frame(remote_buttons, status_lines, overlay_lines)
+        screen.set_clip(None)
+        pygame.display.update(dirty)
+        drawn.update(scene=scene, remote=remote_buttons, status=status_lines, overlay=overlay_lines, drag=drag_rect)
+    clock.tick(FRAME_RATE if window_focused else BACKGROUND_FRAME_RATE)
+
+# a day that finished but was not continued past its summary still belongs in the history
+if screen_state == DAY_SUMMARY:
+    engine.finish_day()
+persistence.close()
 pygame.quit()
 sys.exit()
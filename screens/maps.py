@@ -1,5 +1,8 @@
 import pygame
 
+from screens.room_slots import ROOM_SLOTS
+from ui.assets import assets
+
 MAPS = {
     "Map 1": "assets/map1_bg.png",
     "Map 2": "assets/map2_bg.png",
@@ -33,127 +36,15 @@ ROOMS = {
     }
 }
 
-# per-room slot configuration (normalized category names)
-# Rules applied:
-# - Bedrooms: ElectricsAndThermo (lighting), ElectricsAndThermo (plug), Miscellaneous
-# - Offices: ElectricsAndThermo (lighting), ElectricsAndThermo (plug), ElectricsAndThermo (desklight), Miscellaneous
-# - Living rooms: ElectricsAndThermo (lighting), ElectricsAndThermo (plug), ElectricsAndThermo (thermostat), Miscellaneous
-# - Bathrooms: ElectricsAndThermo (lighting), Miscellaneous, Appliances
-# - Dining: ElectricsAndThermo (lighting), Miscellaneous
-# - Kitchens: ElectricsAndThermo (lighting), ElectricsAndThermo (plug), Appliances, Miscellaneous
-ROOM_SLOTS = {
-    "Map 1": {
-        "bedroom": [
-            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
-            {"name": "Side Plug", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "bedroom2": [
-            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
-            {"name": "Side Plug", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "bathroom": [
-            {"name": "Vanity Light", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-            {"name": "Appliance Slot", "category": "Appliances"},
-        ],
-        "office": [
-            {"name": "Desk Light", "category": "ElectricsAndThermo"},
-            {"name": "Desk Plug", "category": "ElectricsAndThermo"},
-            {"name": "Desk Lamp", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "living_room": [
-            {"name": "Main Light", "category": "ElectricsAndThermo"},
-            {"name": "TV Plug", "category": "ElectricsAndThermo"},
-            {"name": "Thermostat", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "kitchen": [
-            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
-            {"name": "Counter Plug", "category": "ElectricsAndThermo"},
-            {"name": "Appliance Slot", "category": "Appliances"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-    },
-    "Map 2": {
-        "bedroom": [
-            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
-            {"name": "Side Plug", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "bathroom": [
-            {"name": "Vanity Light", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-            {"name": "Appliance Slot", "category": "Appliances"},
-        ],
-        "office": [
-            {"name": "Desk Light", "category": "ElectricsAndThermo"},
-            {"name": "Desk Plug", "category": "ElectricsAndThermo"},
-            {"name": "Desk Lamp", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "living_room": [
-            {"name": "Main Light", "category": "ElectricsAndThermo"},
-            {"name": " TV Plug", "category": "ElectricsAndThermo"},
-            {"name": "Thermostat", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "dining": [
-            {"name": "Main Light", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "kitchen": [
-            {"name": "Main Light", "category": "ElectricsAndThermo"},
-            {"name": "Counter Plug", "category": "ElectricsAndThermo"},
-            {"name": "Appliance Slot", "category": "Appliances"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-    },
-    "Map 3": {
-        "bedroom": [
-            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
-            {"name": "Side Plug", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "bathroom": [
-            {"name": "Vanity Light", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-            {"name": "Appliance Slot", "category": "Appliances"},
-        ],
-        "office": [
-            {"name": "Desk Light", "category": "ElectricsAndThermo"},
-            {"name": "Desk Plug", "category": "ElectricsAndThermo"},
-            {"name": "Desk Lamp", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "living_room": [
-            {"name": "Main Light", "category": "ElectricsAndThermo"},
-            {"name": "TV Plug", "category": "ElectricsAndThermo"},
-            {"name": "Thermostat", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "dining": [
-            {"name": "Main Light", "category": "ElectricsAndThermo"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-        "kitchen": [
-            {"name": "Main Light", "category": "ElectricsAndThermo"},
-            {"name": "Counter Plug", "category": "ElectricsAndThermo"},
-            {"name": "Appliance Slot", "category": "Appliances"},
-            {"name": "Misc Slot", "category": "Miscellaneous"},
-        ],
-    }
-}
-
 class Map:
     def __init__(self, screen, bg_path, rooms, y_offset=100):
         self.screen = screen
         self.y_offset = y_offset
 
-        loaded = pygame.image.load(bg_path).convert()
-        self.bg = pygame.transform.scale(loaded, (screen.get_width(), screen.get_height() - self.y_offset))
+        # decoded once and scaled once per screen size by the shared asset manager
+        self.bg = assets.get(bg_path, (screen.get_width(), screen.get_height() - self.y_offset), alpha=False, smooth=False)
+        if self.bg is None:
+            raise FileNotFoundError(f"cannot load map background {bg_path}")
         self.bg_rect = self.bg.get_rect(topleft=(0, self.y_offset))
 
         self.rooms = {name: rect.copy().move(0, self.y_offset) for name, rect in rooms.items()}
@@ -161,6 +52,16 @@ class Map:
         self.selected_room = None
         self.hovered_room = None
         self.room_items = {name: None for name in self.rooms}
+        self._drawn = None  # (bg, {room: state}) as of the last draw()
+
+    def _room_state(self, name):
+        return (name == self.selected_room, name == self.hovered_room, bool(self.room_items.get(name)))
+
+    def dirty_rects(self):
+        """Screen areas that need repainting since the last draw(): the rooms whose highlight changed."""
+        if self._drawn is None or self._drawn[0] is not self.bg:
+            return [self.bg_rect.unionall(list(self.rooms.values()))]
+        return [self.rooms[name].copy() for name, state in self._drawn[1].items() if state != self._room_state(name)]
 
     def draw(self):
         self.screen.blit(self.bg, self.bg_rect.topleft)
@@ -172,6 +73,7 @@ class Map:
             item = self.room_items.get(name)
             if item:
                 pygame.draw.circle(self.screen, (0, 0, 255), rect.center, min(rect.w, rect.h)//6)
+        self._drawn = (self.bg, {name: self._room_state(name) for name in self.rooms})
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEMOTION:
@@ -1,14 +1,26 @@
 from ui.button import Button
+from ui.text_cache import render_text_fit
+from ui.assets import assets
 import pygame, os
 
+def find_room_image(map_name, room_name):
+    """assets/rooms/<map>_<room>.png, else assets/rooms/<room>.png, else None."""
+    for candidate in (os.path.join("assets", "rooms", f"{map_name}_{room_name}.png"),
+                      os.path.join("assets", "rooms", f"{room_name}.png")):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
 class RoomPage:
-    def __init__(self, screen, font, small_font, map_name, room_name, slots_config, on_back, room_image_path=None):
+    def __init__(self, screen, font, small_font, map_name, room_name, slots_config, on_back, room_image_path=None, on_slot_change=None):
         self.screen = screen
         self.font = font
         self.small_font = small_font
         self.map_name = map_name
         self.room_name = room_name
         self.on_back = on_back
+        # called as on_slot_change(slot_idx, item, on) whenever a slot is placed, removed or toggled
+        self.on_slot_change = on_slot_change
         self.room_image_path = room_image_path
 
         self.slots = []
@@ -35,31 +47,24 @@ class RoomPage:
         # remove button (created when needed)
         self.remove_button = None
         self.remove_slot_idx = None
+        self._drawn = None  # _state() as of the last draw()
 
         if not self.room_image_path:
-            candidate1 = os.path.join("assets", "rooms", f"{self.map_name}_{self.room_name}.png")
-            candidate2 = os.path.join("assets", "rooms", f"{self.room_name}.png")
-            if os.path.exists(candidate1):
-                self.room_image_path = candidate1
-            elif os.path.exists(candidate2):
-                self.room_image_path = candidate2
-            else:
-                self.room_image_path = None
+            self.room_image_path = find_room_image(self.map_name, self.room_name)
         self._load_background()
 
     def _load_background(self):
-        self.bg_surf = None
-        if self.room_image_path:
-            try:
-                surf = pygame.image.load(self.room_image_path).convert_alpha()
-                self.bg_surf = pygame.transform.smoothscale(surf, self.screen.get_size())
-            except Exception:
-                self.bg_surf = None
+        self.bg_surf = assets.get(self.room_image_path, self.screen.get_size())
 
     def _on_back(self):
         if callable(self.on_back):
             self.on_back()
 
+    def _notify_slot_change(self, slot_idx):
+        if callable(self.on_slot_change):
+            slot = self.slots[slot_idx]
+            self.on_slot_change(slot_idx, slot["item"], slot["on"])
+
     def get_slot_at_pos(self, pos):
         """Return (idx, slot_dict, rect) if pos is over a slot, else (None, None, None)."""
         for idx in range(len(self.slots)):
@@ -77,11 +82,13 @@ class RoomPage:
             if self.remove_slot_idx == slot_idx:
                 self.remove_button = None
                 self.remove_slot_idx = None
+            self._notify_slot_change(slot_idx)
 
     def remove_item(self, slot_idx):
         if 0 <= slot_idx < len(self.slots):
             self.slots[slot_idx]["item"] = None
             self.slots[slot_idx]["on"] = False
+            self._notify_slot_change(slot_idx)
         self.remove_button = None
         self.remove_slot_idx = None
 
@@ -109,6 +116,7 @@ class RoomPage:
                     # toggle on/off for this slot
                     self.slots[idx]["on"] = not self.slots[idx].get("on", False)
                     print(f"[ROOM] Toggled slot {idx} ('{self.slots[idx]['name']}') -> {self.slots[idx]['on']}")
+                    self._notify_slot_change(idx)
                     return
 
                 if rect.collidepoint(event.pos):
@@ -177,19 +185,37 @@ class RoomPage:
             # if item present draw minimal preview (icon or name)
             if slot["item"]:
                 item = slot["item"]
-                icon_path = item.get("icon_path")
-                if icon_path and os.path.exists(icon_path):
-                    try:
-                        icon = pygame.image.load(icon_path).convert_alpha()
-                        icon = pygame.transform.smoothscale(icon, (rect.w-24, rect.h//2 - 8))
-                        self.screen.blit(icon, (rect.x + (rect.w - icon.get_width())//2, rect.y + rect.h//2 - icon.get_height()//2))
-                    except Exception:
-                        self._draw_item_text(item, rect)
+                icon = assets.get(item.get("icon_path"), (rect.w-24, rect.h//2 - 8))
+                if icon:
+                    self.screen.blit(icon, (rect.x + (rect.w - icon.get_width())//2, rect.y + rect.h//2 - icon.get_height()//2))
                 else:
                     self._draw_item_text(item, rect)
 
         # draw back button
         self.back_button.draw(self.screen)
+        self._drawn = self._state()
+
+    def _state(self):
+        slots = tuple((slot["item"].get("name"), slot["item"].get("icon_path"), slot["on"]) if slot["item"] else (None, None, slot["on"])
+                      for slot in self.slots)
+        remove = (self.remove_slot_idx, tuple(self.remove_button.rect)) if self.remove_button else None
+        return (self.bg_surf, self.screen.get_size(), slots, remove)
+
+    def _slot_area(self, idx):
+        # the slot and the On/Off toggle under it
+        rect = self._slot_rect(idx)
+        return rect.union(pygame.Rect(rect.x + (rect.w - 68)//2, rect.y + rect.h + 8, 68, 28))
+
+    def dirty_rects(self):
+        """Screen areas that need repainting since the last draw(): changed slots and the remove button."""
+        state = self._state()
+        old = self._drawn
+        if old is None or old[0] is not state[0] or old[1] != state[1] or len(old[2]) != len(state[2]):
+            return [self.screen.get_rect()]
+        rects = [self._slot_area(i) for i, (was, now) in enumerate(zip(old[2], state[2])) if was != now]
+        if old[3] != state[3]:
+            rects += [pygame.Rect(r[1]) for r in (old[3], state[3]) if r]
+        return rects
 
     def draw_remove_button(self, surface):
         """Draw remove button on top of everything (call this after item_bar.draw in main)."""
@@ -210,24 +236,13 @@ class RoomPage:
         """Return a Surface with text rendered small enough to fit inside max_w.
            Tries decreasing font sizes then truncates with ellipsis if needed.
            start_sizes: optional iterable of sizes to try first.
+           Surfaces come from the shared text cache; don't draw on them.
         """
         if start_sizes:
             sizes = tuple(start_sizes) + (26, 24, 22, 20, 18, 16, 14, 12, 10, 8)
         else:
             sizes = (28, 26, 24, 22, 20, 18, 16, 14, 12, 10, 8)
-
-        for size in sizes:
-            f = pygame.font.SysFont(None, size, bold=bold)
-            w, h = f.size(text)
-            if w <= max_w:
-                return f.render(text, True, (230,230,230))
-
-        # truncate with ellipsis as last resort
-        f = pygame.font.SysFont(None, 8, bold=bold)
-        txt = text
-        while txt and f.size(txt + '…')[0] > max_w:
-            txt = txt[:-1]
-        return f.render((txt + '…') if txt else '…', True, (230,230,230))
+        return render_text_fit(text, max_w, sizes, bold=bold)
 
 # if any default slot category strings exist replace them, e.g.:
     {"name": "Slot 1", "category": "ElectricsAndThermo"},
@@ -0,0 +1,115 @@
+# Slot layout per map/room. Kept free of pygame so headless tools can import it.
+
+# per-room slot configuration (normalized category names)
+# Rules applied:
+# - Bedrooms: ElectricsAndThermo (lighting), ElectricsAndThermo (plug), Miscellaneous
+# - Offices: ElectricsAndThermo (lighting), ElectricsAndThermo (plug), ElectricsAndThermo (desklight), Miscellaneous
+# - Living rooms: ElectricsAndThermo (lighting), ElectricsAndThermo (plug), ElectricsAndThermo (thermostat), Miscellaneous
+# - Bathrooms: ElectricsAndThermo (lighting), Miscellaneous, Appliances
+# - Dining: ElectricsAndThermo (lighting), Miscellaneous
+# - Kitchens: ElectricsAndThermo (lighting), ElectricsAndThermo (plug), Appliances, Miscellaneous
+ROOM_SLOTS = {
+    "Map 1": {
+        "bedroom": [
+            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
+            {"name": "Side Plug", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "bedroom2": [
+            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
+            {"name": "Side Plug", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "bathroom": [
+            {"name": "Vanity Light", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+            {"name": "Appliance Slot", "category": "Appliances"},
+        ],
+        "office": [
+            {"name": "Desk Light", "category": "ElectricsAndThermo"},
+            {"name": "Desk Plug", "category": "ElectricsAndThermo"},
+            {"name": "Desk Lamp", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "living_room": [
+            {"name": "Main Light", "category": "ElectricsAndThermo"},
+            {"name": "TV Plug", "category": "ElectricsAndThermo"},
+            {"name": "Thermostat", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "kitchen": [
+            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
+            {"name": "Counter Plug", "category": "ElectricsAndThermo"},
+            {"name": "Appliance Slot", "category": "Appliances"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+    },
+    "Map 2": {
+        "bedroom": [
+            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
+            {"name": "Side Plug", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "bathroom": [
+            {"name": "Vanity Light", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+            {"name": "Appliance Slot", "category": "Appliances"},
+        ],
+        "office": [
+            {"name": "Desk Light", "category": "ElectricsAndThermo"},
+            {"name": "Desk Plug", "category": "ElectricsAndThermo"},
+            {"name": "Desk Lamp", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "living_room": [
+            {"name": "Main Light", "category": "ElectricsAndThermo"},
+            {"name": " TV Plug", "category": "ElectricsAndThermo"},
+            {"name": "Thermostat", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "dining": [
+            {"name": "Main Light", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "kitchen": [
+            {"name": "Main Light", "category": "ElectricsAndThermo"},
+            {"name": "Counter Plug", "category": "ElectricsAndThermo"},
+            {"name": "Appliance Slot", "category": "Appliances"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+    },
+    "Map 3": {
+        "bedroom": [
+            {"name": "Ceiling Light", "category": "ElectricsAndThermo"},
+            {"name": "Side Plug", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "bathroom": [
+            {"name": "Vanity Light", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+            {"name": "Appliance Slot", "category": "Appliances"},
+        ],
+        "office": [
+            {"name": "Desk Light", "category": "ElectricsAndThermo"},
+            {"name": "Desk Plug", "category": "ElectricsAndThermo"},
+            {"name": "Desk Lamp", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "living_room": [
+            {"name": "Main Light", "category": "ElectricsAndThermo"},
+            {"name": "TV Plug", "category": "ElectricsAndThermo"},
+            {"name": "Thermostat", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "dining": [
+            {"name": "Main Light", "category": "ElectricsAndThermo"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+        "kitchen": [
+            {"name": "Main Light", "category": "ElectricsAndThermo"},
+            {"name": "Counter Plug", "category": "ElectricsAndThermo"},
+            {"name": "Appliance Slot", "category": "Appliances"},
+            {"name": "Misc Slot", "category": "Miscellaneous"},
+        ],
+    }
+}
@@ -0,0 +1,79 @@
+"""Re-price the recorded usage history (daily_item_usage) under every tariff plan.
+
+Usage (from the repo root):
+    python -m scripts.compare_tariffs
+    python -m scripts.compare_tariffs --plans "Economy 7" "Flat rate" --top 5
+
+Rows with a stored per-minute load curve (database.load_curves) are priced
+minute by minute; older rows that only carry a daily kWh total are priced as an
+even load over the day.
+"""
+import argparse
+import itertools
+
+from database.items_db import get_tariff_plans, iter_daily_item_usage
+from database.load_curves import LoadCurveStore
+from simulation.tariff import seed_default_plans, load_plan
+from simulation.tariff_compare import TariffComparison, flat_load_curves
+
+
+def _chunks(rows, size):
+    it = iter(rows)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def compare_history(plans, chunk_size=4096):
+    comparison = TariffComparison(plans)
+    curve_store = LoadCurveStore()
+    for chunk in _chunks(iter_daily_item_usage(), chunk_size):
+        load = flat_load_curves([r["energy"] for r in chunk])
+        with_curve = [n for n, r in enumerate(chunk) if r["curve_row"] is not None]
+        if with_curve:
+            load[with_curve] = curve_store.curves([chunk[n]["curve_row"] for n in with_curve])
+        rooms = [f"{r['map_name']}/{r['room_name']}" if r["room_name"] else "(no room)" for r in chunk]
+        items = [r["item_name"] or "(unknown item)" for r in chunk]
+        comparison.add(load, rooms, items, [r["cost"] for r in chunk])
+    return comparison
+
+
+def _print_savings(title, rows, top):
+    print(f"\n{title}")
+    print(f"{'':<32}  {'kWh':>10}  {'recorded £':>10}  {'cheapest £':>10}  {'saving £':>9}  best plan")
+    for label, energy, recorded, cheapest, saving, best in rows[:top]:
+        print(f"{label:<32}  {energy:>10.4f}  {recorded:>10.4f}  {cheapest:>10.4f}  {saving:>9.4f}  {best.name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare tariff plans over the recorded usage history.")
+    parser.add_argument("--plans", nargs="+", default=None, help="plan names (default: every stored plan)")
+    parser.add_argument("--top", type=int, default=10, help="rooms/items to list")
+    args = parser.parse_args(argv)
+
+    seed_default_plans()
+    names = args.plans or [p["name"] for p in get_tariff_plans()]
+    plans = []
+    for name in names:
+        plan = load_plan(name)
+        if plan is None:
+            parser.error(f"no tariff plan named {name!r}")
+        plans.append(plan)
+
+    comparison = compare_history(plans)
+    if not comparison.rows:
+        print("No usage history recorded yet.")
+        return
+    print(f"{comparison.rows} usage rows, {comparison.energy:.4f} kWh, recorded cost £{comparison.recorded:.4f}")
+    print(f"{'plan':<24}  {'cost £':>10}  {'vs recorded':>11}")
+    for plan, total in comparison.ranking():
+        print(f"{plan.name:<24}  {total:>10.4f}  {comparison.recorded - total:>+11.4f}")
+    print(f"\nCheapest plan: {comparison.plans[comparison.cheapest].name}")
+    _print_savings("Savings per room on the cheapest plan:", comparison.savings("room"), args.top)
+    _print_savings("Savings per item on the cheapest plan:", comparison.savings("item"), args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Bulk export/import of the recorded history in simulation.db.
+
+Usage (from the repo root):
+    python -m scripts.history_io export usage usage.csv
+    python -m scripts.history_io export curves curves.jsonl
+    python -m scripts.history_io export placements -            # JSONL to stdout
+    python -m scripts.history_io import usage usage.csv
+    python -m scripts.history_io import curves curves.jsonl --batch-size 500
+
+Tables: usage (daily_item_usage), placements, curves (per-minute load curves,
+see database.load_curves). Rows name their map, room and item instead of using
+ids, so a file can be imported into another database. The format follows the
+file extension (.csv, anything else is JSONL) unless --format is given; in CSV a
+curve is spread over 1440 columns m0000..m1439.
+
+Both directions stream: export reads with fetchmany and writes row by row,
+import reads the file in --batch-size chunks and writes each chunk with one
+executemany, so memory does not grow with the size of the history. Import
+dedupes on natural keys: a usage row or curve for the same (day, map, room,
+slot, item), empty fields included, or a placement for the same (map, room,
+slot), replaces the stored one, so importing a file twice changes nothing.
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+
+from database.items_db import (init_items_db, get_item_type_id, iter_daily_item_usage, iter_placements,
+                               record_daily_usage_batch, save_placements_batch)
+from database.load_curves import LoadCurveStore, MINUTES
+
+USAGE_FIELDS = ["day_index", "map_name", "room_name", "slot_index", "item_name", "energy", "cost", "created_at"]
+PLACEMENT_FIELDS = ["map_name", "room_name", "slot_index", "item_name", "on_state", "updated_at"]
+CURVE_FIELDS = ["day_index", "map_name", "room_name", "slot_index", "item_name"]
+MINUTE_FIELDS = [f"m{m:04d}" for m in range(MINUTES)]
+
+INT_FIELDS = {"day_index", "slot_index", "on_state"}
+FLOAT_FIELDS = {"energy", "cost"}
+
+
+def _chunks(rows, size):
+    it = iter(rows)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _curve_values(curve):
+    # 9 significant digits round-trip float32 exactly and keep the files small
+    return [float(f"{v:.9g}") for v in curve]
+
+
+# ------------- export -------------
+def export_usage(batch_size):
+    for r in iter_daily_item_usage(batch_size):
+        yield {f: r[f] for f in USAGE_FIELDS}
+
+
+def export_placements(batch_size):
+    for r in iter_placements(batch_size):
+        yield {f: r[f] for f in PLACEMENT_FIELDS}
+
+
+def export_curves(batch_size):
+    for r, curve in LoadCurveStore().iter_curves(batch_size):
+        out = {f: r[f] for f in CURVE_FIELDS}
+        out["curve"] = _curve_values(curve)
+        yield out
+
+
+def write_jsonl(records, fh):
+    n = 0
+    for rec in records:
+        fh.write(json.dumps(rec) + "\n")
+        n += 1
+    return n
+
+
+def write_csv(records, fh, fields):
+    writer = csv.writer(fh)
+    curves = fields is CURVE_FIELDS
+    writer.writerow(fields + MINUTE_FIELDS if curves else fields)
+    n = 0
+    for rec in records:
+        row = ["" if rec[f] is None else rec[f] for f in fields]
+        writer.writerow(row + rec["curve"] if curves else row)
+        n += 1
+    return n
+
+
+# ------------- import -------------
+def read_jsonl(fh):
+    for line in fh:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(fh):
+    reader = csv.reader(fh)
+    header = next(reader, None)
+    if header is None:
+        return
+    curve_at = header.index(MINUTE_FIELDS[0]) if MINUTE_FIELDS[0] in header else None
+    for row in reader:
+        if curve_at is None:
+            rec = dict(zip(header, row))
+        else:
+            rec = dict(zip(header[:curve_at], row[:curve_at]))
+            rec["curve"] = row[curve_at:curve_at + MINUTES]
+        for f, v in rec.items():
+            if v == "":
+                rec[f] = None
+            elif f in INT_FIELDS:
+                rec[f] = int(v)
+            elif f in FLOAT_FIELDS:
+                rec[f] = float(v)
+        yield rec
+
+
+class _ItemRefs:
+    """item_name -> item_types id; counts names the catalog does not know (those rows are skipped)."""
+
+    def __init__(self):
+        self.unknown = {}
+
+    def resolve(self, name):
+        if name is None:
+            return None, True
+        item_id = get_item_type_id(name)
+        if item_id is None:
+            self.unknown[name] = self.unknown.get(name, 0) + 1
+            return None, False
+        return item_id, True
+
+
+def import_usage(records, batch_size, items):
+    written = 0
+    for chunk in _chunks(records, batch_size):
+        rows = []
+        for r in chunk:
+            item_id, ok = items.resolve(r.get("item_name"))
+            if ok:
+                rows.append((r["day_index"], item_id, r["energy"], r["cost"], r.get("map_name"),
+                             r.get("room_name"), r.get("slot_index"), r.get("created_at")))
+        written += record_daily_usage_batch(rows)
+    return written
+
+
+def import_placements(records, batch_size, items):
+    written = 0
+    for chunk in _chunks(records, batch_size):
+        rows = []
+        for r in chunk:
+            item_id, ok = items.resolve(r.get("item_name"))
+            if ok:
+                rows.append((r["map_name"], r["room_name"], r["slot_index"], item_id,
+                             bool(r.get("on_state")), r.get("updated_at")))
+        written += save_placements_batch(rows)
+    return written
+
+
+def import_curves(records, batch_size, items):
+    store = LoadCurveStore()
+    written = 0
+    for chunk in _chunks(records, batch_size):
+        rows = []
+        for r in chunk:
+            if len(r["curve"]) != MINUTES:
+                raise ValueError(f"curve for day {r['day_index']} {r.get('room_name')} slot {r.get('slot_index')} "
+                                 f"has {len(r['curve'])} values, expected {MINUTES}")
+            item_id, ok = items.resolve(r.get("item_name"))
+            if ok:
+                rows.append((r["day_index"], r.get("map_name"), r.get("room_name"), r.get("slot_index"),
+                             item_id, [float(v) for v in r["curve"]]))
+        written += store.replace_rows(rows)
+    return written
+
+
+TABLES = {
+    "usage": (USAGE_FIELDS, export_usage, import_usage),
+    "placements": (PLACEMENT_FIELDS, export_placements, import_placements),
+    "curves": (CURVE_FIELDS, export_curves, import_curves),
+}
+
+
+def _format_of(path, fmt):
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream usage history, placements and load curves in or out of the DB.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("path", help="file to write/read, - for stdout/stdin")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per fetchmany/executemany")
+    args = parser.parse_args(argv)
+
+    init_items_db()
+    fields, exporter, importer = TABLES[args.table]
+    fmt = _format_of(args.path, args.format)
+    to_std = args.path == "-"
+    log = sys.stderr if to_std else sys.stdout
+
+    if args.command == "export":
+        fh = sys.stdout if to_std else open(args.path, "w", newline="", encoding="utf-8")
+        try:
+            records = exporter(args.batch_size)
+            n = write_csv(records, fh, fields) if fmt == "csv" else write_jsonl(records, fh)
+        finally:
+            if not to_std:
+                fh.close()
+        print(f"[DB] exported {n} {args.table} rows to {args.path}", file=log)
+        return
+
+    fh = sys.stdin if to_std else open(args.path, "r", newline="", encoding="utf-8")
+    items = _ItemRefs()
+    try:
+        records = read_csv(fh) if fmt == "csv" else read_jsonl(fh)
+        n = importer(records, args.batch_size, items)
+    finally:
+        if not to_std:
+            fh.close()
+    print(f"[DB] imported {n} {args.table} rows from {args.path}", file=log)
+    for name, count in sorted(items.unknown.items()):
+        print(f"[DB] skipped {count} rows for unknown item {name!r}", file=log)
+
+
+if __name__ == "__main__":
+    main()
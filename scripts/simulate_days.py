@@ -0,0 +1,75 @@
+"""Run simulated days headlessly (no pygame window) and print the daily totals.
+
+Usage (from the repo root):
+    python -m scripts.simulate_days "Map 2" --days 7
+    python -m scripts.simulate_days "Map 2" --days 30 --random-fill --seed 1
+    python -m scripts.simulate_days "Map 2" --days 7 --tariff "Economy 7"
+"""
+import argparse
+import random
+
+from database.item_catalog import get_catalog
+from database.items_db import load_placements_for_map
+from screens.room_slots import ROOM_SLOTS
+from simulation.engine import SimulationEngine, ACCOUNTING_MODES
+from simulation.tariff import seed_default_plans, load_plan
+
+
+def load_map_placements(map_name):
+    """Build engine-style placements for map_name from the saved placements table."""
+    saved = load_placements_for_map(map_name)
+    placements = {map_name: {}}
+    placements_on = {map_name: {}}
+    for room_name, slots_cfg in ROOM_SLOTS.get(map_name, {}).items():
+        room_saved = saved.get(room_name, {})
+        placements[map_name][room_name] = [room_saved.get(i, {}).get("item") for i in range(len(slots_cfg))]
+        placements_on[map_name][room_name] = [bool(room_saved.get(i, {}).get("on", False)) for i in range(len(slots_cfg))]
+    return placements, placements_on
+
+
+def random_fill(map_name, placements, placements_on, rng):
+    """Put a random catalog item (matching the slot category) into every empty slot, switched on."""
+    catalog = get_catalog()
+    for room_name, slots_cfg in ROOM_SLOTS.get(map_name, {}).items():
+        for i, slot in enumerate(slots_cfg):
+            if placements[map_name][room_name][i]:
+                continue
+            choices = catalog.category(slot["category"])
+            if choices:
+                placements[map_name][room_name][i] = rng.choice(choices)
+                placements_on[map_name][room_name][i] = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run simulated days without a display.")
+    parser.add_argument("map_name", choices=sorted(ROOM_SLOTS.keys()))
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--random-fill", action="store_true", help="fill empty slots with random catalog items")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--accounting", choices=ACCOUNTING_MODES, default="events")
+    parser.add_argument("--tariff", default=None, help="price with this stored tariff plan instead of each item's cost_per_kwh")
+    args = parser.parse_args(argv)
+
+    tariff = None
+    if args.tariff:
+        seed_default_plans()
+        tariff = load_plan(args.tariff)
+        if tariff is None:
+            parser.error(f"no tariff plan named {args.tariff!r}")
+
+    placements, placements_on = load_map_placements(args.map_name)
+    if args.random_fill:
+        random_fill(args.map_name, placements, placements_on, random.Random(args.seed))
+
+    engine = SimulationEngine(placements, placements_on, accounting=args.accounting, tariff=tariff)
+    total_energy = 0.0
+    total_cost = 0.0
+    for entry in engine.run_days(args.days):
+        total_energy += entry["energy"]
+        total_cost += entry["cost"]
+        print(f"Day {entry['day_index']}: {entry['energy']:.4f} kWh, £{entry['cost']:.4f}")
+    print(f"Total over {args.days} day(s): {total_energy:.4f} kWh, £{total_cost:.4f}")
+
+
+if __name__ == "__main__":
+    main()
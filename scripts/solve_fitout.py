@@ -0,0 +1,70 @@
+"""Compute the cheapest (or lowest-energy) fit-out of a map and compare it with the saved placements.
+
+Usage (from the repo root):
+    python -m scripts.solve_fitout "Map 2"
+    python -m scripts.solve_fitout "Map 2" --objective energy --hours 8 --slot-hours "kitchen/2=1.5"
+    python -m scripts.solve_fitout "Map 1" --objective cost --max-energy 20
+"""
+import argparse
+
+from database.items_db import get_all_items, load_placements_for_map
+from screens.room_slots import ROOM_SLOTS
+from simulation.solver import solve_fitout, assignment_totals
+from simulation.sweep import map_slots
+
+
+def parse_slot_hours(values, slots, default_hours):
+    """Turn --hours/--slot-hours into {(room, slot_index): minutes}."""
+    usage = {(room, idx): default_hours * 60.0 for room, idx, _ in slots}
+    for spec in values or []:
+        try:
+            where, hours = spec.split("=", 1)
+            room, idx = where.split("/", 1)
+            usage[(room, int(idx))] = float(hours) * 60.0
+        except ValueError:
+            raise SystemExit(f"bad --slot-hours value {spec!r} (expected ROOM/INDEX=HOURS)")
+    return usage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve for the minimum-cost or minimum-energy fit-out of a map.")
+    parser.add_argument("map_name", choices=sorted(ROOM_SLOTS.keys()))
+    parser.add_argument("--objective", choices=("cost", "energy"), default="cost")
+    parser.add_argument("--hours", type=float, default=24.0, help="daily usage hours for every slot")
+    parser.add_argument("--slot-hours", action="append", help="per-slot override ROOM/INDEX=HOURS (repeatable)")
+    caps = parser.add_mutually_exclusive_group()
+    caps.add_argument("--max-energy", type=float, default=None, help="daily kWh cap")
+    caps.add_argument("--max-cost", type=float, default=None, help="daily £ cap")
+    args = parser.parse_args(argv)
+
+    items = get_all_items()
+    slots = map_slots(args.map_name)
+    usage = parse_slot_hours(args.slot_hours, slots, args.hours)
+    result = solve_fitout(slots, items, usage, objective=args.objective, max_energy=args.max_energy, max_cost=args.max_cost)
+    if not result["feasible"]:
+        print("No fit-out satisfies the given caps.")
+        return
+
+    saved = load_placements_for_map(args.map_name)
+    current = [saved.get(room, {}).get(idx, {}).get("item") for room, idx, _ in slots]
+
+    print(f"{'slot':<32} {'current':<24} {'optimal':<24}")
+    for (room, idx, slot), cur, best in zip(slots, current, result["assignment"]):
+        print(f"{room + '/' + slot['name'].strip():<32} {(cur or {}).get('name', '-'):<24} {(best or {}).get('name', '-'):<24}")
+    print(f"\nOptimal fit-out: {result['energy']:.4f} kWh/day, £{result['cost']:.4f}/day"
+          + ("" if result["resolution"] is None else f" (cap resolved to {result['resolution']:.6g})"))
+
+    # like-for-like: only the slots that currently hold an item
+    occupied = [i for i, cur in enumerate(current) if cur]
+    if not occupied:
+        print("No saved placements for this map to compare against.")
+        return
+    cur_energy, cur_cost = assignment_totals([slots[i] for i in occupied], [current[i] for i in occupied], usage)
+    opt_energy, opt_cost = assignment_totals([slots[i] for i in occupied], [result["assignment"][i] for i in occupied], usage)
+    print(f"Occupied slots now:  {cur_energy:.4f} kWh/day, £{cur_cost:.4f}/day")
+    print(f"Same slots, optimal: {opt_energy:.4f} kWh/day, £{opt_cost:.4f}/day")
+    print(f"Savings: {cur_energy - opt_energy:.4f} kWh/day, £{cur_cost - opt_cost:.4f}/day")
+
+
+if __name__ == "__main__":
+    main()
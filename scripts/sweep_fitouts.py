@@ -0,0 +1,103 @@
+"""Rank many fit-outs of one map by daily kWh or cost, simulated across a process pool.
+
+Usage (from the repo root):
+    python -m scripts.sweep_fitouts "Map 2" --samples 20000 --workers 8 --out sweep_map2.csv
+    python -m scripts.sweep_fitouts "Map 1" --rank-by cost --top 5
+    python -m scripts.sweep_fitouts "Map 2" --rank-by cost --tariff "Economy 7" \
+        --default-window 7-23 --window "kitchen/0=0.5-7.5"
+"""
+import argparse
+import csv
+
+from database.items_db import get_all_items
+from screens.room_slots import ROOM_SLOTS
+from simulation.sweep import map_slots, slot_candidates, count_assignments, run_sweep, rank_results
+from simulation.tariff import seed_default_plans, load_plan
+
+
+def parse_span(text):
+    """'START-END' in hours of the day (e.g. '7-23' or '0.5-7.5') -> (start_minute, end_minute)."""
+    start, _, end = text.partition("-")
+    span = (round(float(start) * 60), round(float(end) * 60))
+    if not 0 <= span[0] < span[1] <= 1440:
+        raise ValueError(f"bad window {text!r}")
+    return span
+
+
+def build_windows(slots, window_args, default_window=None):
+    """On-windows for simulate_assignment from repeated 'ROOM/INDEX=START-END' arguments; slots
+       without one get default_window (or stay on all day when that is None)."""
+    windows = {}
+    for arg in window_args:
+        target, _, span = arg.rpartition("=")
+        room_name, _, idx = target.rpartition("/")
+        windows.setdefault((room_name, int(idx)), []).append(parse_span(span))
+    known = {(room_name, idx) for room_name, idx, _ in slots}
+    unknown = set(windows) - known
+    if unknown:
+        raise ValueError(f"no such slot(s): {', '.join(f'{r}/{i}' for r, i in sorted(unknown))}")
+    if default_window:
+        for key in known - set(windows):
+            windows[key] = [parse_span(default_window)]
+    return windows
+
+
+def stream_to_csv(results, path, slots, items):
+    """Write every result to `path` as it arrives (flushed per row) and pass it on."""
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["scenario", "energy_kwh", "cost"] + [f"{room}[{idx}]" for room, idx, _ in slots])
+        for result in results:
+            scenario_id, assignment, energy, cost = result
+            writer.writerow([scenario_id, f"{energy:.6f}", f"{cost:.6f}"] + [items[i]["name"] for i in assignment])
+            fh.flush()
+            yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many item assignments for a map and rank them.")
+    parser.add_argument("map_name", choices=sorted(ROOM_SLOTS.keys()))
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--samples", type=int, default=10000, help="sample this many assignments when there are more combinations")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rank-by", choices=("energy", "cost"), default="energy")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--out", default=None, help="CSV file that every result is streamed to")
+    parser.add_argument("--window", action="append", default=[], metavar="ROOM/INDEX=START-END",
+                        help="switch that slot on only between these hours (repeatable)")
+    parser.add_argument("--default-window", default=None, metavar="START-END",
+                        help="on-hours for slots without a --window (default: on all day)")
+    parser.add_argument("--tariff", default=None, help="price with this stored tariff plan instead of each item's cost_per_kwh")
+    args = parser.parse_args(argv)
+
+    tariff = None
+    if args.tariff:
+        seed_default_plans()
+        tariff = load_plan(args.tariff)
+        if tariff is None:
+            parser.error(f"no tariff plan named {args.tariff!r}")
+
+    items = get_all_items()
+    slots = map_slots(args.map_name)
+    try:
+        windows = build_windows(slots, args.window, args.default_window)
+    except ValueError as exc:
+        parser.error(str(exc))
+    total = count_assignments(slot_candidates(slots, items))
+    print(f"{args.map_name}: {len(slots)} slots, {total} possible assignments"
+          + (f" (sampling {args.samples})" if total > args.samples else ""))
+
+    results = run_sweep(args.map_name, items, workers=args.workers, samples=args.samples, seed=args.seed,
+                        windows=windows, tariff=tariff)
+    if args.out:
+        results = stream_to_csv(results, args.out, slots, items)
+    ranked = rank_results(results, top=args.top, by=args.rank_by)
+
+    print(f"{'rank':>4}  {'kWh/day':>10}  {'£/day':>8}  assignment")
+    for rank, (scenario_id, assignment, energy, cost) in enumerate(ranked, 1):
+        names = ", ".join(f"{room}/{slot['name'].strip()}={items[i]['name']}" for (room, _, slot), i in zip(slots, assignment))
+        print(f"{rank:>4}  {energy:>10.4f}  {cost:>8.4f}  {names}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# playback speeds offered by the UI, as multiples of the base minutes_per_second
+SPEEDS = (0, 1, 10, 100, 1000)
+
+
+class FixedStepClock:
+    """Turns variable frame times into a whole number of fixed simulation steps.
+
+    Each step is exactly `step_minutes` simulated minutes, so the engine sees the
+    same sequence of step sizes on every machine whatever the frame rate; only how
+    many steps land in each frame differs. One frame runs at most
+    `max_catchup_seconds` of real time worth of steps; after a longer stall the
+    excess is dropped, not carried into later frames (the simulation slows down
+    instead of spiralling), and counted in `dropped_steps`. `speed` scales the
+    base rate (0 pauses).
+    """
+
+    def __init__(self, step_minutes=1.0, minutes_per_second=48.0, max_catchup_seconds=0.25, speed=1):
+        if step_minutes <= 0:
+            raise ValueError("step_minutes must be positive")
+        self.step_minutes = float(step_minutes)
+        self.minutes_per_second = float(minutes_per_second)
+        self.max_catchup_seconds = float(max_catchup_seconds)
+        self.speed = speed
+        self.reset()
+
+    def reset(self):
+        self.accumulator = 0.0   # simulated minutes owed but not yet stepped
+        self.dropped_steps = 0   # steps discarded by the per-frame cap
+
+    @property
+    def rate(self):
+        """Simulated minutes per real second at the current speed."""
+        return self.minutes_per_second * self.speed
+
+    @property
+    def paused(self):
+        return self.speed == 0
+
+    @property
+    def max_steps_per_frame(self):
+        return max(1, int(self.rate * self.max_catchup_seconds / self.step_minutes))
+
+    def set_speed(self, speed):
+        if speed < 0:
+            raise ValueError("speed must not be negative")
+        self.speed = speed
+        # a new speed should not inherit a backlog built up at the old one
+        self.accumulator %= self.step_minutes
+
+    def tick(self, dt):
+        """Add dt real seconds; return how many fixed steps to run this frame."""
+        if dt > 0:
+            self.accumulator += dt * self.rate
+        steps = int(self.accumulator // self.step_minutes)
+        cap = self.max_steps_per_frame
+        if steps > cap:
+            self.dropped_steps += steps - cap
+            steps = cap
+            # keep only the fractional part so the backlog cannot grow without bound
+            self.accumulator %= self.step_minutes
+        else:
+            self.accumulator -= steps * self.step_minutes
+        return steps
+
+    @property
+    def alpha(self):
+        """How far (0..1) real time has progressed into the next step; for interpolating display values."""
+        return min(1.0, self.accumulator / self.step_minutes)
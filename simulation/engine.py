@@ -0,0 +1,271 @@
+import bisect
+from datetime import datetime
+
+import numpy as np
+
+from simulation.placement_store import PlacementStore
+
+# a simulated day is 1440 minutes regardless of how fast it is played back
+MINUTES_PER_DAY = 1440.0
+
+# "frame": every advance() call adds total power x delta-minutes to the meter
+# "events": slots emit timestamped place/remove/toggle events and each on-interval
+#           is integrated exactly as epm x duration (cost ~ number of events)
+# Both keep the running total power in a PlacementStore, so a tick is O(1).
+ACCOUNTING_MODES = ("frame", "events")
+
+
+class SimulationEngine:
+    """Headless energy simulation (no display, no fonts).
+
+    Works on the same placement structures the UI keeps:
+      placements[map_name][room_name] = [ item_dict_or_None, ... ]
+      placements_on[map_name][room_name] = [ bool, ... ]
+    Time is measured in simulated minutes; callers decide how fast to advance it.
+    Slot changes should go through set_slot() so they are timestamped; callers
+    that mutate those structures in place must call mark_dirty() instead.
+    Daily scheduled toggles (schedule_toggle) are applied at their exact minute
+    however large the advance() step is.
+    """
+
+    def __init__(self, placements=None, placements_on=None, accounting="frame", tariff=None):
+        if accounting not in ACCOUNTING_MODES:
+            raise ValueError(f"unknown accounting mode {accounting!r} (expected one of {ACCOUNTING_MODES})")
+        self.accounting = accounting
+        self.store = PlacementStore(placements, placements_on, tariff)
+
+        self.running = False
+        self.day_number = 0      # number of completed days
+        self.daily_history = []  # list of {"day_index", "energy", "cost", "date"}
+        # optional callback(entry, slot_usage) run by finish_day(), e.g. to persist the day
+        self.on_day_finished = None
+        # recurring daily toggles, sorted: [(minute, map, room, slot, on), ...]
+        self.schedule = []
+        self.reset_day()
+
+    @property
+    def placements(self):
+        return self.store.placements
+
+    @property
+    def placements_on(self):
+        return self.store.placements_on
+
+    @property
+    def tariff(self):
+        """The household TariffPlan, or None when items are priced at their own cost_per_kwh."""
+        return self.store.tariff
+
+    def set_tariff(self, tariff):
+        """Price everything from the current minute on with tariff (a TariffPlan or None)."""
+        self.store.set_tariff(tariff, self.minute_of_day)
+
+    @property
+    def placements_version(self):
+        """Changes whenever placements/placements_on change through the engine."""
+        return self.store.version
+
+    def set_placements(self, placements, placements_on):
+        """Point the engine at a (new) placement set, e.g. after the UI resets it."""
+        self.store.load(placements, placements_on, self.minute_of_day)
+
+    def mark_dirty(self):
+        """Placements or on/off states changed in place; rebuild the store.
+           The changes are treated as happening at the current minute."""
+        self.store.load(self.store.placements, self.store.placements_on, self.minute_of_day)
+
+    def set_slot(self, map_name, room_name, slot_index, item, on):
+        """Place, remove or toggle one slot at the current simulated minute.
+           The room lists must already exist in placements/placements_on."""
+        self.store.set_slot(map_name, room_name, slot_index, item, on, self.minute_of_day)
+
+    def schedule_toggle(self, minute, map_name, room_name, slot_index, on):
+        """Switch a slot on/off at `minute` every simulated day."""
+        entry = (float(minute), map_name, room_name, slot_index, bool(on))
+        index = bisect.bisect_right(self.schedule, entry)
+        self.schedule.insert(index, entry)
+        # the cursor follows the entries already applied today; a new one joins them (and first
+        # fires tomorrow) if it lands among them or its minute has passed, and is never re-applied
+        if index < self._next_scheduled or entry[0] < self.minute_of_day:
+            self._next_scheduled += 1
+
+    def clear_schedule(self):
+        self.schedule = []
+        self._next_scheduled = 0
+
+    def _apply_scheduled(self, entry):
+        _, map_name, room_name, slot_index, on = entry
+        items = self.placements.get(map_name, {}).get(room_name)
+        if items is None or slot_index >= len(items):
+            return
+        self.set_slot(map_name, room_name, slot_index, items[slot_index], on)
+
+    def reset_day(self):
+        self._next_scheduled = 0
+        self.minute_of_day = 0.0
+        self._energy = 0.0
+        self._cost = 0.0
+        self.store.reset_day()
+
+    @property
+    def total_power(self):
+        """kWh per simulated minute of everything currently switched on."""
+        return self.store.total_power
+
+    @property
+    def daily_energy_kwh(self):
+        if self.accounting == "events":
+            return self.store.energy_at(self.minute_of_day)
+        return self._energy
+
+    @property
+    def daily_cost(self):
+        if self.accounting == "events":
+            return self.store.cost_at(self.minute_of_day)
+        return self._cost
+
+    @property
+    def daily_item_usage(self):
+        """{ item_name: {"energy": kWh, "cost": £, "category": "...", "epm": kWh/min} }"""
+        item_energy, item_cost, seen = self.store.item_totals(self.minute_of_day)
+        arrays = self.store.arrays
+        usage = {}
+        for idx in np.flatnonzero(seen):
+            info = arrays.item_info[idx]
+            usage[arrays.item_names[idx]] = {
+                "energy": float(item_energy[idx]),
+                "cost": float(item_cost[idx]),
+                "category": info["category"],
+                "epm": info["epm"]
+            }
+        return usage
+
+    @property
+    def daily_slot_usage(self):
+        """[{"map", "room", "slot", "item", "item_type_id", "category", "energy", "cost"}, ...]
+           per slot (and per item, if a slot's item changed during the day)."""
+        arrays = self.store.arrays
+        usage = []
+        for ((map_name, room_name, slot_index), idx), (energy, cost) in self.store.slot_totals(self.minute_of_day).items():
+            info = arrays.item_info[idx]
+            usage.append({
+                "map": map_name,
+                "room": room_name,
+                "slot": slot_index,
+                "item": arrays.item_names[idx],
+                "item_type_id": info["id"],
+                "category": info["category"],
+                "energy": energy,
+                "cost": cost
+            })
+        return usage
+
+    def daily_load_curves(self):
+        """[{"map", "room", "slot", "item", "item_type_id", "curve"}, ...] where curve holds
+           the kWh drawn in each minute of the day so far (same keys as daily_slot_usage)."""
+        arrays = self.store.arrays
+        curves = []
+        for ((map_name, room_name, slot_index), idx), curve in self.store.load_curves(self.minute_of_day, int(MINUTES_PER_DAY)).items():
+            curves.append({
+                "map": map_name,
+                "room": room_name,
+                "slot": slot_index,
+                "item": arrays.item_names[idx],
+                "item_type_id": arrays.item_info[idx]["id"],
+                "curve": curve
+            })
+        return curves
+
+    def projected(self, extra_minutes):
+        """(minute, energy, cost) as if the running day were extra_minutes further on.
+           For renderers interpolating between fixed steps; does not change any state."""
+        extra = min(max(0.0, float(extra_minutes)), self.minutes_remaining) if self.running else 0.0
+        return (self.minute_of_day + extra,
+                self.daily_energy_kwh + self.store.total_power * extra,
+                self.daily_cost + self.store.cost_between(self.minute_of_day, self.minute_of_day + extra))
+
+    def start_day(self):
+        self.reset_day()
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    @property
+    def day_finished(self):
+        return self.minute_of_day >= MINUTES_PER_DAY
+
+    @property
+    def minutes_remaining(self):
+        return max(0.0, MINUTES_PER_DAY - self.minute_of_day)
+
+    def _advance_to(self, minute):
+        step = minute - self.minute_of_day
+        if step <= 0:
+            return
+        if self.accounting == "frame":
+            self._energy += self.store.total_power * step
+            self._cost += self.store.cost_between(self.minute_of_day, minute)
+        self.minute_of_day = minute
+
+    def advance(self, minutes):
+        """Advance the current day by up to `minutes` simulated minutes.
+           Any scheduled toggles inside the step are applied at their own minute.
+           Stops at the end of the day; returns the minutes actually simulated."""
+        if not self.running or minutes <= 0:
+            return 0.0
+        start = self.minute_of_day
+        target = start + min(float(minutes), self.minutes_remaining)
+
+        schedule = self.schedule
+        while self._next_scheduled < len(schedule) and schedule[self._next_scheduled][0] <= target:
+            entry = schedule[self._next_scheduled]
+            self._next_scheduled += 1
+            self._advance_to(entry[0])
+            self._apply_scheduled(entry)
+        self._advance_to(target)
+
+        if self.day_finished:
+            self.minute_of_day = MINUTES_PER_DAY
+            self.running = False
+        return self.minute_of_day - start
+
+    def run_to_end_of_day(self):
+        """Simulate the rest of the current day in one go (no wall-clock wait)."""
+        if not self.running and not self.day_finished:
+            self.running = True
+        self.advance(self.minutes_remaining)
+
+    def finish_day(self):
+        """Save today's totals into history and return the history entry."""
+        self.day_number += 1
+        entry = {
+            "day_index": self.day_number,
+            "energy": self.daily_energy_kwh,
+            "cost": self.daily_cost,
+            "date": datetime.utcnow().isoformat()
+        }
+        self.daily_history.append(entry)
+        self.running = False
+        if self.on_day_finished:
+            self.on_day_finished(entry, self.daily_slot_usage)
+        return entry
+
+    def fast_forward_days(self, days):
+        """Finish the current day, then simulate days-1 more whole days.
+           Every day but the last is saved to history; the last is left finished
+           but unsaved, exactly like a day that ran out on its own."""
+        self.run_to_end_of_day()
+        for _ in range(int(days) - 1):
+            self.finish_day()
+            self.start_day()
+            self.run_to_end_of_day()
+
+    def run_days(self, days):
+        """Simulate `days` whole days back to back; returns their history entries."""
+        out = []
+        for _ in range(int(days)):
+            self.start_day()
+            self.run_to_end_of_day()
+            out.append(self.finish_day())
+        return out
@@ -0,0 +1,92 @@
+import numpy as np
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except Exception:
+        return 0.0
+
+
+class PlacementArrays:
+    """Occupied slots packed into contiguous NumPy arrays.
+
+    Each slot key (map_name, room_name, slot_index) owns one row:
+      epm[row]    kWh per simulated minute of the placed item
+      tariff[row] £ per kWh of the placed item
+      on[row]     True if the slot is switched on
+      item[row]   index into item_names (items are keyed by name, like the day summary)
+      since[row]  simulated minute the current on-interval started
+    Rows are updated in place when a slot changes and freed rows are reused, so a
+    place/remove/toggle never repacks the whole set. Free rows are all zeros.
+    """
+
+    def __init__(self, capacity=64):
+        self.item_names = []
+        self.item_info = []  # aligned with item_names: {"category": ..., "epm": ..., "id": item_types id or None}
+        self._item_index = {}
+        self.clear(capacity)
+
+    def clear(self, capacity=64):
+        self.rows = {}  # { slot_key: row }
+        self._free = []
+        self.size = 0   # rows [0, size) have been handed out at least once
+        self.epm = np.zeros(capacity)
+        self.tariff = np.zeros(capacity)
+        self.on = np.zeros(capacity, dtype=bool)
+        self.item = np.zeros(capacity, dtype=np.intp)
+        self.since = np.zeros(capacity)
+
+    @property
+    def item_count(self):
+        return len(self.item_names)
+
+    def item_id(self, itm):
+        """Return the index for itm's name, registering it on first sight."""
+        name = itm.get("name", "Unknown")
+        idx = self._item_index.get(name)
+        if idx is None:
+            idx = len(self.item_names)
+            self._item_index[name] = idx
+            self.item_names.append(name)
+            self.item_info.append({"category": itm.get("category", ""), "epm": _as_float(itm.get("energy_per_min", 0.0)), "id": itm.get("id")})
+        return idx
+
+    def _alloc_row(self):
+        if self._free:
+            return self._free.pop()
+        if self.size == len(self.epm):
+            grow = max(64, self.size)
+            self.epm = np.concatenate((self.epm, np.zeros(grow)))
+            self.tariff = np.concatenate((self.tariff, np.zeros(grow)))
+            self.on = np.concatenate((self.on, np.zeros(grow, dtype=bool)))
+            self.item = np.concatenate((self.item, np.zeros(grow, dtype=np.intp)))
+            self.since = np.concatenate((self.since, np.zeros(grow)))
+        row = self.size
+        self.size += 1
+        return row
+
+    def set(self, key, itm, on, minute):
+        """Write one slot's row (or free it when itm is None); returns the row or None."""
+        row = self.rows.get(key)
+        if not itm:
+            if row is not None:
+                del self.rows[key]
+                self.epm[row] = self.tariff[row] = self.since[row] = 0.0
+                self.on[row] = False
+                self.item[row] = 0
+                self._free.append(row)
+            return None
+        if row is None:
+            row = self._alloc_row()
+            self.rows[key] = row
+        self.epm[row] = _as_float(itm.get("energy_per_min", 0.0))
+        self.tariff[row] = _as_float(itm.get("cost_per_kwh", 0.0))
+        self.on[row] = bool(on)
+        self.item[row] = self.item_id(itm)
+        self.since[row] = minute
+        return row
+
+    def per_item(self, values):
+        """Sum a per-row array (length self.size) into a per-item array (indexed like item_names)."""
+        return np.bincount(self.item[:self.size], weights=values, minlength=self.item_count)
@@ -0,0 +1,210 @@
+import numpy as np
+
+from simulation.placement_arrays import PlacementArrays
+
+
+class PlacementStore:
+    """Placement set with an incrementally maintained active index and total power.
+
+    Wraps the UI's structures:
+      placements[map_name][room_name] = [ item_dict_or_None, ... ]
+      placements_on[map_name][room_name] = [ bool, ... ]
+    set_slot() is O(1): it updates those lists, the slot's row in the packed
+    arrays and the running totals. Per-item daily totals are only settled when a
+    slot's on-interval ends (or when item_totals() is asked for them).
+
+    Costs use each item's flat cost_per_kwh unless a TariffPlan is set, in which
+    case every interval is priced from the plan's cumulative price integral. Both
+    cases share one formula over a "tariff clock" T: an interval costs
+    epm * weight * (T(end) - T(start)), with T(m) = m and weight = cost_per_kwh for
+    flat prices, or T = the plan's integral and weight = 1.
+    """
+
+    def __init__(self, placements=None, placements_on=None, tariff=None):
+        self.arrays = PlacementArrays()
+        self.tariff = tariff
+        self.load(placements if placements is not None else {}, placements_on if placements_on is not None else {})
+
+    def load(self, placements, placements_on, minute=0.0):
+        """Rebuild from scratch (O(slots)); used when the structures were replaced or
+           mutated in place. Open intervals are settled at `minute` and reopened there."""
+        if hasattr(self, "active"):
+            self._settle_all(minute)
+        else:
+            self._reset_closed()
+        self.placements = placements
+        self.placements_on = placements_on
+        # bumped on every change to placements/placements_on, so views built from them know to rebuild
+        self.version = getattr(self, "version", 0) + 1
+        self.arrays.clear()
+        self.active = {}            # { (map, room, slot): row } for slots that are ON with an item
+        self.total_power = 0.0      # kWh per simulated minute of everything switched on
+        self.total_cost_rate = 0.0  # £ per unit of the tariff clock of everything switched on
+        self._power_since = 0.0     # sum of epm * since over active rows
+        self._cost_since = 0.0      # sum of epm * weight * T(since) over active rows
+        for map_name, rooms in placements.items():
+            for room_name, items in rooms.items():
+                ons = placements_on.get(map_name, {}).get(room_name, [])
+                for idx, itm in enumerate(items):
+                    if itm:
+                        self._write((map_name, room_name, idx), itm, idx < len(ons) and ons[idx], minute)
+
+    def _clock(self, minute):
+        """T(minute): the tariff clock intervals are priced against."""
+        return self.tariff.cum_at(minute) if self.tariff is not None else minute
+
+    def _weight(self, row):
+        return 1.0 if self.tariff is not None else float(self.arrays.tariff[row])
+
+    def set_tariff(self, tariff, minute=0.0):
+        """Switch to a TariffPlan (or None for flat item prices) from `minute` on."""
+        self._settle_all(minute)
+        self.tariff = tariff
+        self.load(self.placements, self.placements_on, minute)
+
+    def _reset_closed(self):
+        self.closed_energy = 0.0
+        self.closed_cost = 0.0
+        self.item_energy = np.zeros(0)
+        self.item_cost = np.zeros(0)
+        self.item_seen = np.zeros(0, dtype=bool)
+        self.slot_closed = {}  # { (slot_key, item_index): [energy, cost] } of intervals closed today
+        self.day_intervals = []  # [(slot_key, item_index, start, end, epm), ...] closed today
+
+    def _grow_item_totals(self):
+        grow = self.arrays.item_count - len(self.item_energy)
+        if grow > 0:
+            self.item_energy = np.concatenate((self.item_energy, np.zeros(grow)))
+            self.item_cost = np.concatenate((self.item_cost, np.zeros(grow)))
+            self.item_seen = np.concatenate((self.item_seen, np.zeros(grow, dtype=bool)))
+
+    def reset_day(self):
+        """Zero the day's totals; everything currently on starts a new interval at minute 0."""
+        self._reset_closed()
+        self._grow_item_totals()
+        size = self.arrays.size
+        self.arrays.since[:size] = 0.0
+        self._power_since = 0.0
+        self._cost_since = 0.0
+        for row in self.active.values():
+            self.item_seen[self.arrays.item[row]] = True
+
+    def _close(self, key, minute):
+        row = self.active.pop(key, None)
+        if row is None:
+            return
+        a = self.arrays
+        epm, weight, since = float(a.epm[row]), self._weight(row), float(a.since[row])
+        since_clock = self._clock(since)
+        if minute > since:
+            # an empty interval (switched on and off in the same minute) used nothing
+            energy = epm * (minute - since)
+            cost = epm * weight * (self._clock(minute) - since_clock)
+            self.closed_energy += energy
+            self.closed_cost += cost
+            self.item_energy[a.item[row]] += energy
+            self.item_cost[a.item[row]] += cost
+            totals = self.slot_closed.setdefault((key, int(a.item[row])), [0.0, 0.0])
+            totals[0] += energy
+            totals[1] += cost
+            self.day_intervals.append((key, int(a.item[row]), since, minute, epm))
+        self.total_power -= epm
+        self.total_cost_rate -= epm * weight
+        self._power_since -= epm * since
+        self._cost_since -= epm * weight * since_clock
+        if not self.active:
+            # drop accumulated rounding once nothing is on
+            self.total_power = self.total_cost_rate = 0.0
+            self._power_since = self._cost_since = 0.0
+
+    def _write(self, key, itm, on, minute):
+        row = self.arrays.set(key, itm, on and bool(itm), minute)
+        if row is None or not self.arrays.on[row]:
+            return
+        self._grow_item_totals()
+        a = self.arrays
+        epm, weight = float(a.epm[row]), self._weight(row)
+        self.active[key] = row
+        self.item_seen[a.item[row]] = True
+        self.total_power += epm
+        self.total_cost_rate += epm * weight
+        self._power_since += epm * minute
+        self._cost_since += epm * weight * self._clock(minute)
+
+    def _settle_all(self, minute):
+        for key in list(self.active):
+            self._close(key, minute)
+
+    def set_slot(self, map_name, room_name, slot_index, item, on, minute):
+        """Place, remove or toggle one slot at `minute`. The room lists must exist."""
+        on = bool(on)
+        self.placements[map_name][room_name][slot_index] = item
+        self.placements_on[map_name][room_name][slot_index] = on
+        self.version += 1
+        key = (map_name, room_name, slot_index)
+        self._close(key, minute)
+        self._write(key, item, on, minute)
+
+    def is_active(self, map_name, room_name, slot_index):
+        return (map_name, room_name, slot_index) in self.active
+
+    def energy_at(self, minute):
+        """Day energy (kWh) so far, with every open interval integrated up to `minute`."""
+        return self.closed_energy + self.total_power * minute - self._power_since
+
+    def cost_at(self, minute):
+        """Day cost (£) so far, with every open interval priced up to `minute`."""
+        return self.closed_cost + self.total_cost_rate * self._clock(minute) - self._cost_since
+
+    def cost_between(self, start, end):
+        """£ the currently active set costs from minute start to minute end."""
+        return self.total_cost_rate * (self._clock(end) - self._clock(start))
+
+    def slot_totals(self, minute):
+        """{ (slot_key, item_index): [energy, cost] } for the day up to `minute`; a slot
+           that held several items today has one entry per item."""
+        out = {k: list(v) for k, v in self.slot_closed.items()}
+        a = self.arrays
+        now = self._clock(minute)
+        for key, row in self.active.items():
+            epm, since = float(a.epm[row]), float(a.since[row])
+            if minute <= since:
+                continue
+            totals = out.setdefault((key, int(a.item[row])), [0.0, 0.0])
+            totals[0] += epm * (minute - since)
+            totals[1] += epm * self._weight(row) * (now - self._clock(since))
+        return out
+
+    def load_curves(self, minute, length):
+        """{ (slot_key, item_index): array of kWh drawn in each of `length` minutes } for the
+           day up to `minute`; partial minutes at interval ends are counted pro rata."""
+        a = self.arrays
+        intervals = list(self.day_intervals)
+        for key, row in self.active.items():
+            if minute > a.since[row]:
+                intervals.append((key, int(a.item[row]), float(a.since[row]), minute, float(a.epm[row])))
+        starts = np.arange(length, dtype=float)
+        out = {}
+        for key, item_idx, start, end, epm in intervals:
+            curve = out.get((key, item_idx))
+            if curve is None:
+                curve = out[(key, item_idx)] = np.zeros(length)
+            # overlap of [start, end) with each minute [m, m + 1)
+            curve += epm * (np.clip(end - starts, 0.0, 1.0) - np.clip(start - starts, 0.0, 1.0))
+        return out
+
+    def item_totals(self, minute):
+        """Per-item (energy, cost, seen) arrays for the day up to `minute`."""
+        self._grow_item_totals()
+        a = self.arrays
+        size = a.size
+        on = a.on[:size]
+        epm, since = a.epm[:size], a.since[:size]
+        open_energy = np.where(on, epm * (minute - since), 0.0)
+        if self.tariff is not None:
+            open_cost = np.where(on, epm * (self.tariff.cum_at(minute) - self.tariff.cum_at(since)), 0.0)
+        else:
+            open_cost = open_energy * a.tariff[:size]
+        energy = self.item_energy + a.per_item(open_energy)
+        cost = self.item_cost + a.per_item(open_cost)
+        return energy, cost, self.item_seen.copy()
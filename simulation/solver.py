@@ -0,0 +1,196 @@
+"""Minimum-cost (or minimum-energy) fit-out of a set of slots.
+
+Each slot takes one catalog item of its category and runs for that slot's daily
+usage minutes. Items that are dominated within their category (no better on
+either energy or cost rate than another item) are pruned first. Without a cap the
+objective is separable, so every slot simply takes its best remaining item.
+With a daily energy (or cost) cap the slots are coupled; that case is a
+multiple-choice knapsack and is solved by dynamic programming over the cap.
+"""
+import numpy as np
+
+from simulation.engine import MINUTES_PER_DAY
+
+
+def item_rates(item):
+    """(kWh per minute, £ per minute) of an item that is switched on."""
+    try:
+        epm = float(item.get("energy_per_min", 0.0))
+        tariff = float(item.get("cost_per_kwh", 0.0))
+    except Exception:
+        return 0.0, 0.0
+    return epm, epm * tariff
+
+
+def pareto_front(items, indices):
+    """Indices (into items) that are not dominated on (energy rate, cost rate),
+       ordered by increasing energy / decreasing cost."""
+    ranked = sorted(indices, key=lambda i: item_rates(items[i]))
+    front = []
+    best_cost = None
+    for i in ranked:
+        cost = item_rates(items[i])[1]
+        if best_cost is None or cost < best_cost:
+            front.append(i)
+            best_cost = cost
+    return front
+
+
+def _slot_candidates(slots, items, usage_minutes, objective):
+    """Per slot: [(objective, energy, cost, item_index), ...] sorted by objective.
+       Slots that share (category, minutes) share one candidate list."""
+    by_category = {}
+    for i, itm in enumerate(items):
+        by_category.setdefault(itm.get("category"), []).append(i)
+    fronts = {}
+    shared = {}
+    out = []
+    for room_name, idx, slot in slots:
+        minutes = usage_minutes.get((room_name, idx), MINUTES_PER_DAY) if usage_minutes else MINUTES_PER_DAY
+        key = (slot["category"], minutes)
+        if key not in shared:
+            cat = slot["category"]
+            if cat not in fronts:
+                fronts[cat] = pareto_front(items, by_category.get(cat, []))
+            cands = []
+            for i in fronts[cat]:
+                epm, cpm = item_rates(items[i])
+                energy, cost = epm * minutes, cpm * minutes
+                cands.append((cost if objective == "cost" else energy, energy, cost, i))
+            cands.sort()
+            shared[key] = cands
+        out.append(shared[key])
+    return out
+
+
+# relative float tolerance when checking a solution against its cap
+_CAP_SLACK = 1e-9
+
+
+def _knapsack_dp(cands, cap, cap_field, buckets, round_up):
+    """Minimise the summed objective subject to sum(cap_field) <= cap.
+
+    Multiple-choice knapsack solved by DP over the cap split into `buckets` steps.
+    With round_up each candidate's capped quantity is rounded up to whole steps, so
+    the answer always respects the true cap; otherwise it is rounded to the nearest
+    step, which wastes far less of the cap but may overshoot it slightly.
+    Returns the chosen candidate index per slot, or None if nothing fits.
+    """
+    if cap < 0:
+        return None
+    if cap == 0:
+        # no cap to split into steps: only candidates that use none of it fit
+        size = 1
+        to_steps = lambda q: 0 if q <= 0 else 1
+    else:
+        size = buckets + 1
+        step = cap / buckets
+        to_steps = (lambda q: int(np.ceil(q / step - 1e-9))) if round_up else (lambda q: int(np.rint(q / step)))
+    best = np.zeros(size)  # best[b] = min objective so far using at most b steps
+    choices = []
+    for slot_cands in cands:
+        new = np.full(size, np.inf)
+        pick = np.zeros(size, dtype=np.uint16)
+        for k, cand in enumerate(slot_cands):
+            w = to_steps(cand[cap_field])
+            if w >= size:
+                continue
+            trial = np.full(size, np.inf)
+            trial[w:] = best[:size - w] + cand[0]
+            better = trial < new
+            new[better] = trial[better]
+            pick[better] = k
+        best = new
+        choices.append(pick)
+    if not np.isfinite(best[-1]):
+        return None
+    out = [0] * len(cands)
+    b = size - 1
+    for d in range(len(cands) - 1, -1, -1):
+        k = int(choices[d][b])
+        out[d] = k
+        b -= to_steps(cands[d][k][cap_field])
+    return out
+
+
+def solve_fitout(slots, items, usage_minutes=None, objective="cost", max_energy=None, max_cost=None, buckets=4096):
+    """Choose one item per slot minimising daily cost or energy.
+
+    slots: [(room_name, slot_index, slot_cfg), ...] (see simulation.sweep.map_slots)
+    items: catalog as a list of item dicts
+    usage_minutes: optional {(room_name, slot_index): minutes on per day}; default all day
+    max_energy / max_cost: optional daily cap (kWh / £) on the other quantity; one at a time
+    Returns {"assignment": [item_or_None per slot], "energy", "cost", "feasible", "resolution"},
+    where resolution is the cap rounding step of the DP (None when the result is exact).
+    """
+    if objective not in ("cost", "energy"):
+        raise ValueError(f"unknown objective {objective!r} (expected 'cost' or 'energy')")
+    if max_energy is not None and max_cost is not None:
+        raise ValueError("give either max_energy or max_cost, not both")
+    cands = _slot_candidates(slots, items, usage_minutes, objective)
+    # slots with no item of their category stay empty
+    open_slots = [d for d, c in enumerate(cands) if c]
+    open_cands = [cands[d] for d in open_slots]
+
+    # unconstrained (or capped on the objective itself): every slot takes its best item
+    choice = [0] * len(open_cands)
+    resolution = None
+    cap, cap_field = (max_energy, 1) if max_energy is not None else (max_cost, 2)
+    if cap is not None:
+        if sum(c[0][cap_field] for c in open_cands) > cap:
+            resolution = cap / buckets if cap > 0 else None
+            # rounding up is always within the cap; nearest-step rounding wastes less of
+            # it (and finds answers that fill the cap exactly, which rounding up can miss),
+            # so bisect the DP's target cap for the best answer that still fits
+            choice = _knapsack_dp(open_cands, cap, cap_field, buckets, round_up=True)
+            best_obj = np.inf if choice is None else sum(c[k][0] for c, k in zip(open_cands, choice))
+            # nearest-step rounding is off by at most half a step per slot, either way
+            slack = len(open_cands) * (resolution or 0.0) / 2
+            lo, hi = max(0.0, cap - slack), cap + slack
+            for _ in range(6):
+                target = (lo + hi) / 2 if lo < hi else hi
+                trial = _knapsack_dp(open_cands, target, cap_field, buckets, round_up=False)
+                used = None if trial is None else sum(c[k][cap_field] for c, k in zip(open_cands, trial))
+                if used is None or used > cap + _CAP_SLACK * max(1.0, cap):
+                    hi = target
+                    continue
+                obj = sum(c[k][0] for c, k in zip(open_cands, trial))
+                if obj < best_obj:
+                    choice, best_obj = trial, obj
+                lo = target
+                if lo == hi:
+                    break
+            # the DP works in rounded steps; only report what really fits
+            if choice is not None and sum(c[k][cap_field] for c, k in zip(open_cands, choice)) > cap + _CAP_SLACK * max(1.0, cap):
+                choice = None
+
+    assignment = [None] * len(slots)
+    total_energy = 0.0
+    total_cost = 0.0
+    if choice is not None:
+        for d, k in zip(open_slots, choice):
+            _, e, c, i = cands[d][k]
+            assignment[d] = items[i]
+            total_energy += e
+            total_cost += c
+    return {
+        "assignment": assignment,
+        "energy": total_energy,
+        "cost": total_cost,
+        "feasible": choice is not None,
+        "resolution": resolution
+    }
+
+
+def assignment_totals(slots, assignment, usage_minutes=None):
+    """Daily (energy, cost) of an existing assignment (None = empty slot)."""
+    total_energy = 0.0
+    total_cost = 0.0
+    for (room_name, idx, _), itm in zip(slots, assignment):
+        if not itm:
+            continue
+        minutes = usage_minutes.get((room_name, idx), MINUTES_PER_DAY) if usage_minutes else MINUTES_PER_DAY
+        epm, cpm = item_rates(itm)
+        total_energy += epm * minutes
+        total_cost += cpm * minutes
+    return total_energy, total_cost
@@ -0,0 +1,149 @@
+"""Simulate many item assignments for one map across a process pool.
+
+Every slot in ROOM_SLOTS[map_name] gets one catalog item of the slot's category,
+each assignment is simulated for one day, and results are yielded as workers
+finish them. A slot runs during its on-windows ({(room, slot): [(start_minute,
+end_minute), ...]}; slots without windows run all day), priced by the household
+tariff if one is given. That is what the sweep adds over simulation.solver,
+whose closed form prices every minute of an item the same: under a time-of-use
+tariff the cheapest item depends on when each slot is on.
+"""
+import heapq
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from screens.room_slots import ROOM_SLOTS
+from simulation.engine import SimulationEngine
+
+
+def map_slots(map_name):
+    """[(room_name, slot_index, slot_cfg), ...] for every slot of map_name, in ROOM_SLOTS order."""
+    out = []
+    for room_name, slots_cfg in ROOM_SLOTS.get(map_name, {}).items():
+        for idx, slot in enumerate(slots_cfg):
+            out.append((room_name, idx, slot))
+    return out
+
+
+def slot_candidates(slots, items):
+    """For each slot, the indices into items whose category matches the slot."""
+    by_category = {}
+    for i, itm in enumerate(items):
+        by_category.setdefault(itm.get("category"), []).append(i)
+    return [by_category.get(slot["category"], []) for _, _, slot in slots]
+
+
+def count_assignments(candidates):
+    total = 1
+    for c in candidates:
+        total *= len(c)
+    return total
+
+
+def iter_assignments(candidates, samples=None, seed=None):
+    """Yield assignments (one item index per slot).
+       Enumerates every combination unless `samples` is smaller than that, in which
+       case `samples` distinct random assignments are drawn instead."""
+    if any(not c for c in candidates):
+        return
+    if samples is None or count_assignments(candidates) <= samples:
+        yield from itertools.product(*candidates)
+        return
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < samples:
+        assignment = tuple(rng.choice(c) for c in candidates)
+        if assignment not in seen:
+            seen.add(assignment)
+            yield assignment
+
+
+# per-process state set up once by _init_worker so tasks only carry index tuples
+_worker = {}
+
+
+def _init_worker(map_name, slots, items, windows, tariff):
+    _worker["map_name"] = map_name
+    _worker["slots"] = slots
+    _worker["items"] = items
+    _worker["windows"] = windows
+    _worker["tariff"] = tariff
+
+
+def simulate_assignment(map_name, slots, items, assignment, windows=None, tariff=None):
+    """Simulate one day with assignment[i] placed in slots[i], switched on during its windows
+       (all day if it has none) and priced by tariff (a TariffPlan or None); returns (energy, cost)."""
+    windows = windows or {}
+    placements = {map_name: {}}
+    placements_on = {map_name: {}}
+    for (room_name, idx, _), item_idx in zip(slots, assignment):
+        room = placements[map_name].setdefault(room_name, [])
+        room_on = placements_on[map_name].setdefault(room_name, [])
+        while len(room) <= idx:
+            room.append(None)
+            room_on.append(False)
+        room[idx] = items[item_idx]
+        room_on[idx] = (room_name, idx) not in windows
+    engine = SimulationEngine(placements, placements_on, accounting="events", tariff=tariff)
+    for (room_name, idx), spans in windows.items():
+        for start, end in spans:
+            engine.schedule_toggle(start, map_name, room_name, idx, True)
+            engine.schedule_toggle(end, map_name, room_name, idx, False)
+    entry = engine.run_days(1)[0]
+    return entry["energy"], entry["cost"]
+
+
+def _run_batch(batch):
+    out = []
+    for scenario_id, assignment in batch:
+        energy, cost = simulate_assignment(_worker["map_name"], _worker["slots"], _worker["items"], assignment,
+                                           _worker["windows"], _worker["tariff"])
+        out.append((scenario_id, assignment, energy, cost))
+    return out
+
+
+def _batches(assignments, size):
+    it = iter(enumerate(assignments))
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_sweep(map_name, items, workers=None, samples=None, seed=None, batch_size=256, windows=None, tariff=None):
+    """Yield (scenario_id, assignment, energy_kwh, cost) as each batch finishes.
+       items is the catalog (list of item dicts, e.g. get_all_items()); windows and tariff
+       are passed to simulate_assignment()."""
+    slots = map_slots(map_name)
+    candidates = slot_candidates(slots, items)
+    assignments = iter_assignments(candidates, samples=samples, seed=seed)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(map_name, slots, items, windows, tariff)) as pool:
+        # keep a bounded number of batches in flight so huge sweeps don't queue everything up front
+        pending = set()
+        max_pending = 4 * workers
+        for batch in _batches(assignments, batch_size):
+            pending.add(pool.submit(_run_batch, batch))
+            if len(pending) >= max_pending:
+                done = _wait_first(pending)
+                for fut in done:
+                    yield from fut.result()
+        while pending:
+            for fut in _wait_first(pending):
+                yield from fut.result()
+
+
+def _wait_first(pending):
+    done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+    pending.intersection_update(not_done)
+    return done
+
+
+def rank_results(results, top=10, by="energy"):
+    """Keep the `top` cheapest results (by "energy" or "cost") from a result stream."""
+    key_idx = 2 if by == "energy" else 3
+    return heapq.nsmallest(top, results, key=lambda r: (r[key_idx], r[0]))
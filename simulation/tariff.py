@@ -0,0 +1,84 @@
+"""Household time-of-use tariff plans.
+
+A plan gives a price (£ per kWh) for every minute of the simulated day, built
+from bands [(start_minute, end_minute, price), ...] that cover 0..1440. The
+prices are precomputed into a cumulative price integral C, so an item drawing
+epm kWh per minute from minute a to minute b costs epm * (C(b) - C(a)): one
+lookup per end of the interval, however many price changes it spans.
+"""
+import numpy as np
+
+from database.items_db import add_tariff_plan_if_not_exists, get_tariff_bands
+
+MINUTES = 1440
+
+# name -> (description, bands); seeded into the DB by seed_default_plans()
+DEFAULT_TARIFF_PLANS = {
+    "Flat rate": ("Single price all day", [(0, 1440, 0.20)]),
+    "Economy 7": ("Cheap overnight 00:30-07:30", [(0, 30, 0.28), (30, 450, 0.09), (450, 1440, 0.28)]),
+    "Peak/off-peak": ("Expensive 16:00-19:00, cheap overnight", [
+        (0, 420, 0.12), (420, 960, 0.22), (960, 1140, 0.38), (1140, 1440, 0.22)
+    ]),
+    "Agile (half-hourly)": ("Price changes every 30 minutes", [
+        (start, start + 30, price) for start, price in zip(range(0, 1440, 30), [
+            0.14, 0.13, 0.12, 0.11, 0.10, 0.09, 0.08, 0.08, 0.09, 0.10, 0.11, 0.13,
+            0.16, 0.19, 0.21, 0.22, 0.21, 0.20, 0.19, 0.18, 0.17, 0.17, 0.18, 0.19,
+            0.19, 0.18, 0.17, 0.18, 0.20, 0.23, 0.27, 0.32, 0.36, 0.39, 0.38, 0.34,
+            0.29, 0.25, 0.23, 0.22, 0.21, 0.20, 0.19, 0.18, 0.17, 0.16, 0.15, 0.14,
+        ])
+    ]),
+}
+
+
+class TariffPlan:
+    """Per-minute prices of one plan plus their cumulative integral."""
+
+    def __init__(self, name, prices):
+        prices = np.asarray(prices, dtype=float)
+        if prices.shape != (MINUTES,):
+            raise ValueError(f"a tariff needs {MINUTES} per-minute prices, got {prices.shape}")
+        self.name = name
+        self.prices = prices
+        # cumulative[m] = £ per kWh-per-minute drawn from minute 0 to minute m
+        self.cumulative = np.concatenate(([0.0], np.cumsum(prices)))
+
+    @classmethod
+    def from_bands(cls, name, bands):
+        """Build from [(start_minute, end_minute, price), ...] covering the whole day."""
+        prices = np.full(MINUTES, np.nan)
+        for start, end, price in bands:
+            prices[int(start):int(end)] = float(price)
+        if np.isnan(prices).any():
+            missing = int(np.flatnonzero(np.isnan(prices))[0])
+            raise ValueError(f"tariff {name!r} has no price for minute {missing}")
+        return cls(name, prices)
+
+    def cum_at(self, minute):
+        """C(minute), the price integral up to a (fractional) minute of the day.
+           Accepts a scalar or an array; prices are constant within each minute."""
+        x = np.clip(np.asarray(minute, dtype=float), 0.0, MINUTES)
+        idx = np.minimum(x.astype(np.intp), MINUTES - 1)
+        out = self.cumulative[idx] + self.prices[idx] * (x - idx)
+        return float(out) if out.ndim == 0 else out
+
+    def interval_cost(self, epm, start, end):
+        """£ for drawing epm kWh per minute from start to end (minutes of the day)."""
+        return epm * (self.cum_at(end) - self.cum_at(start))
+
+    @property
+    def average_price(self):
+        return self.cumulative[-1] / MINUTES
+
+
+def seed_default_plans():
+    """Store DEFAULT_TARIFF_PLANS in the DB (existing plans are left alone)."""
+    for name, (description, bands) in DEFAULT_TARIFF_PLANS.items():
+        add_tariff_plan_if_not_exists(name, bands, description)
+
+
+def load_plan(name):
+    """TariffPlan for a plan stored in the DB, or None if there is no such plan."""
+    bands = get_tariff_bands(name)
+    if not bands:
+        return None
+    return TariffPlan.from_bands(name, bands)
@@ -0,0 +1,109 @@
+"""Re-price recorded usage under many tariff plans at once.
+
+Usage rows are turned into per-minute load curves (kWh drawn in each minute of
+the day), stacked into a (rows x 1440) matrix and multiplied by the (1440 x
+plans) price matrix: one matrix product prices a whole chunk of history under
+every plan. Per-room and per-item totals are accumulated with np.add.at, so
+history of any length is processed in fixed-size chunks.
+"""
+import numpy as np
+
+from simulation.tariff import MINUTES
+
+
+def price_matrix(plans):
+    """(plans x 1440) array of £/kWh for each plan and minute."""
+    return np.vstack([plan.prices for plan in plans])
+
+
+def flat_load_curves(energy):
+    """Spread each row's daily kWh evenly over the day; (rows x 1440).
+       Used for history recorded without a per-minute profile."""
+    energy = np.asarray(energy, dtype=float)
+    return np.repeat(energy[:, None] / MINUTES, MINUTES, axis=1)
+
+
+class _GroupTotals:
+    """Per-label sums of per-plan cost, recorded cost and energy."""
+
+    def __init__(self, plan_count):
+        self.labels = []
+        self._index = {}
+        self.costs = np.zeros((0, plan_count))
+        self.recorded = np.zeros(0)
+        self.energy = np.zeros(0)
+
+    def _ids(self, labels):
+        ids = np.empty(len(labels), dtype=np.intp)
+        for n, label in enumerate(labels):
+            idx = self._index.get(label)
+            if idx is None:
+                idx = self._index[label] = len(self.labels)
+                self.labels.append(label)
+            ids[n] = idx
+        grow = len(self.labels) - len(self.recorded)
+        if grow > 0:
+            self.costs = np.vstack((self.costs, np.zeros((grow, self.costs.shape[1]))))
+            self.recorded = np.concatenate((self.recorded, np.zeros(grow)))
+            self.energy = np.concatenate((self.energy, np.zeros(grow)))
+        return ids
+
+    def add(self, labels, costs, recorded, energy):
+        ids = self._ids(labels)
+        np.add.at(self.costs, ids, costs)
+        np.add.at(self.recorded, ids, recorded)
+        np.add.at(self.energy, ids, energy)
+
+
+class TariffComparison:
+    """Running totals of history re-priced under a fixed list of TariffPlans."""
+
+    def __init__(self, plans):
+        if not plans:
+            raise ValueError("need at least one tariff plan to compare")
+        self.plans = list(plans)
+        self.prices_t = price_matrix(self.plans).T  # (1440 x plans), ready for load @ prices_t
+        self.rows = 0
+        self.energy = 0.0
+        self.recorded = 0.0
+        self.totals = np.zeros(len(self.plans))
+        self.by_room = _GroupTotals(len(self.plans))
+        self.by_item = _GroupTotals(len(self.plans))
+
+    def add(self, load, rooms, items, recorded_cost):
+        """Add a chunk of rows: load is (rows x 1440) kWh per minute, the rest are per-row lists."""
+        load = np.asarray(load, dtype=float)
+        costs = load @ self.prices_t  # (rows x plans)
+        energy = load.sum(axis=1)
+        recorded_cost = np.asarray(recorded_cost, dtype=float)
+        self.rows += len(load)
+        self.energy += float(energy.sum())
+        self.recorded += float(recorded_cost.sum())
+        self.totals += costs.sum(axis=0)
+        self.by_room.add(rooms, costs, recorded_cost, energy)
+        self.by_item.add(items, costs, recorded_cost, energy)
+
+    @property
+    def cheapest(self):
+        """Index of the plan with the lowest total cost."""
+        return int(np.argmin(self.totals))
+
+    def ranking(self):
+        """[(plan, total_cost), ...] cheapest first."""
+        order = np.argsort(self.totals, kind="stable")
+        return [(self.plans[i], float(self.totals[i])) for i in order]
+
+    def savings(self, by="room"):
+        """Per room (or item): [(label, energy, recorded_cost, cost_on_cheapest_plan,
+           saving, best_plan_for_this_label), ...] sorted by saving, largest first."""
+        groups = self.by_room if by == "room" else self.by_item
+        if not groups.labels:
+            return []
+        on_cheapest = groups.costs[:, self.cheapest]
+        best = np.argmin(groups.costs, axis=1)
+        saving = groups.recorded - on_cheapest
+        out = [(label, float(groups.energy[g]), float(groups.recorded[g]), float(on_cheapest[g]),
+                float(saving[g]), self.plans[best[g]])
+               for g, label in enumerate(groups.labels)]
+        out.sort(key=lambda r: r[4], reverse=True)
+        return out
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import items_db
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """items_db pointed at an empty database in tmp_path (schema not yet created)."""
+    items_db.close_conn()
+    monkeypatch.setattr(items_db, "DB_PATH", str(tmp_path / "simulation.db"))
+    for cache in items_db._ID_CACHES.values():
+        cache.clear()
+    yield tmp_path
+    items_db.close_conn()
+    for cache in items_db._ID_CACHES.values():
+        cache.clear()
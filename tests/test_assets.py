@@ -0,0 +1,58 @@
+import os
+
+import pygame
+import pytest
+
+from ui.assets import AssetManager
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((64, 64))
+    yield
+    pygame.display.quit()
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for n in range(8):
+        surf = pygame.Surface((64, 64), pygame.SRCALPHA)
+        surf.fill((n * 30, 0, 0, 255))
+        path = str(tmp_path / f"img{n}.png")
+        pygame.image.save(surf, path)
+        paths.append(path)
+    return paths
+
+
+def test_preloaded_surfaces_count_against_the_budget(images):
+    one = 64 * 64 * 4
+    assets = AssetManager(budget_bytes=3 * one)
+    assets.preload(images).join()
+    stats = assets.stats()
+    assert stats["bytes"] <= assets.budget_bytes
+    assert stats["pending"] == 3 and stats["evictions"] == 5
+    assert stats["loads"] == len(images)
+
+
+def test_preloaded_surface_is_converted_once_and_recharged(images):
+    assets = AssetManager()
+    assets.preload(images[:2]).join()
+    pending_bytes = assets.stats()["bytes"]
+    surf = assets.get(images[0])
+    assert surf.get_at((0, 0)) == (0, 0, 0, 255)
+    stats = assets.stats()
+    assert stats["pending"] == 1 and stats["entries"] == 1
+    # the decoded copy's bytes went when it was converted; the converted one is charged instead
+    assert stats["bytes"] == pending_bytes
+    assert stats["loads"] == 2
+    assert assets.get(images[0]) is surf
+
+
+def test_scaled_sizes_share_the_budget(images):
+    assets = AssetManager(budget_bytes=64 * 64 * 4 * 2)
+    for size in ((32, 32), (48, 48), (64, 64)):
+        assets.get(images[0], size)
+    assert assets.stats()["bytes"] <= assets.budget_bytes
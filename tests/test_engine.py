@@ -0,0 +1,150 @@
+import os
+import random
+import shutil
+
+import pytest
+
+from database import item_catalog
+from scripts.simulate_days import load_map_placements, random_fill
+from simulation.engine import SimulationEngine
+from simulation.tariff import DEFAULT_TARIFF_PLANS, TariffPlan, seed_default_plans, load_plan
+
+REPO_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "simulation.db")
+
+LAMP = {"id": 1, "name": "Lamp", "category": "Lighting", "energy_per_min": 0.001, "cost_per_kwh": 0.3}
+HEATER = {"id": 2, "name": "Heater", "category": "Heating", "energy_per_min": 0.02, "cost_per_kwh": 0.2}
+
+
+def make_engine(accounting="events", tariff=None):
+    placements = {"Map": {"Kitchen": [LAMP, HEATER, None], "Bedroom": [LAMP, None]}}
+    placements_on = {"Map": {"Kitchen": [False, False, False], "Bedroom": [False, False]}}
+    return SimulationEngine(placements, placements_on, accounting=accounting, tariff=tariff)
+
+
+def economy_7():
+    return TariffPlan.from_bands("Economy 7", DEFAULT_TARIFF_PLANS["Economy 7"][1])
+
+
+def interval_cost(item, tariff, start, end):
+    if tariff is None:
+        return item["energy_per_min"] * item["cost_per_kwh"] * (end - start)
+    return tariff.interval_cost(item["energy_per_min"], start, end)
+
+
+# ---- schedule_toggle ----
+def test_toggle_added_mid_day_does_not_reapply_entries_at_the_current_minute():
+    engine = make_engine()
+    engine.schedule_toggle(60, "Map", "Kitchen", 0, True)
+    engine.start_day()
+    engine.advance(60)
+    assert engine.placements_on["Map"]["Kitchen"][0]
+    # switched off by hand in the same minute the schedule switched it on
+    engine.set_slot("Map", "Kitchen", 0, LAMP, False)
+    engine.schedule_toggle(120, "Map", "Bedroom", 0, True)
+    engine.advance(90)
+    assert not engine.placements_on["Map"]["Kitchen"][0]
+    assert engine.placements_on["Map"]["Bedroom"][0]
+
+
+def test_toggle_for_a_past_minute_first_fires_the_next_day():
+    engine = make_engine()
+    engine.start_day()
+    engine.advance(120)
+    engine.schedule_toggle(30, "Map", "Kitchen", 1, True)
+    engine.advance(60)
+    assert not engine.placements_on["Map"]["Kitchen"][1]
+    engine.run_to_end_of_day()
+    engine.finish_day()
+    engine.start_day()
+    engine.advance(30)
+    assert engine.placements_on["Map"]["Kitchen"][1]
+
+
+def test_toggle_added_at_the_start_of_the_day_fires_at_its_minute():
+    engine = make_engine()
+    engine.start_day()
+    engine.schedule_toggle(0, "Map", "Kitchen", 0, True)
+    engine.schedule_toggle(600, "Map", "Kitchen", 0, False)
+    engine.run_to_end_of_day()
+    assert engine.daily_energy_kwh == pytest.approx(LAMP["energy_per_min"] * 600)
+
+
+# ---- events vs frame accounting ----
+def play_day(engine):
+    """Mid-day slot changes, with steps that straddle Economy 7's 00:30 and 07:30 boundaries."""
+    engine.start_day()
+    engine.set_slot("Map", "Kitchen", 0, LAMP, True)
+    engine.set_slot("Map", "Bedroom", 0, LAMP, True)
+    engine.advance(25)
+    engine.advance(7.5)
+    engine.set_slot("Map", "Kitchen", 1, HEATER, True)
+    assert engine.total_power == pytest.approx(2 * LAMP["energy_per_min"] + HEATER["energy_per_min"])
+    engine.advance(400)
+    engine.set_slot("Map", "Bedroom", 0, LAMP, False)
+    assert engine.total_power == pytest.approx(LAMP["energy_per_min"] + HEATER["energy_per_min"])
+    engine.advance(40)
+    engine.set_slot("Map", "Kitchen", 1, LAMP, True)
+    assert engine.total_power == pytest.approx(2 * LAMP["energy_per_min"])
+    engine.run_to_end_of_day()
+
+
+@pytest.mark.parametrize("tariff", [None, economy_7()], ids=["flat", "economy7"])
+def test_events_and_frame_totals_agree_across_slot_changes_and_tariff_bands(tariff):
+    intervals = [(LAMP, 0, 1440), (LAMP, 0, 432.5), (HEATER, 32.5, 472.5), (LAMP, 472.5, 1440)]
+    energy = sum(item["energy_per_min"] * (end - start) for item, start, end in intervals)
+    cost = sum(interval_cost(item, tariff, start, end) for item, start, end in intervals)
+    for accounting in ("events", "frame"):
+        engine = make_engine(accounting, tariff)
+        play_day(engine)
+        assert engine.daily_energy_kwh == pytest.approx(energy)
+        assert engine.daily_cost == pytest.approx(cost)
+        slot_cost = sum(u["cost"] for u in engine.daily_slot_usage)
+        assert slot_cost == pytest.approx(cost)
+
+
+@pytest.mark.parametrize("accounting", ["events", "frame"])
+def test_projected_matches_advancing(accounting):
+    tariff = economy_7()
+    engine = make_engine(accounting, tariff)
+    engine.start_day()
+    engine.set_slot("Map", "Kitchen", 1, HEATER, True)
+    engine.advance(20)
+    minute, energy, cost = engine.projected(15)
+    assert engine.minute_of_day == 20
+    assert cost - engine.daily_cost == pytest.approx(engine.store.cost_between(20, 35))
+    assert cost - engine.daily_cost == pytest.approx(interval_cost(HEATER, tariff, 20, 35))
+    engine.advance(15)
+    assert (minute, energy, cost) == pytest.approx((engine.minute_of_day, engine.daily_energy_kwh, engine.daily_cost))
+
+
+def test_slot_switched_on_and_off_in_the_same_minute_uses_nothing():
+    engine = make_engine()
+    engine.start_day()
+    engine.advance(100)
+    engine.set_slot("Map", "Kitchen", 1, HEATER, True)
+    engine.set_slot("Map", "Kitchen", 1, HEATER, False)
+    engine.run_to_end_of_day()
+    assert engine.daily_energy_kwh == 0
+    assert engine.daily_cost == 0
+    assert engine.daily_slot_usage == []
+    assert engine.daily_load_curves() == []
+
+
+@pytest.fixture
+def repo_db(db, monkeypatch):
+    """A copy of the repo's simulation.db (saved placements and catalog)."""
+    shutil.copy(REPO_DB, db / "simulation.db")
+    monkeypatch.setattr(item_catalog, "_catalog", None)
+    return db
+
+
+@pytest.mark.parametrize("accounting", ["events", "frame"])
+def test_random_fill_reference_day(repo_db, accounting):
+    # python -m scripts.simulate_days "Map 2" --random-fill --seed 1 --tariff "Economy 7"
+    seed_default_plans()
+    placements, placements_on = load_map_placements("Map 2")
+    random_fill("Map 2", placements, placements_on, random.Random(1))
+    engine = SimulationEngine(placements, placements_on, accounting=accounting, tariff=load_plan("Economy 7"))
+    entry = engine.run_days(1)[0]
+    assert entry["energy"] == pytest.approx(895.68)
+    assert entry["cost"] == pytest.approx(201.1548, abs=5e-5)
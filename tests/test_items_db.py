@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from database import items_db
+from database.load_curves import LoadCurveStore, MINUTES
+
+
+@pytest.fixture
+def lamp(db):
+    items_db.init_items_db()
+    items_db.add_item_types_if_not_exist([("Lamp", "Lighting", 0.001, 0.2, None)])
+    return items_db.get_item_type_id("Lamp")
+
+
+def test_usage_export_finds_curves_of_rows_with_null_keys(db, lamp):
+    store = LoadCurveStore(str(db / "curves.f32"))
+    rows = [(3, "Map 1", "Kitchen", 0, lamp), (3, "Map 1", "Kitchen", None, lamp), (3, None, None, None, lamp),
+            (3, "Map 1", "Kitchen", 1, None)]
+    items_db.record_daily_usage_batch([(day, item, 1.0, 0.2, m, r, slot) for day, m, r, slot, item in rows])
+    store.append_rows([row + (np.full(MINUTES, n, dtype=np.float32),) for n, row in enumerate(rows)])
+
+    exported = list(items_db.iter_daily_item_usage())
+    assert len(exported) == len(rows)
+    assert [r["curve_row"] for r in exported] == [0, 1, 2, 3]
+
+
+# ---- v4 -> v5: slot keys that hold for NULL-keyed rows ----
+@pytest.fixture
+def v4_db(db):
+    """A v4 database whose usage and curve index hold duplicate rows with NULL keys,
+       as the pre-v5 upserts (which never conflicted on NULLs) left them."""
+    with items_db.transaction() as conn:
+        items_db.MIGRATIONS[0](conn)
+        conn.execute("INSERT INTO item_types (name, category, energy_per_min, cost_per_kwh) VALUES ('Lamp', 'Lighting', 0.001, 0.2)")
+        conn.execute("INSERT INTO maps (name) VALUES ('Map 1')")
+        usage = [(1, 1, 1.0, 0.2, 1, None, None), (1, 1, 2.0, 0.4, 1, None, None), (1, 1, 3.0, 0.6, 1, None, None),
+                 (1, None, 5.0, 1.0, None, None, None), (1, None, 7.0, 1.4, None, None, None),
+                 (2, 1, 11.0, 2.2, 1, None, None)]
+        conn.executemany("INSERT INTO daily_item_usage (day_index, item_type_id, energy, cost, map_id, room_id, slot_index)"
+                         " VALUES (?, ?, ?, ?, ?, ?, ?)", usage)
+        for target, migrate in enumerate(items_db.MIGRATIONS[1:4], 2):
+            migrate(conn)
+            conn.execute("PRAGMA user_version = %d" % target)
+        conn.executemany("INSERT INTO load_curve_index (day_index, map_id, room_id, slot_index, item_type_id, curve_row)"
+                         " VALUES (?, ?, ?, ?, ?, ?)",
+                         [(1, 1, None, None, 1, 0), (1, 1, None, None, 1, 2), (1, 1, None, None, 1, 1), (2, None, None, None, None, 3)])
+    assert items_db.get_schema_version() == 4
+    # the v3 backfill counted every copy
+    assert items_db.get_rollups("day", 1, 1)["energy"] == pytest.approx(18.0)
+    return db
+
+
+def _per_key_counts(conn, table):
+    return [r[0] for r in conn.execute("SELECT COUNT(*) FROM %s GROUP BY %s" % (table, items_db.SLOT_DAY_KEY))]
+
+
+def test_v5_keeps_one_row_per_slot_day(v4_db):
+    items_db.init_items_db()
+    conn = items_db.get_conn()
+    assert items_db.get_schema_version() == items_db.SCHEMA_VERSION == 5
+    assert _per_key_counts(conn, "daily_item_usage") == [1, 1, 1]
+    # the newest copy of each key is the one the replacing upsert would have left
+    energies = [r[0] for r in conn.execute("SELECT energy FROM daily_item_usage ORDER BY day_index, energy")]
+    assert energies == [3.0, 7.0, 11.0]
+    assert items_db.get_rollups("day", 1, 1)["energy"] == pytest.approx(10.0)
+    assert items_db.get_rollups("week", 1, 1)["energy"] == pytest.approx(21.0)
+    assert _per_key_counts(conn, "load_curve_index") == [1, 1]
+    assert [r[0] for r in conn.execute("SELECT curve_row FROM load_curve_index ORDER BY day_index")] == [2, 3]
+
+
+def test_v5_upserts_conflict_on_the_expression_indexes(v4_db):
+    items_db.init_items_db()
+    conn = items_db.get_conn()
+    for table, index in (("daily_item_usage", "ux_usage_day_slot"), ("load_curve_index", "ux_load_curve_slot")):
+        assert conn.execute('SELECT "unique" FROM pragma_index_list(?) WHERE name = ?', (table, index)).fetchone()[0]
+        # expression columns (the COALESCEs of SLOT_DAY_KEY) have cid -2
+        columns = [c["cid"] for c in conn.execute("PRAGMA index_xinfo(%s)" % index) if c["key"]]
+        assert columns[1:] == [-2, -2, -2, -2]
+
+    # recording NULL-keyed rows again replaces them (ON CONFLICT (SLOT_DAY_KEY) finds the index)
+    items_db.record_daily_usage_batch([(1, 1, 4.0, 0.8, 1, None, None), (1, None, 6.0, 1.2, None, None, None)])
+    assert _per_key_counts(conn, "daily_item_usage") == [1, 1, 1]
+    assert items_db.get_rollups("day", 1, 1)["energy"] == pytest.approx(10.0)
+    store = LoadCurveStore(str(v4_db / "curves.f32"))
+    store.append_rows([(2, None, None, None, None, np.ones(MINUTES, dtype=np.float32))])
+    assert _per_key_counts(conn, "load_curve_index") == [1, 1]
+    assert conn.execute("SELECT curve_row FROM load_curve_index WHERE day_index = 2").fetchone()[0] == 0
@@ -0,0 +1,77 @@
+import itertools
+
+from simulation.solver import solve_fitout, item_rates
+
+ITEMS = [
+    {"name": "Bulb 60W", "category": "Lighting", "energy_per_min": 0.001, "cost_per_kwh": 0.30},
+    {"name": "LED", "category": "Lighting", "energy_per_min": 0.0002, "cost_per_kwh": 0.35},
+    {"name": "Heater", "category": "Heating", "energy_per_min": 0.03, "cost_per_kwh": 0.15},
+    {"name": "Heat pump", "category": "Heating", "energy_per_min": 0.01, "cost_per_kwh": 0.60},
+    {"name": "Fan heater", "category": "Heating", "energy_per_min": 0.02, "cost_per_kwh": 0.25},
+]
+SLOTS = [
+    ("kitchen", 0, {"name": "Light", "category": "Lighting"}),
+    ("kitchen", 1, {"name": "Heat", "category": "Heating"}),
+    ("bedroom", 0, {"name": "Light", "category": "Lighting"}),
+    ("bedroom", 1, {"name": "Heat", "category": "Heating"}),
+]
+USAGE = {("kitchen", 0): 300, ("kitchen", 1): 120, ("bedroom", 0): 240, ("bedroom", 1): 480}
+
+
+def brute_force(cap, cap_index):
+    """Cheapest (cost, energy) over every assignment whose capped quantity fits."""
+    choices = [[i for i, itm in enumerate(ITEMS) if itm["category"] == slot["category"]] for _, _, slot in SLOTS]
+    best = None
+    for combo in itertools.product(*choices):
+        energy = cost = 0.0
+        for (room, idx, _), i in zip(SLOTS, combo):
+            epm, cpm = item_rates(ITEMS[i])
+            energy += epm * USAGE[(room, idx)]
+            cost += cpm * USAGE[(room, idx)]
+        if (energy, cost)[cap_index] <= cap and (best is None or cost < best[0]):
+            best = (cost, energy)
+    return best
+
+
+def test_unconstrained_takes_cheapest_item_per_slot():
+    result = solve_fitout(SLOTS, ITEMS, USAGE)
+    assert result["feasible"] and result["resolution"] is None
+    assert [itm["name"] for itm in result["assignment"]] == ["LED", "Heater", "LED", "Heater"]
+
+
+def test_zero_cap_rejects_every_item_that_uses_energy():
+    result = solve_fitout(SLOTS, ITEMS, USAGE, max_energy=0)
+    assert not result["feasible"]
+    assert result["assignment"] == [None] * len(SLOTS)
+
+
+def test_zero_cap_allows_items_that_use_none_of_it():
+    items = ITEMS + [{"name": "Blanket", "category": "Heating", "energy_per_min": 0.0, "cost_per_kwh": 0.0},
+                     {"name": "Candle", "category": "Lighting", "energy_per_min": 0.0, "cost_per_kwh": 0.0}]
+    result = solve_fitout(SLOTS, items, USAGE, max_energy=0)
+    assert result["feasible"]
+    assert result["energy"] == 0.0
+    assert {itm["name"] for itm in result["assignment"]} == {"Blanket", "Candle"}
+
+
+def test_tight_energy_cap_matches_brute_force_and_fits():
+    # exactly the energy of the lowest-energy fit-out: only that one fits
+    tight = sum(0.0002 * USAGE[(r, i)] if s["category"] == "Lighting" else 0.01 * USAGE[(r, i)] for r, i, s in SLOTS)
+    for cap in (tight, tight + 0.5, tight + 2.0, 7.5):
+        result = solve_fitout(SLOTS, ITEMS, USAGE, max_energy=cap)
+        best = brute_force(cap, 0)
+        assert result["feasible"]
+        assert result["energy"] <= cap + 1e-9
+        assert abs(result["cost"] - best[0]) < 1e-9
+
+
+def test_energy_cap_below_the_minimum_is_infeasible():
+    tight = sum(0.0002 * USAGE[(r, i)] if s["category"] == "Lighting" else 0.01 * USAGE[(r, i)] for r, i, s in SLOTS)
+    assert not solve_fitout(SLOTS, ITEMS, USAGE, max_energy=tight * 0.99)["feasible"]
+
+
+def test_tight_cost_cap_fits():
+    cap = brute_force(float("inf"), 1)[0] * 1.01
+    result = solve_fitout(SLOTS, ITEMS, USAGE, objective="energy", max_cost=cap)
+    assert result["feasible"]
+    assert result["cost"] <= cap + 1e-9
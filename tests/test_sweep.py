@@ -0,0 +1,50 @@
+import pytest
+
+from simulation.sweep import count_assignments, iter_assignments, map_slots, simulate_assignment
+from simulation.tariff import DEFAULT_TARIFF_PLANS, TariffPlan
+
+BULB = {"id": 1, "name": "Bulb", "category": "Lighting", "energy_per_min": 0.001, "cost_per_kwh": 0.3}
+HEATER = {"id": 2, "name": "Heater", "category": "Heating", "energy_per_min": 0.02, "cost_per_kwh": 0.2}
+SLOTS = [("Kitchen", 0, {}), ("Kitchen", 1, {}), ("Bedroom", 0, {})]
+
+
+def economy_7():
+    return TariffPlan.from_bands("Economy 7", DEFAULT_TARIFF_PLANS["Economy 7"][1])
+
+
+def test_sampled_assignments_are_distinct():
+    candidates = [[0, 1, 2]] * 4
+    assert count_assignments(candidates) == 81
+    sampled = list(iter_assignments(candidates, samples=60, seed=3))
+    assert len(sampled) == 60 == len(set(sampled))
+    assert sampled == list(iter_assignments(candidates, samples=60, seed=3))
+
+
+def test_small_spaces_are_enumerated():
+    assert len(list(iter_assignments([[0, 1], [2, 3]], samples=10))) == 4
+    assert list(iter_assignments([[0], []])) == []
+
+
+def test_windows_are_priced_by_the_tariff():
+    tariff = economy_7()
+    windows = {("Kitchen", 1): [(0, 420)], ("Bedroom", 0): [(18 * 60, 23 * 60)]}
+    energy, cost = simulate_assignment("Map", SLOTS, [BULB, HEATER], (0, 1, 0), windows, tariff)
+    assert energy == pytest.approx(BULB["energy_per_min"] * (1440 + 300) + HEATER["energy_per_min"] * 420)
+    assert cost == pytest.approx(tariff.interval_cost(BULB["energy_per_min"], 0, 1440)
+                                 + tariff.interval_cost(HEATER["energy_per_min"], 0, 420)
+                                 + tariff.interval_cost(BULB["energy_per_min"], 18 * 60, 23 * 60))
+
+
+def test_timing_changes_the_cheaper_item():
+    # the same heater usage costs less overnight on Economy 7; all-day slots would not see it
+    tariff = economy_7()
+    night = simulate_assignment("Map", SLOTS[1:2], [HEATER], (0,), {("Kitchen", 1): [(60, 420)]}, tariff)
+    evening = simulate_assignment("Map", SLOTS[1:2], [HEATER], (0,), {("Kitchen", 1): [(1020, 1380)]}, tariff)
+    assert night[0] == pytest.approx(evening[0])
+    assert night[1] < evening[1]
+
+
+def test_map_slots_follow_room_slots():
+    slots = map_slots("Map 2")
+    assert len(slots) == 20
+    assert slots[0][1] == 0
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import database.write_behind as write_behind
+from database import items_db
+from database.load_curves import LoadCurveStore, MINUTES
+from database.write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def lamp(db):
+    items_db.init_items_db()
+    items_db.add_item_types_if_not_exist([("Lamp", "Lighting", 0.001, 0.2, None)])
+    return items_db.get_item_type_id("Lamp")
+
+
+def day_curves(day_index, lamp):
+    return [("Map 1", "Kitchen", slot, lamp, np.full(MINUTES, day_index * 10 + slot, dtype=np.float32))
+            for slot in range(3)]
+
+
+def index_rows():
+    return items_db.get_conn().execute(
+        'SELECT day_index, slot_index, curve_row FROM load_curve_index ORDER BY curve_row').fetchall()
+
+
+def test_failed_batch_is_retried_without_orphan_curve_rows(db, lamp, monkeypatch):
+    store = LoadCurveStore(str(db / "curves.f32"))
+    real_append_day = store.append_day
+    calls = []
+
+    def append_day_then_fail_once(day_index, curves):
+        # the second day's curves reach the file, then the batch fails: everything rolls back
+        real_append_day(day_index, curves)
+        calls.append(day_index)
+        if len(calls) == 2:
+            raise RuntimeError("disk I/O error")
+
+    monkeypatch.setattr(store, "append_day", append_day_then_fail_once)
+    queue = WriteBehindQueue(curve_store=store, retry_delay=0.01)
+    queue.put_usage(1, lamp, 1.0, 0.2, "Map 1", "Kitchen", 0)
+    queue.put_load_curves(1, day_curves(1, lamp))
+    queue.put_load_curves(2, day_curves(2, lamp))
+    assert queue.flush(wait=True, timeout=5)
+    queue.close()
+
+    stats = queue.stats()
+    assert stats["errors"] == 1 and stats["retries"] == 1 and stats["rows_dropped"] == 0
+    assert calls == [1, 2, 1, 2]
+    rows = index_rows()
+    # one file row per indexed curve, and every curve where the index says
+    assert store.row_count == len(rows) == 6
+    assert [r["curve_row"] for r in rows] == list(range(6))
+    matrix = store.matrix()
+    for r in rows:
+        assert (matrix[r["curve_row"]] == r["day_index"] * 10 + r["slot_index"]).all()
+    assert items_db.get_conn().execute('SELECT COUNT(*) FROM daily_item_usage').fetchone()[0] == 1
+
+
+def test_batch_is_dropped_after_max_retries(db, lamp, monkeypatch):
+    def fail(rows):
+        raise RuntimeError("disk I/O error")
+
+    monkeypatch.setattr(write_behind, "record_daily_usage_batch", fail)
+    store = LoadCurveStore(str(db / "curves.f32"))
+    queue = WriteBehindQueue(curve_store=store, max_retries=2, retry_delay=0.01)
+    queue.put_usage(1, lamp, 1.0, 0.2, "Map 1", "Kitchen", 0)
+    queue.put_load_curves(1, day_curves(1, lamp))
+    assert not queue.flush(wait=True, timeout=5)
+    queue.close()
+
+    stats = queue.stats()
+    assert stats["errors"] == 3 and stats["retries"] == 2 and stats["rows_dropped"] == 4
+    assert stats["last_error"] == "disk I/O error"
+    assert store.row_count == 0 and index_rows() == []
@@ -0,0 +1,134 @@
+"""One place that loads and scales images.
+
+Every image file is decoded once; each size it is drawn at is scaled once and
+kept, keyed by (path, size, alpha, smooth), in an LRU that evicts the least
+recently drawn surfaces when the total goes over a memory budget. preload()
+decodes files on a background thread at startup so the first map/room click
+doesn't wait on PNG decoding; converting to the display format happens on the
+main thread the first time a surface is asked for. Preloaded surfaces wait in
+the same LRU (key (path, None, None, False)) and count against the same
+budget. Returned surfaces are shared: blit them, don't draw on them.
+"""
+import threading
+from collections import OrderedDict
+
+import pygame
+
+DEFAULT_BUDGET_BYTES = 96 * 1024 * 1024
+
+
+def _surface_bytes(surf):
+    return surf.get_pitch() * surf.get_height()
+
+
+def _decoded_key(path):
+    return (path, None, None, False)
+
+
+class AssetManager:
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        # (path, size, alpha, smooth) -> converted Surface; (path, None, None, False) -> Surface
+        # decoded by the preload thread, not yet converted
+        self._cache = OrderedDict()
+        self._missing = set()        # paths that could not be loaded
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _decode(self, path):
+        try:
+            return pygame.image.load(path)
+        except (pygame.error, OSError):
+            return None
+
+    def preload(self, paths):
+        """Decode paths (that aren't loaded yet) on a daemon thread; returns the thread."""
+        def run():
+            for path in paths:
+                with self._lock:
+                    if path in self._missing or self._has(path):
+                        continue
+                surf = self._decode(path)
+                if surf is None:
+                    with self._lock:
+                        self._missing.add(path)
+                    continue
+                with self._lock:
+                    self.loads += 1
+                self._store(_decoded_key(path), surf)
+        thread = threading.Thread(target=run, name="asset-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def _has(self, path):
+        # caller holds the lock
+        return any(key[0] == path for key in self._cache)
+
+    def get(self, path, size=None, alpha=True, smooth=True):
+        """path as a display-format surface, scaled to size (w, h) if given, or None if it
+           can't be loaded. alpha: convert_alpha() rather than convert(); smooth: smoothscale
+           rather than scale."""
+        if not path:
+            return None
+        size = tuple(size) if size else None
+        key = (path, size, alpha, smooth if size else False)
+        with self._lock:
+            surf = self._cache.get(key)
+            if surf is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return surf
+            if path in self._missing:
+                return None
+            self.misses += 1
+            decoded = self._cache.pop(_decoded_key(path), None) if size is None else None
+            if decoded is not None:
+                self.bytes -= _surface_bytes(decoded)
+        if size is None:
+            if decoded is None:
+                decoded = self._decode(path)
+                if decoded is None:
+                    with self._lock:
+                        self._missing.add(path)
+                    return None
+                with self._lock:
+                    self.loads += 1
+            surf = decoded.convert_alpha() if alpha else decoded.convert()
+        else:
+            original = self.get(path, None, alpha)
+            if original is None:
+                return None
+            w, h = max(1, size[0]), max(1, size[1])
+            surf = pygame.transform.smoothscale(original, (w, h)) if smooth else pygame.transform.scale(original, (w, h))
+        self._store(key, surf)
+        return surf
+
+    def _store(self, key, surf):
+        with self._lock:
+            self._cache[key] = surf
+            self.bytes += _surface_bytes(surf)
+            # drop least recently used surfaces, never the one just added
+            while self.bytes > self.budget_bytes and len(self._cache) > 1:
+                _, old = self._cache.popitem(last=False)
+                self.bytes -= _surface_bytes(old)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._missing.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            pending = sum(1 for key in self._cache if key[2] is None)
+            return {"entries": len(self._cache) - pending, "bytes": self.bytes, "budget_bytes": self.budget_bytes,
+                    "pending": pending, "missing": len(self._missing), "hits": self.hits,
+                    "misses": self.misses, "loads": self.loads, "evictions": self.evictions}
+
+
+assets = AssetManager()
@@ -1,4 +1,5 @@
 import pygame
+from ui.damage import changed_rects
 
 class Button:
     def __init__(self, x, y, w, h, text, callback, font=None):
@@ -8,12 +9,22 @@ class Button:
         self.color = pygame.Color('gray15')
         self.font = font or pygame.font.SysFont(None, 36)
         self.txt_surface = self.font.render(text, True, (255,255,255))
+        self._drawn = None  # (state, rect) as of the last draw()
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.rect.collidepoint(event.pos):
                 self.callback()
 
+    def _state(self):
+        return (tuple(self.rect), self.text, self.txt_surface, tuple(self.color))
+
+    def dirty_rects(self):
+        """Screen areas that need repainting since the last draw()."""
+        old_state, old_rect = self._drawn or (None, None)
+        return changed_rects(old_state, self._state(), old_rect, self.rect)
+
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, self.rect)
         screen.blit(self.txt_surface, (self.rect.x+10, self.rect.y+10))
+        self._drawn = (self._state(), self.rect.copy())
@@ -0,0 +1,65 @@
+"""Dirty-rectangle bookkeeping for the main loop.
+
+Widgets keep a snapshot of what they last drew and report, through
+dirty_rects(), the screen areas whose appearance has changed since. Each frame
+the loop collects those (plus its own changing bits: the running timer, the
+drag preview, the FPS overlay) in a DamageTracker. When nothing changed the
+frame draws nothing at all; otherwise the scene is redrawn clipped to the
+damaged area and only those rectangles are sent to the display.
+"""
+import pygame
+
+# past this share of the screen, one full-screen update is cheaper than many small ones
+FULL_SCREEN_SHARE = 0.5
+
+
+def changed_rects(old_state, new_state, old_rect, new_rect):
+    """[old_rect, new_rect] if the state differs (old_rect may be None: never drawn), else []."""
+    if old_state == new_state:
+        return []
+    return [pygame.Rect(r) for r in (old_rect, new_rect) if r is not None]
+
+
+class DamageTracker:
+    def __init__(self, size):
+        self.bounds = pygame.Rect((0, 0), size)
+        self.full = True
+        self.rects = []
+
+    def resize(self, size):
+        self.bounds = pygame.Rect((0, 0), size)
+        self.full = True
+
+    def add(self, *rects):
+        for r in rects:
+            r = pygame.Rect(r).clip(self.bounds)
+            if r.w and r.h:
+                self.rects.append(r)
+
+    def add_all(self):
+        self.full = True
+
+    def __bool__(self):
+        return self.full or bool(self.rects)
+
+    def take(self):
+        """The damaged rectangles (overlapping ones merged), and reset for the next frame."""
+        if self.full:
+            out = [self.bounds.copy()]
+        else:
+            out = []
+            for r in self.rects:
+                # fold r into anything it overlaps, repeatedly, so the result is disjoint
+                i = 0
+                while i < len(out):
+                    if out[i].colliderect(r):
+                        r = r.union(out.pop(i))
+                        i = 0
+                    else:
+                        i += 1
+                out.append(r)
+            if sum(r.w * r.h for r in out) > FULL_SCREEN_SHARE * self.bounds.w * self.bounds.h:
+                out = [self.bounds.copy()]
+        self.full = False
+        self.rects = []
+        return out
@@ -1,4 +1,5 @@
 import pygame
+from ui.damage import changed_rects
 
 class InputBox:
     def __init__(self, x, y, w, h, text='', font=None):
@@ -8,6 +9,7 @@ class InputBox:
         self.font = font or pygame.font.SysFont(None, 36)
         self.txt_surface = self.font.render(text, True, (255,255,255))
         self.active = False
+        self._drawn = None  # (state, area) as of the last draw()
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -26,6 +28,19 @@ class InputBox:
                     self.text += event.unicode
                 self.txt_surface = self.font.render(self.text, True, (255,255,255))
 
+    def _state(self):
+        return (tuple(self.rect), self.text, tuple(self.color))
+
+    def _area(self):
+        # typed text can run past the box
+        return self.rect.union(self.txt_surface.get_rect(topleft=(self.rect.x+5, self.rect.y+5)))
+
+    def dirty_rects(self):
+        """Screen areas that need repainting since the last draw()."""
+        old_state, old_area = self._drawn or (None, None)
+        return changed_rects(old_state, self._state(), old_area, self._area())
+
     def draw(self, screen):
         screen.blit(self.txt_surface, (self.rect.x+5, self.rect.y+5))
         pygame.draw.rect(screen, self.color, self.rect, 2)
+        self._drawn = (self._state(), self._area())
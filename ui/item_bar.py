@@ -1,6 +1,8 @@
-import os
 import pygame
 from ui.button import Button
+from ui.text_cache import get_font, render_text_fit, render_two_line
+from ui.assets import assets
+from ui.damage import changed_rects
 
 class ItemBar:
     def __init__(self, screen, font, small_font, categories, height=96, on_category_change=None, on_item_click=None, placeholder_size=72, placeholder_gap=10):
@@ -21,7 +23,7 @@ class ItemBar:
 
         # item label font (larger so text is readable)
         # significantly larger so item names are legible in placeholders
-        self.item_font = pygame.font.SysFont(None, 28)
+        self.item_font = get_font(28)
 
         # UI state
         self.selected_category = categories[0] if categories else None
@@ -30,7 +32,7 @@ class ItemBar:
         # caches / elements
         self.category_buttons = []
         self.item_placeholders = []
-        self.icon_cache = {}
+        self._drawn = None  # (state, rect) as of the last draw()
 
         # initial layout: only create category buttons; no item boxes yet
         self._layout_categories(screen.get_width())
@@ -86,60 +88,30 @@ class ItemBar:
         surf.fill((0,0,0,0))
         if not item:
             return surf
-        icon_path = item.get("icon_path")
-        if icon_path and os.path.exists(icon_path):
-            try:
-                img = pygame.image.load(icon_path).convert_alpha()
-                img = pygame.transform.smoothscale(img, (size-8, size-8))
-                surf.blit(img, ((size - img.get_width())//2, (size - img.get_height())//2))
-                return surf
-            except Exception:
-                pass
+        img = assets.get(item.get("icon_path"), (size-8, size-8))
+        if img:
+            surf.blit(img, ((size - img.get_width())//2, (size - img.get_height())//2))
+            return surf
         # fallback: draw short name centered
         name = item.get("name","")
         txt = self._render_text_fit(name, size-8)
         surf.blit(txt, ((size - txt.get_width())//2, (size - txt.get_height())//2))
         return surf
 
+    def _fit_sizes(self, font):
+        # the font's size (or a larger starting size) and then smaller ones down to 8
+        return tuple(range(max(12, font.get_height(), 28), 7, -1))
+
     def _render_text_fit(self, text, max_w, font=None):
         """Return a Surface with text rendered small enough to fit within max_w.
-           Tries decreasing font sizes (relative to provided font) then truncates with ellipsis."""
-        if font is None:
-            font = self.small_font
-        # attempt with the font's size (or a larger starting size) and then reduce
-        base_size = max(12, font.get_height(), 28)
-        for s in range(base_size, 7, -1):
-            f = pygame.font.SysFont(None, s)
-            w, h = f.size(text)
-            if w <= max_w:
-                return f.render(text, True, (230,230,230))
-        f = pygame.font.SysFont(None, 8)
-        txt = text
-        while txt and f.size(txt + '…')[0] > max_w:
-            txt = txt[:-1]
-        return f.render((txt + '…') if txt else '…', True, (230,230,230))
+           Tries decreasing font sizes (relative to provided font) then truncates with ellipsis.
+           Surfaces come from the shared text cache; don't draw on them."""
+        return render_text_fit(text, max_w, self._fit_sizes(font or self.small_font))
 
     def _render_two_line(self, line1, line2, max_w, max_h):
         """Attempt to render two lines stacked to fit into max_w x max_h.
-           Returns a surface containing both lines vertically."""
-        color = (230,230,230)
-        # try sizes from a larger starting height downwards for better readability
-        start_size = max(12, self.item_font.get_height(), 28)
-        for s in range(start_size, 7, -1):
-            f = pygame.font.SysFont(None, s)
-            w1, h1 = f.size(line1)
-            w2, h2 = f.size(line2)
-            total_h = h1 + h2 + 2
-            if w1 <= max_w and w2 <= max_w and total_h <= max_h:
-                surf = pygame.Surface((max_w, total_h), pygame.SRCALPHA)
-                surf.fill((0,0,0,0))
-                r1 = f.render(line1, True, color)
-                r2 = f.render(line2, True, color)
-                surf.blit(r1, ((max_w - r1.get_width())//2, 0))
-                surf.blit(r2, ((max_w - r2.get_width())//2, h1 + 2))
-                return surf
-        # fallback: render single-line truncated
-        return self._render_text_fit(line1 + " " + line2, max_w, font=self.item_font)
+           Returns a surface containing both lines vertically (single-line truncated if they don't fit)."""
+        return render_two_line(line1, line2, max_w, max_h, self._fit_sizes(self.item_font))
 
     def handle_event(self, event):
         # category buttons handle clicks
@@ -187,17 +159,7 @@ class ItemBar:
             if item:
                 icon_path = item.get("icon_path")
                 if icon_path:
-                    if icon_path not in self.icon_cache:
-                        try:
-                            if os.path.exists(icon_path):
-                                surf = pygame.image.load(icon_path).convert_alpha()
-                                surf = pygame.transform.smoothscale(surf, (rect.w-8, rect.h-8))
-                                self.icon_cache[icon_path] = surf
-                            else:
-                                self.icon_cache[icon_path] = None
-                        except Exception:
-                            self.icon_cache[icon_path] = None
-                    surf = self.icon_cache.get(icon_path)
+                    surf = assets.get(icon_path, (rect.w-8, rect.h-8))
                     if surf:
                         self.screen.blit(surf, (rect.x + (rect.w - surf.get_width())//2, rect.y + (rect.h - surf.get_height())//2))
                     else:
@@ -220,6 +182,22 @@ class ItemBar:
                         txt = self._render_text_fit(name, rect.w-8, font=self.item_font)
                         self._blit_text_centered(txt, rect)
 
+        self._drawn = (self._state(), self._area())
+
+    def _area(self):
+        # placeholders hang below the bar's own rect
+        return self.rect.unionall([r for r, _ in self.item_placeholders]) if self.item_placeholders else self.rect.copy()
+
+    def _state(self):
+        return (tuple(self.rect), self.selected_category, tuple(b.text for b in self.category_buttons),
+                tuple((tuple(r), item.get("name"), item.get("icon_path")) if item else (tuple(r), None, None)
+                      for r, item in self.item_placeholders))
+
+    def dirty_rects(self):
+        """Screen areas that need repainting since the last draw() (the bar is repainted whole)."""
+        old_state, old_area = self._drawn or (None, None)
+        return changed_rects(old_state, self._state(), old_area, self._area())
+
     def _blit_text_centered(self, surf, rect):
         x = rect.centerx - surf.get_width() // 2
         y = rect.centery - surf.get_height() // 2
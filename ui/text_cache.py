@@ -0,0 +1,110 @@
+"""Shared fonts and a cache of fitted text surfaces.
+
+Fitting a label (try font sizes from large to small until the text fits) used
+to build a pygame SysFont per size tried, for every slot and item placeholder,
+every frame. Fonts now come from one process-wide registry keyed by (size,
+bold), and finished surfaces are kept in an LRU keyed by (text, max_w, max_h,
+style), so a frame that draws the same labels as the last one builds no fonts
+and measures no text. Cached surfaces are shared: blit them, don't draw on them.
+"""
+from collections import OrderedDict
+
+import pygame
+
+TEXT_COLOR = (230, 230, 230)
+ELLIPSIS = '…'
+
+_fonts = {}  # (size, bold) -> pygame.font.Font
+
+
+def get_font(size, bold=False):
+    """The shared SysFont(None, size, bold), built on first use."""
+    key = (size, bool(bold))
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(None, size, bold=bold)
+    return font
+
+
+class TextCache:
+    """LRU of rendered surfaces with hit/miss counters."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        surf = self._entries.get(key)
+        if surf is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = self._entries[key] = build()
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hit_rate, "fonts": len(_fonts)}
+
+
+text_cache = TextCache()
+
+
+def _fit(text, max_w, sizes, bold, color):
+    for size in sizes:
+        f = get_font(size, bold)
+        if f.size(text)[0] <= max_w:
+            return f.render(text, True, color)
+    # truncate with ellipsis as last resort
+    f = get_font(8, bold)
+    txt = text
+    while txt and f.size(txt + ELLIPSIS)[0] > max_w:
+        txt = txt[:-1]
+    return f.render((txt + ELLIPSIS) if txt else ELLIPSIS, True, color)
+
+
+def render_text_fit(text, max_w, sizes, bold=False, color=TEXT_COLOR):
+    """text rendered at the first of sizes (largest first) that fits in max_w,
+       else truncated with an ellipsis at size 8."""
+    sizes = tuple(sizes)
+    return text_cache.get((text, max_w, None, ("fit", sizes, bold, color)),
+                          lambda: _fit(text, max_w, sizes, bold, color))
+
+
+def _two_line(line1, line2, max_w, max_h, sizes, color):
+    for size in sizes:
+        f = get_font(size)
+        w1, h1 = f.size(line1)
+        w2, h2 = f.size(line2)
+        total_h = h1 + h2 + 2
+        if w1 <= max_w and w2 <= max_w and total_h <= max_h:
+            surf = pygame.Surface((max_w, total_h), pygame.SRCALPHA)
+            surf.fill((0, 0, 0, 0))
+            r1 = f.render(line1, True, color)
+            r2 = f.render(line2, True, color)
+            surf.blit(r1, ((max_w - r1.get_width()) // 2, 0))
+            surf.blit(r2, ((max_w - r2.get_width()) // 2, h1 + 2))
+            return surf
+    return None
+
+
+def render_two_line(line1, line2, max_w, max_h, sizes, color=TEXT_COLOR):
+    """Two lines stacked and centred in max_w x max_h at the largest of sizes that fits both;
+       if none does, both on one line as render_text_fit would fit them."""
+    sizes = tuple(sizes)
+    return text_cache.get((line1 + "\n" + line2, max_w, max_h, ("two_line", sizes, color)),
+                          lambda: _two_line(line1, line2, max_w, max_h, sizes, color)
+                          or _fit(line1 + " " + line2, max_w, sizes, False, color))